@@ -4,6 +4,7 @@ from crewai.project import CrewBase, agent, crew, task
 from crewai.tools import BaseTool
 from pathlib import Path
 from lib import utils
+from lib import dag
 from pydantic import BaseModel
 from crewai.llm import LLM
 from crewai.crews.crew_output import CrewOutput
@@ -425,3 +426,54 @@ def job_vs_resume_analyzer_crew(
         job_details,
     )
     return hr_result, save_path, job_details, crew_usage_metrics
+
+
+def analyze_resume_vs_job(
+    resume_source: str,
+    job_source: str,
+    resume_caching: bool = True,
+    job_caching: bool = True,
+    on_complete=None,
+) -> tuple[dict, dict]:
+    """
+    Run the resume, job and job vs resume crews as a DAG: the resume and job
+    analyses are independent and run concurrently, the match starts as soon
+    as both are done.
+
+    Args:
+        resume_source: The resume source.
+        job_source: The job source.
+        resume_caching: Whether to get the resume analysis from cache.
+        job_caching: Whether to get the job and match analyses from cache.
+        on_complete: Called as on_complete(stage, result, timing) as each
+            stage finishes, see lib/dag.py.
+
+    Returns:
+        tuple[dict, dict]:
+             The stage results ("resume", "job", "match": the tuples returned
+             by the crew wrapper functions), and
+             the per-stage timings.
+    """
+    stages = [
+        dag.Stage(
+            "resume",
+            lambda: resume_skill_analyzer_crew(resume_source, resume_caching),
+        ),
+        dag.Stage(
+            "job", lambda: job_requirements_analyzer_crew(job_source, job_caching)
+        ),
+        dag.Stage(
+            "match",
+            lambda resume, job: job_vs_resume_analyzer_crew(
+                job[0], resume[0], job[2], job_caching
+            ),
+            depends_on=("resume", "job"),
+        ),
+    ]
+    results, timings = dag.run_dag(stages, on_complete)
+    for name, timing in timings.items():
+        print(
+            f"Stage {name}: {timing['duration_ms']} ms "
+            f"({timing['start_ms']}-{timing['end_ms']} ms)"
+        )
+    return results, timings
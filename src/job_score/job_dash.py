@@ -119,60 +119,52 @@ if analyze_button:
             else:
                 tmp_file_path = resume_file
         try:
-            with st.spinner("Analysing resume..."):
-                resume_parsed_filename = os.path.basename(tmp_file_path)
-                # Run the crew
-                resume_analysis, resume_analysis_path, resume_crew_usage_metrics = (
-                    crew_analyzer.resume_skill_analyzer_crew(
-                        tmp_file_path, resume_caching
-                    )
-                )
-
-                col_resume_analysis1, col_resume_analysis2 = st.columns([0.8, 0.2])
-                with col_resume_analysis1:
-                    st.success(
-                        f"**Resume analysis complete!**  \n"
-                        f"Analysis saved to: `{resume_analysis_path}`  \n"
-                        f"Resume stored as: `{st.session_state.resume_storage_dir}/{resume_parsed_filename}.txt`"
-                    )
-                with col_resume_analysis2:
-                    display_usage_metrics(resume_crew_usage_metrics)
-
-            with st.spinner("Analysing job..."):
-                job_analysis, job_analysis_path, job_details, job_crew_usage_metrics = (
-                    crew_analyzer.job_requirements_analyzer_crew(job_url, job_caching)
-                )
-
-                col_job_analysis1, col_job_analysis2 = st.columns([0.8, 0.2])
-                with col_job_analysis1:
-                    st.success(
-                        f"**Job analysis complete!**  \n"
-                        f"Analysis saved to: `{job_analysis_path}`"
-                    )
-                with col_job_analysis2:
-                    display_usage_metrics(job_crew_usage_metrics)
-
-            with st.spinner("Analyzing Job vs Resume skills and Deciding..."):
-                (
-                    final_decision,
-                    final_decision_path,
-                    job_details,
-                    job_crew_usage_metrics,
-                ) = crew_analyzer.job_vs_resume_analyzer_crew(
-                    job_analysis,
-                    resume_analysis,
-                    job_details,
+            resume_parsed_filename = os.path.basename(tmp_file_path)
+
+            def display_stage_complete(stage, result, timing):
+                # called as each stage finishes, resume and job run concurrently
+                col_stage1, col_stage2 = st.columns([0.8, 0.2])
+                with col_stage1:
+                    if stage == "resume":
+                        st.success(
+                            f"**Resume analysis complete!** ({timing['duration_ms']} ms)  \n"
+                            f"Analysis saved to: `{result[1]}`  \n"
+                            f"Resume stored as: `{st.session_state.resume_storage_dir}/{resume_parsed_filename}.txt`"
+                        )
+                    elif stage == "job":
+                        st.success(
+                            f"**Job analysis complete!** ({timing['duration_ms']} ms)  \n"
+                            f"Analysis saved to: `{result[1]}`"
+                        )
+                    else:
+                        st.success(
+                            f"**Final decision complete!** ({timing['duration_ms']} ms)  \n"
+                            f"Decision analysis saved to: `{result[1]}`"
+                        )
+                with col_stage2:
+                    display_usage_metrics(result[-1])
+
+            with st.spinner("Analysing resume and job, then deciding..."):
+                results, timings = crew_analyzer.analyze_resume_vs_job(
+                    tmp_file_path,
+                    job_url,
+                    resume_caching,
                     job_caching,
+                    on_complete=display_stage_complete,
                 )
-
-                col_final_decision1, col_final_decision2 = st.columns([0.8, 0.2])
-                with col_final_decision1:
-                    st.success(
-                        f"**Final decision complete!**  \n"
-                        f"Decision analysis saved to: `{final_decision_path}`"
-                    )
-                with col_final_decision2:
-                    display_usage_metrics(job_crew_usage_metrics)
+            (
+                final_decision,
+                final_decision_path,
+                job_details,
+                job_crew_usage_metrics,
+            ) = results["match"]
+            st.caption(
+                "Stage timings: "
+                + ", ".join(
+                    f"{name} {timing['duration_ms']} ms"
+                    for name, timing in timings.items()
+                )
+            )
 
             # Parse the output
             try:
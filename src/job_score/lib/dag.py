@@ -0,0 +1,95 @@
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+
+class Stage:
+    """
+    A pipeline stage: func is called with the results of its dependencies,
+    in the order they are listed.
+
+    Args:
+        name: The stage name, also the key of its result.
+        func: The stage function.
+        depends_on: Names of the stages whose results func takes.
+    """
+
+    def __init__(self, name: str, func, depends_on: tuple = ()):
+        self.name = name
+        self.func = func
+        self.depends_on = tuple(depends_on)
+
+
+def _timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, start, time.perf_counter()
+
+
+def run_dag(stages: list[Stage], on_complete=None, max_workers: int = None):
+    """
+    Run stages on a thread pool, each as soon as its dependencies are done,
+    so independent stages overlap.
+
+    Args:
+        stages: The stages, in any order.
+        on_complete: Called as on_complete(name, result, timing) in the
+            calling thread as each stage finishes (e.g. to update a UI).
+        max_workers: Thread pool size, defaults to the number of stages.
+
+    Returns:
+        tuple[dict, dict]: Results by stage name, and timings by stage name
+            ({"start_ms", "end_ms", "duration_ms"} relative to the run start,
+            plus a "total" entry with the end-to-end duration).
+
+    Raises:
+        ValueError: On an unknown dependency or a dependency cycle.
+        Exception: The first stage failure; stages not yet started are
+            skipped.
+    """
+    by_name = {stage.name: stage for stage in stages}
+    for stage in stages:
+        for dependency in stage.depends_on:
+            if dependency not in by_name:
+                raise ValueError(f"{stage.name} depends on unknown stage {dependency}")
+    results = {}
+    timings = {}
+    running = {}
+    run_start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max_workers or len(stages)) as executor:
+
+        def start_ready():
+            for stage in stages:
+                if (
+                    stage.name not in results
+                    and stage.name not in running.values()
+                    and all(d in results for d in stage.depends_on)
+                ):
+                    args = [results[d] for d in stage.depends_on]
+                    running[executor.submit(_timed, stage.func, *args)] = stage.name
+
+        start_ready()
+        while running:
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                try:
+                    result, start, end = future.result()
+                except Exception:
+                    for pending in running:
+                        pending.cancel()
+                    raise
+                results[name] = result
+                timings[name] = {
+                    "start_ms": int((start - run_start) * 1000),
+                    "end_ms": int((end - run_start) * 1000),
+                    "duration_ms": int((end - start) * 1000),
+                }
+                if on_complete:
+                    on_complete(name, result, timings[name])
+            start_ready()
+    if len(results) != len(stages):
+        blocked = [stage.name for stage in stages if stage.name not in results]
+        raise ValueError(f"Dependency cycle between stages {blocked}")
+    total_ms = int((time.perf_counter() - run_start) * 1000)
+    timings["total"] = {"start_ms": 0, "end_ms": total_ms, "duration_ms": total_ms}
+    return results, timings
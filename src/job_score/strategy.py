@@ -0,0 +1,56 @@
+# "three_crew" scoring strategy: resume and job crews (run concurrently),
+# then the match crew over their structured outputs. Implements the strategy
+# interface of job_scorev2/lib/strategies.py; run as a script it scores a
+# manifest of pairs in its own process.
+# usage: python strategy.py --pairs <pairs.json> --output <results.jsonl>
+
+import os
+import sys
+from dotenv import load_dotenv
+from lib import utils
+import crew_analyzer
+
+# the shared result row and manifest runner; job_score has its own "lib"
+# package, so they are imported from the job_scorev2 package
+sys.path.insert(1, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from job_scorev2.lib import strategies  # noqa: E402
+
+NAME = "three_crew"
+
+
+def run(
+    resume_source: str,
+    job_source: str,
+    us_citizen: bool = True,
+    security_clearance: str = "None",
+    use_cache: bool = True,
+) -> dict:
+    """
+    Score one resume/job pair.
+
+    The match crew of this pipeline has no candidate citizenship or clearance
+    inputs, us_citizen and security_clearance are accepted for the common
+    interface only.
+
+    Returns:
+        dict: The result row, same fields as strategies.result_row.
+    """
+    start = utils.currenttimemillis()
+    results, _ = crew_analyzer.analyze_resume_vs_job(
+        resume_source, job_source, use_cache, use_cache
+    )
+    end = utils.currenttimemillis()
+    hr_result, save_path = results["match"][0], results["match"][1]
+    return strategies.result_row(
+        NAME,
+        crew_analyzer.result_to_json(hr_result),
+        end - start,
+        [stage[-1] for stage in results.values()],
+        save_path,
+    )
+
+
+if __name__ == "__main__":
+    load_dotenv()
+    utils.make_work_dirs()
+    strategies.strategy_main(NAME, run)
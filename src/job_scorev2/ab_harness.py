@@ -0,0 +1,98 @@
+# A/B comparison of the scoring strategies in lib/strategies.py over a corpus
+# of resume/job pairs: latency percentiles, token usage and how often the
+# strategies agree on the decision and score. Makes real provider calls
+# unless --use-cache is given and the pairs are cached.
+# usage: python ab_harness.py compare --resume <file> [--resume <file>] [--limit 10]
+#        python ab_harness.py run --resume <file> --job <file> [--strategy three_crew]
+
+import argparse
+import datetime
+import json
+import os
+from dotenv import load_dotenv
+from lib import strategies
+from lib.report import print_table
+
+
+def list_jobs(jobs_dir: str, limit: int) -> list[str]:
+    job_files = sorted(
+        (os.path.join(jobs_dir, name) for name in os.listdir(jobs_dir)),
+        key=os.path.getmtime,
+        reverse=True,
+    )
+    return [path for path in job_files if os.path.isfile(path)][:limit]
+
+
+if __name__ == "__main__":
+    load_dotenv()
+    parser = argparse.ArgumentParser(description="Scoring strategy A/B harness")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    for command in ("compare", "run"):
+        command_parser = subparsers.add_parser(command)
+        command_parser.add_argument("--resume", action="append", required=True)
+        command_parser.add_argument("--security-clearance", default="None")
+        command_parser.add_argument("--not-us-citizen", action="store_true")
+        command_parser.add_argument(
+            "--use-cache",
+            action="store_true",
+            help="allow cached results (latencies then measure the cache)",
+        )
+        command_parser.add_argument("--concurrency", type=int, default=4)
+    compare_parser = subparsers.choices["compare"]
+    compare_parser.add_argument("--jobs-dir", default=os.getenv("JOB_STORAGE_DIR"))
+    compare_parser.add_argument("--limit", type=int, default=10)
+    compare_parser.add_argument(
+        "--strategies",
+        nargs="+",
+        default=list(strategies.STRATEGIES),
+        choices=list(strategies.STRATEGIES),
+    )
+    run_parser = subparsers.choices["run"]
+    run_parser.add_argument("--job", action="append", required=True)
+    run_parser.add_argument(
+        "--strategy",
+        default=strategies.DEFAULT_STRATEGY,
+        choices=list(strategies.STRATEGIES),
+    )
+    args = parser.parse_args()
+
+    options = {
+        "us_citizen": not args.not_us_citizen,
+        "security_clearance": args.security_clearance,
+        "use_cache": args.use_cache,
+    }
+    if args.command == "run":
+        pairs = strategies.make_pairs(args.resume, args.job)
+        results = strategies.run_strategies(
+            [args.strategy], pairs, options, args.concurrency
+        )
+        print_table(results[args.strategy])
+    else:
+        pairs = strategies.make_pairs(args.resume, list_jobs(args.jobs_dir, args.limit))
+        print(f"Comparing {args.strategies} over {len(pairs)} pairs")
+        results = strategies.run_strategies(
+            args.strategies, pairs, options, args.concurrency
+        )
+        summary = strategies.summarize(results)
+        agreement = strategies.agreement(results)
+        print_table(summary)
+        print()
+        print_table(agreement)
+        datestr = datetime.datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+        report_path = os.path.join(strategies.AB_WORK_DIR, f"report_{datestr}.json")
+        with open(report_path, "w") as f:
+            json.dump(
+                {
+                    "pairs": pairs,
+                    "options": options,
+                    # pairs scored concurrently within each strategy, the
+                    # strategies themselves run one after the other
+                    "concurrency": args.concurrency,
+                    "summary": summary,
+                    "agreement": agreement,
+                    "results": results,
+                },
+                f,
+                indent=4,
+            )
+        print(f"Report written to {report_path}")
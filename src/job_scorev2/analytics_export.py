@@ -0,0 +1,53 @@
+# Maintenance of the columnar analytics export of match results in
+# work/analytics (see lib/analytics.py). New results are exported
+# automatically; flush exports rows staged while pyarrow was missing or a write
+# failed, backfill the results cached before the export existed.
+# usage: python analytics_export.py flush|compact|backfill
+
+import argparse
+from dotenv import load_dotenv
+from lib import utils
+from lib import analytics
+from lib import results_db
+
+
+def backfill() -> int:
+    """Stage every cached match result, then flush them to the dataset."""
+    rows = [
+        analytics.match_row(
+            results_db.text_hash(resume_text),
+            results_db.text_hash(job_text),
+            us_citizen,
+            security_clearance,
+            record,
+            results_db.job_details(job_text),
+            origin="backfill",
+        )
+        for (
+            job_text,
+            resume_text,
+            us_citizen,
+            security_clearance,
+        ), record in utils.cache["match"].items()
+    ]
+    # staged and flushed in bulk: one part file per partition, not per row
+    analytics.stage_rows(rows)
+    analytics.flush()
+    return len(rows)
+
+
+if __name__ == "__main__":
+    load_dotenv()
+    parser = argparse.ArgumentParser(description="Match results analytics export")
+    parser.add_argument("command", choices=["flush", "compact", "backfill"])
+    args = parser.parse_args()
+
+    start = utils.currenttimemillis()
+    if args.command == "flush":
+        print(f"Flushed {analytics.flush()} staged rows")
+    elif args.command == "compact":
+        print(f"Compacted {analytics.compact()} partitions")
+    elif args.command == "backfill":
+        print(f"Exported {backfill()} cached match results")
+    end = utils.currenttimemillis()
+    print(f"{args.command} took {end - start} ms")
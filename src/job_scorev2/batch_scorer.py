@@ -0,0 +1,292 @@
+# Offline batch scoring of stored jobs against a pool of resumes, at provider
+# batch pricing. Results are hydrated into the match cache so the dashboard hits cache.
+# usage: python batch_scorer.py --resume <resume> [--provider openai|local]
+#        python batch_scorer.py --batch-id <id>  (poll and hydrate a submitted batch)
+#        python batch_scorer.py --pending        (every submitted, unhydrated batch)
+
+import argparse
+import glob
+import hashlib
+import json
+import os
+from dotenv import load_dotenv
+from lib import utils
+from lib import batch
+from lib import prompts
+from lib import llm_scheduler
+import crew_analyzer
+
+BATCH_WORK_DIR = "work/batches"
+# manifest states after which there is nothing left to poll or hydrate
+MANIFEST_DONE_STATES = ("hydrated", "failed", "expired", "cancelled")
+
+
+def pair_custom_id(cache_key: tuple) -> str:
+    return hashlib.sha256(json.dumps(cache_key).encode()).hexdigest()[:32]
+
+
+def batch_llm_options() -> dict:
+    """Model, temperature and response format of the HR crew's LLM."""
+    llm = crew_analyzer.hr_llm()
+    return {
+        "model": llm.model.split("/")[-1],
+        "temperature": llm.temperature,
+        "response_format": getattr(llm, "response_format", None),
+    }
+
+
+def build_pairs(
+    resume_sources: list[str],
+    job_sources: list[str],
+    us_citizen: bool,
+    security_clearance: str,
+    skip_cached: bool = True,
+) -> list[dict]:
+    """
+    Build the pair manifest for a batch.
+
+    Args:
+        resume_sources: Resume files (or text).
+        job_sources: Job files, urls (or text).
+        us_citizen: Whether the candidates are US citizens.
+        security_clearance: The candidates' security clearance.
+        skip_cached: Skip pairs that already have a cached hr result.
+
+    Returns:
+        list[dict]: One entry per pair with its custom_id, cache key and inputs.
+            The inputs are fitted like hr_analyzer_crew does: a long job is
+            replaced by its extracted requirements, the resume cut to the
+            sections relevant to the job.
+    """
+    resumes = [utils.extract_text_from_various_sources(r) for r in resume_sources]
+    jobs = []
+    for job_source in job_sources:
+        job_text = utils.extract_text_from_various_sources(job_source)
+        jobs.append((job_text, utils.identify_job_source(job_source, job_text)))
+    fitted_jobs = {}
+    pairs = []
+    for resume_text in resumes:
+        for job_text, job_details in jobs:
+            cache_key = crew_analyzer.hr_cache_key(
+                job_text, resume_text, us_citizen, security_clearance
+            )
+            if skip_cached and cache_key in utils.cache["match"]:
+                continue
+            if job_text not in fitted_jobs:
+                fitted_jobs[job_text] = crew_analyzer.fit_job_description(
+                    job_text, llm_scheduler.PRIORITY_BATCH
+                )
+            pairs.append(
+                {
+                    "custom_id": pair_custom_id(cache_key),
+                    "cache_key": cache_key,
+                    "job_details": job_details,
+                    "inputs": crew_analyzer.hr_inputs(
+                        fitted_jobs[job_text],
+                        resume_text,
+                        job_details,
+                        us_citizen,
+                        security_clearance,
+                    ),
+                }
+            )
+    return pairs
+
+
+def manifest_path(batch_name: str) -> str:
+    return os.path.join(BATCH_WORK_DIR, f"{batch_name}_manifest.json")
+
+
+def write_manifest(manifest: dict):
+    with open(manifest_path(manifest["batch_name"]), "w") as f:
+        json.dump(manifest, f)
+
+
+def load_manifest_by_name(batch_name: str) -> dict:
+    with open(manifest_path(batch_name)) as f:
+        return json.load(f)
+
+
+def load_manifests() -> list[dict]:
+    manifests = []
+    for path in sorted(glob.glob(manifest_path("*"))):
+        with open(path) as f:
+            manifest = json.load(f)
+        # manifests written before the batch id was recorded are plain pair lists
+        if isinstance(manifest, dict):
+            manifests.append(manifest)
+    return manifests
+
+
+def pending_batch_ids() -> list[str]:
+    """Submitted batches that were not hydrated (e.g. the poller died)."""
+    return [
+        manifest["batch_id"]
+        for manifest in load_manifests()
+        if manifest.get("batch_id") and manifest["status"] not in MANIFEST_DONE_STATES
+    ]
+
+
+def render_batch(
+    pairs: list[dict], llm_options: dict, batch_name: str, provider: str = "openai"
+) -> str:
+    """
+    Write the batch submission file and its manifest, return the file path.
+    llm_options are the batch_request_line model options (batch_llm_options).
+    """
+    request_lines = [
+        batch.batch_request_line(
+            pair["custom_id"],
+            messages=crew_analyzer.render_hr_messages(pair["inputs"]),
+            **llm_options,
+        )
+        for pair in pairs
+    ]
+    batch_file_path = os.path.join(BATCH_WORK_DIR, f"{batch_name}.jsonl")
+    batch.write_batch_file(batch_file_path, request_lines)
+    write_manifest(
+        {
+            "batch_name": batch_name,
+            "provider": provider,
+            "batch_id": None,
+            "status": "rendered",
+            "pairs": pairs,
+        }
+    )
+    return batch_file_path
+
+
+def hydrate_batch(client, batch_id: str, pairs: list[dict]) -> dict:
+    """
+    Hydrate finished batch results into the cache and artifact store.
+
+    Returns:
+        dict: custom_id -> (hr_result, save_path, crew_usage_metrics), the same
+            tuple hr_analyzer_crew returns.
+    """
+    results = client.results(batch_id)
+    hydrated = {}
+    for pair in pairs:
+        result = results.get(pair["custom_id"])
+        if result is None or result["error"] or result["content"] is None:
+            print(f"No result for pair {pair['custom_id']}: {result}")
+            continue
+        try:
+            hydrated[pair["custom_id"]] = crew_analyzer.hydrate_hr_result(
+                result["content"],
+                result["usage"],
+                pair["job_details"],
+                tuple(pair["cache_key"]),
+                crew_analyzer.render_hr_messages(pair["inputs"]),
+            )
+        except Exception as e:
+            # one bad completion must not lose the rest of a paid batch
+            print(f"Failed to hydrate pair {pair['custom_id']}: {e}")
+    print(f"Hydrated {len(hydrated)} of {len(pairs)} pairs from batch {batch_id}")
+    cached_ratio = prompts.cached_token_ratio([h[2] for h in hydrated.values()])
+    print(f"Batch {batch_id} cached prompt token ratio: {cached_ratio:.1%}")
+    return hydrated
+
+
+def run_batch(
+    resume_sources: list[str],
+    job_sources: list[str],
+    us_citizen: bool = True,
+    security_clearance: str = "None",
+    provider: str = "openai",
+    poll_interval: int = 60,
+    client=None,
+) -> dict:
+    pairs = build_pairs(resume_sources, job_sources, us_citizen, security_clearance)
+    if not pairs:
+        print("All pairs are already cached, nothing to do")
+        return {}
+    client = client or batch.get_batch_client(provider)
+    batch_name = f"hr_batch_{utils.currenttimemillis()}"
+    batch_file_path = render_batch(pairs, batch_llm_options(), batch_name, provider)
+    print(f"Rendered {len(pairs)} pairs into {batch_file_path}")
+    batch_id = client.submit(batch_file_path)
+    # recorded before polling, so recover_batch can pick the batch up if this
+    # process dies during the (up to 24h) wait
+    manifest = {**load_manifest_by_name(batch_name), "batch_id": batch_id}
+    manifest["status"] = "submitted"
+    write_manifest(manifest)
+    return poll_and_hydrate(client, manifest, poll_interval)
+
+
+def poll_and_hydrate(client, manifest: dict, poll_interval: int = 60) -> dict:
+    batch_id = manifest["batch_id"]
+    start = utils.currenttimemillis()
+    status = batch.poll_batch(client, batch_id, poll_interval)
+    end = utils.currenttimemillis()
+    print(f"Batch {batch_id} finished as {status} after {end - start} ms")
+    if status != "completed":
+        manifest["status"] = status
+        write_manifest(manifest)
+        return {}
+    hydrated = hydrate_batch(client, batch_id, manifest["pairs"])
+    manifest["status"] = "hydrated"
+    write_manifest(manifest)
+    return hydrated
+
+
+def recover_batch(batch_id: str, poll_interval: int = 60, client=None) -> dict:
+    """
+    Poll and hydrate a batch submitted earlier, from its manifest.
+
+    Args:
+        batch_id: The provider batch id recorded in the manifest.
+        poll_interval: Seconds between status polls.
+        client: The batch client, defaults to the manifest's provider.
+
+    Returns:
+        dict: Same as hydrate_batch.
+    """
+    manifests = [m for m in load_manifests() if m.get("batch_id") == batch_id]
+    if not manifests:
+        raise ValueError(f"No manifest for batch {batch_id} in {BATCH_WORK_DIR}")
+    manifest = manifests[0]
+    client = client or batch.get_batch_client(manifest["provider"])
+    print(f"Recovering batch {batch_id} ({len(manifest['pairs'])} pairs)")
+    return poll_and_hydrate(client, manifest, poll_interval)
+
+
+if __name__ == "__main__":
+    load_dotenv()
+    utils.make_work_dirs()
+    parser = argparse.ArgumentParser(description="Batch score stored jobs")
+    parser.add_argument("--resume", action="append")
+    parser.add_argument("--batch-id", help="poll and hydrate a submitted batch")
+    parser.add_argument(
+        "--pending",
+        action="store_true",
+        help="recover every submitted, unhydrated batch",
+    )
+    parser.add_argument("--jobs-dir", default=os.getenv("JOB_STORAGE_DIR"))
+    parser.add_argument("--provider", default="openai", choices=["openai", "local"])
+    parser.add_argument("--poll-interval", type=int, default=60)
+    parser.add_argument("--security-clearance", default="None")
+    parser.add_argument("--not-us-citizen", action="store_true")
+    args = parser.parse_args()
+
+    if args.batch_id or args.pending:
+        batch_ids = [args.batch_id] if args.batch_id else pending_batch_ids()
+        for batch_id in batch_ids:
+            recover_batch(batch_id, args.poll_interval)
+        if not batch_ids:
+            print("No pending batches")
+        raise SystemExit(0)
+    if not args.resume:
+        parser.error("--resume is required unless --batch-id or --pending is given")
+    job_sources = [
+        os.path.join(args.jobs_dir, f)
+        for f in utils.get_list_of_files_desc(args.jobs_dir)
+    ]
+    run_batch(
+        args.resume,
+        job_sources,
+        us_citizen=not args.not_us_citizen,
+        security_clearance=args.security_clearance,
+        provider=args.provider,
+        poll_interval=args.poll_interval,
+    )
@@ -0,0 +1,552 @@
+# Benchmark suite for the job_scorev2 pipeline.
+# usage: python benchmarks.py <benchmark> [options], see --help
+# LLM backed benchmarks make real provider calls and cost money.
+
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from dotenv import load_dotenv
+from lib import utils
+from lib import prompts
+from lib import records
+from lib import tokens
+from lib import skills
+from lib import job_index
+from lib import resume_retrieval
+from lib import compact_schema
+from lib.cache_manager import CacheManager
+from lib.report import percentile, print_table
+import crew_analyzer
+
+# startup budget of "import crew_analyzer" and the dependencies it must not
+# import eagerly (they load on first use, see crews.py and lib/utils.py)
+STARTUP_BUDGET_MS = int(os.getenv("STARTUP_BUDGET_MS", "1000"))
+LAZY_MODULES = ("crewai", "spacy", "google.genai", "markitdown", "bs4", "markdownify")
+# -X importtime stderr: "import time: <self us> | <cumulative us> | <indented name>"
+IMPORTTIME_PATTERN = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def load_job_corpus(jobs_dir: str, limit: int) -> list[tuple[str, dict]]:
+    job_files = utils.get_list_of_files_desc(jobs_dir)[:limit]
+    corpus = []
+    for job_file in job_files:
+        job_path = os.path.join(jobs_dir, job_file)
+        job_text = utils.extract_text_from_various_sources(job_path)
+        corpus.append((job_text, utils.identify_job_source(job_path, job_text)))
+    return corpus
+
+
+def bench_prefix_cache(args):
+    """
+    Score one resume against many jobs under each prompt layout and compare
+    latency, cached prompt token ratio and estimated cost.
+    """
+    resume_text = utils.extract_text_from_various_sources(args.resume)
+    corpus = load_job_corpus(args.jobs_dir, args.limit)
+    model = crew_analyzer.openai_llm.model.split("/")[-1]
+    rows = []
+    for layout in args.layouts:
+        prompts.match_layout = layout
+        latencies = []
+        usages = []
+        for job_text, job_details in corpus:
+            start = utils.currenttimemillis()
+            _, _, usage_metrics = crew_analyzer.hr_analyzer_crew(
+                job_text,
+                resume_text,
+                job_details,
+                True,
+                "None",
+                get_from_cache=False,
+            )
+            latencies.append(utils.currenttimemillis() - start)
+            usages.append(usage_metrics)
+        rows.append(
+            {
+                "layout": layout,
+                "calls": len(latencies),
+                "p50_ms": percentile(latencies, 50),
+                "p95_ms": percentile(latencies, 95),
+                "mean_ms": statistics.mean(latencies) if latencies else 0,
+                "prompt_tokens": sum(u["prompt_tokens"] for u in usages),
+                "cached_ratio": prompts.cached_token_ratio(usages),
+                "cost_usd": tokens.total_cost(usages, model),
+            }
+        )
+    print_table(rows)
+    if (
+        len(rows) == 2
+        and rows[0]["cost_usd"] is not None
+        and rows[1]["cost_usd"]
+        and rows[1]["mean_ms"]
+    ):
+        print(
+            f"{rows[0]['layout']} vs {rows[1]['layout']}: "
+            f"cost {1 - rows[0]['cost_usd'] / rows[1]['cost_usd']:.1%} lower, "
+            f"mean latency {1 - rows[0]['mean_ms'] / rows[1]['mean_ms']:.1%} lower"
+        )
+    return rows
+
+
+def _sample_match_record(i: int) -> dict:
+    skills = [f"skill_{i}_{n}" for n in range(20)]
+    data = {
+        "organization": f"Org {i}",
+        "years_of_experience": 5,
+        "job_summary": "Role summary text " * 20,
+        "matching_required_skills": skills[:10],
+        "missing_required_skills": skills[10:],
+        "matching_preferred_skills": skills[:5],
+        "missing_preferred_skills": skills[5:10],
+        "matching_certifications": [],
+        "missing_certifications": [],
+        "matching_security_clearances": [],
+        "missing_security_clearances": [],
+        "decision": "Pass",
+        "reason": "Score is above 70%",
+        "score": {"final_score": 0.75},
+    }
+    return records.make_record("match", data, f"hr_analysis_{i}.txt")
+
+
+def _time_lookups(lookup, keys) -> list[float]:
+    timings = []
+    for key in keys:
+        start = time.perf_counter()
+        lookup(key)
+        timings.append((time.perf_counter() - start) * 1_000_000)
+    return timings
+
+
+def bench_cache_hit(args):
+    """
+    Measure hit-path latency of the match cache: the old contains-then-get on
+    the backend tier, a single backend lookup, and a single lookup served by
+    the in-process LRU tier (disk backend only). --backend selects disk or a
+    redis url.
+    """
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache = CacheManager(cache_dir, ["match"], args.backend)
+        match_cache = cache["match"]
+        keys = [
+            (f"job text {i} " * 50, "resume text " * 100, True, "None")
+            for i in range(args.entries)
+        ]
+        for i, key in enumerate(keys):
+            match_cache[key] = _sample_match_record(i)
+
+        def contains_then_get(key):
+            backend = match_cache.backend
+            if backend.get(key) is not None:
+                return records.loads(backend.get(key))
+
+        def backend_get(key):
+            match_cache.memory.clear()
+            return match_cache.get(key)
+
+        paths = [
+            ("backend contains+get", contains_then_get),
+            ("backend get", backend_get),
+        ]
+        # the LRU tier is off in front of a shared redis backend
+        if match_cache.memory.max_entries:
+            paths.append(("memory get", match_cache.get))
+        rows = []
+        for name, lookup in paths:
+            # warm the tier being measured before timing it
+            _time_lookups(lookup, keys)
+            timings = _time_lookups(lookup, keys)
+            rows.append(
+                {
+                    "path": name,
+                    "lookups": len(timings),
+                    "p50_us": percentile(timings, 50),
+                    "p95_us": percentile(timings, 95),
+                    "mean_us": statistics.mean(timings),
+                }
+            )
+        print_table(rows)
+        if args.backend != "disk":
+            match_cache.clear()
+        return rows
+
+
+def bench_skill_scan(args):
+    """
+    Throughput of the LLM-free taxonomy scan of job texts: the Aho-Corasick
+    pass against one word-boundary regex search per alias.
+    """
+    corpus = [job_text for job_text, _ in load_job_corpus(args.jobs_dir, args.limit)]
+    patterns = [
+        re.compile(rf"(?<![a-z0-9]){re.escape(alias)}(?![a-z0-9])")
+        for alias in skills.taxonomy.alias_ids
+    ]
+
+    def regex_scan(text):
+        text = skills.normalize(text)
+        return [p for p in patterns if p.search(text)]
+
+    total_chars = sum(len(text) for text in corpus)
+    rows = []
+    for name, scan in (
+        ("aho-corasick", skills.taxonomy.scan),
+        ("regex per alias", regex_scan),
+    ):
+        start = time.perf_counter()
+        for text in corpus:
+            scan(text)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        rows.append(
+            {
+                "scanner": name,
+                "documents": len(corpus),
+                "chars": total_chars,
+                "total_ms": elapsed_ms,
+                "chars_per_ms": total_chars / elapsed_ms if elapsed_ms else 0,
+            }
+        )
+    print_table(rows)
+    return rows
+
+
+def bench_job_search(args):
+    """
+    Query latency of the stored job inverted index, built in a temp dir from
+    the stored jobs, replicated until it holds --min-postings postings.
+    """
+    corpus = [job_text for job_text, _ in load_job_corpus(args.jobs_dir, args.limit)]
+    if not corpus:
+        print("No stored jobs to index")
+        return []
+    with tempfile.TemporaryDirectory() as index_dir:
+        index = job_index.JobIndex(os.path.join(index_dir, "job_index.db"))
+        start = utils.currenttimemillis()
+        postings = 0
+        while postings < args.min_postings:
+            for job_text in corpus:
+                index.add_document(f"job_{postings}", job_text, time.time())
+                postings += len(set(job_index.tokenize(job_text)))
+        end = utils.currenttimemillis()
+        print(f"Indexed ~{postings} postings in {end - start} ms")
+        rows = []
+        for query in args.queries:
+            timings = []
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                matches = index.search(query)
+                timings.append((time.perf_counter() - start) * 1000)
+            rows.append(
+                {
+                    "query": query,
+                    "matches": len(matches),
+                    "p50_ms": percentile(timings, 50),
+                    "p95_ms": percentile(timings, 95),
+                }
+            )
+    print_table(rows)
+    return rows
+
+
+def bench_resume_retrieval(args):
+    """
+    Resume tokens saved by relevant-section retrieval at each token budget,
+    and (unless --no-llm) the prompt tokens, cost and score delta of the match
+    against the full resume (budget 0, always run first).
+    """
+    resume_text = utils.extract_text_from_various_sources(args.resume)
+    corpus = load_job_corpus(args.jobs_dir, args.limit)
+    model = crew_analyzer.openai_llm.model.split("/")[-1]
+    full_tokens = tokens.count_tokens(resume_text)
+    budgets = [0] + [budget for budget in args.budgets if budget]
+    baseline = {}
+    rows = []
+    for budget in budgets:
+        resume_retrieval.token_budget = budget
+        resume_tokens = []
+        usages = []
+        score_deltas = []
+        agreements = []
+        for i, (job_text, job_details) in enumerate(corpus):
+            resume_tokens.append(
+                tokens.count_tokens(
+                    resume_retrieval.select_relevant(resume_text, job_text)
+                )
+            )
+            if args.no_llm:
+                continue
+            hr_result, _, usage_metrics = crew_analyzer.hr_analyzer_crew(
+                job_text,
+                resume_text,
+                job_details,
+                True,
+                "None",
+                get_from_cache=False,
+            )
+            usages.append(usage_metrics)
+            result_json = crew_analyzer.result_to_json(hr_result)
+            score = result_json.get("score", {}).get("final_score", 0.0)
+            if budget == 0:
+                baseline[i] = (score, result_json.get("decision"))
+            else:
+                score_deltas.append(abs(score - baseline[i][0]))
+                agreements.append(result_json.get("decision") == baseline[i][1])
+        mean_resume_tokens = statistics.mean(resume_tokens) if resume_tokens else 0
+        row = {
+            "budget": budget or "full",
+            "jobs": len(resume_tokens),
+            "resume_tokens": mean_resume_tokens,
+            "resume_savings": (
+                1 - mean_resume_tokens / full_tokens if full_tokens else 0
+            ),
+        }
+        if not args.no_llm:
+            row["prompt_tokens"] = sum(u["prompt_tokens"] for u in usages)
+            row["cost_usd"] = tokens.total_cost(usages, model)
+            row["mean_abs_score_delta"] = (
+                statistics.mean(score_deltas) if score_deltas else 0.0
+            )
+            row["decision_agreement"] = (
+                sum(agreements) / len(agreements) if agreements else 1.0
+            )
+        rows.append(row)
+    print_table(rows)
+    return rows
+
+
+def _time_schema_call(kind: str, resume_text: str, job_text: str, job_details: dict):
+    start = utils.currenttimemillis()
+    if kind == "match":
+        result, _, usage_metrics = crew_analyzer.hr_analyzer_crew(
+            job_text, resume_text, job_details, True, "None", get_from_cache=False
+        )
+    else:
+        crew, result = crew_analyzer.run_extraction(
+            crew_analyzer.JobCrew,
+            "job_text",
+            job_text,
+            crew_analyzer.JobRequirements,
+        )
+        usage_metrics = crew.usage_metrics.__dict__
+    return utils.currenttimemillis() - start, usage_metrics, result.pydantic
+
+
+def bench_output_schema(args):
+    """
+    Completion tokens and latency per call of the compact output schema vs
+    the full one, for the match and job requirement calls, with the decision
+    agreement of the expanded compact match against the full match.
+    """
+    resume_text = utils.extract_text_from_various_sources(args.resume)
+    corpus = load_job_corpus(args.jobs_dir, args.limit)
+    rows = []
+    decisions = {}
+    for kind in args.calls:
+        for mode in args.modes:
+            compact_schema.schema_mode = mode
+            latencies = []
+            completion_tokens = []
+            parsed = 0
+            for i, (job_text, job_details) in enumerate(corpus):
+                latency, usage_metrics, model = _time_schema_call(
+                    kind, resume_text, job_text, job_details
+                )
+                latencies.append(latency)
+                completion_tokens.append(usage_metrics["completion_tokens"])
+                parsed += model is not None
+                if kind == "match" and model is not None:
+                    decisions.setdefault(i, {})[mode] = model.decision
+            rows.append(
+                {
+                    "call": kind,
+                    "mode": mode,
+                    "calls": len(latencies),
+                    "parsed": parsed,
+                    "p50_ms": percentile(latencies, 50),
+                    "p95_ms": percentile(latencies, 95),
+                    "mean_ms": statistics.mean(latencies) if latencies else 0,
+                    "mean_completion_tokens": (
+                        statistics.mean(completion_tokens) if completion_tokens else 0
+                    ),
+                }
+            )
+    print_table(rows)
+    compared = [d for d in decisions.values() if len(d) == len(args.modes) > 1]
+    if compared:
+        agreement = sum(len(set(d.values())) == 1 for d in compared) / len(compared)
+        print(f"match decision agreement across modes: {agreement:.1%}")
+    return rows
+
+
+def parse_importtime(stderr: str) -> list[dict]:
+    """The modules of a -X importtime report with their self/cumulative ms."""
+    rows = []
+    for line in stderr.splitlines():
+        match = IMPORTTIME_PATTERN.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            rows.append(
+                {
+                    "module": module,
+                    "depth": (len(indent) - 1) // 2,
+                    "self_ms": int(self_us) / 1000,
+                    "cumulative_ms": int(cumulative_us) / 1000,
+                }
+            )
+    return rows
+
+
+def bench_import_time(args):
+    """
+    Import-time profile of a module in fresh interpreters (-X importtime),
+    checked against the startup budget and the lazily imported modules.
+    Exits non-zero when the budget is exceeded or a lazy module is imported.
+    """
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    runs = []
+    for _ in range(args.repeat):
+        completed = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {args.module}"],
+            cwd=script_dir,
+            capture_output=True,
+            text=True,
+        )
+        if completed.returncode != 0:
+            print(completed.stderr.splitlines()[-1])
+            sys.exit(completed.returncode)
+        modules = parse_importtime(completed.stderr)
+        total = next(m for m in modules if m["module"] == args.module)
+        runs.append((total["cumulative_ms"], modules))
+    # the median run, the first one also pays for cold file caches
+    runs.sort(key=lambda run: run[0])
+    total_ms, modules = runs[len(runs) // 2]
+    top = sorted(modules, key=lambda m: m["cumulative_ms"], reverse=True)
+    print_table([m for m in top if m["depth"] <= args.depth][: args.top])
+    eager = sorted(
+        {
+            m["module"]
+            for m in modules
+            for lazy in LAZY_MODULES
+            if m["module"] == lazy or m["module"].startswith(f"{lazy}.")
+        }
+    )
+    print(
+        f"import {args.module}: {total_ms:.0f} ms median of {len(runs)} runs, "
+        f"budget {args.budget} ms"
+    )
+    failures = []
+    if total_ms > args.budget:
+        failures.append(f"over the startup budget by {total_ms - args.budget:.0f} ms")
+    if eager:
+        failures.append(f"imports lazy dependencies eagerly: {', '.join(eager)}")
+    if failures:
+        sys.exit(f"import {args.module} " + "; ".join(failures))
+    return top
+
+
+if __name__ == "__main__":
+    load_dotenv()
+    parser = argparse.ArgumentParser(description="job_scorev2 benchmarks")
+    subparsers = parser.add_subparsers(dest="benchmark", required=True)
+
+    prefix_parser = subparsers.add_parser(
+        "prefix-cache", help="prompt layout vs provider prompt caching"
+    )
+    prefix_parser.add_argument("--resume", default=os.getenv("DEFAULT_RESUME"))
+    prefix_parser.add_argument("--jobs-dir", default=os.getenv("JOB_STORAGE_DIR"))
+    prefix_parser.add_argument("--limit", type=int, default=10)
+    prefix_parser.add_argument(
+        "--layouts",
+        nargs="+",
+        default=["prefix_cache", "legacy"],
+        choices=list(prompts.MATCH_LAYOUTS),
+    )
+    prefix_parser.set_defaults(func=bench_prefix_cache)
+
+    cache_hit_parser = subparsers.add_parser(
+        "cache-hit", help="match cache hit-path latency per tier"
+    )
+    cache_hit_parser.add_argument("--entries", type=int, default=200)
+    cache_hit_parser.add_argument(
+        "--backend",
+        default="disk",
+        help='"disk" or the redis url of a scratch database (its match namespace is cleared)',
+    )
+    cache_hit_parser.set_defaults(func=bench_cache_hit)
+
+    skill_scan_parser = subparsers.add_parser(
+        "skill-scan", help="LLM-free skill taxonomy scan throughput"
+    )
+    skill_scan_parser.add_argument("--jobs-dir", default=os.getenv("JOB_STORAGE_DIR"))
+    skill_scan_parser.add_argument("--limit", type=int, default=500)
+    skill_scan_parser.set_defaults(func=bench_skill_scan)
+
+    job_search_parser = subparsers.add_parser(
+        "job-search", help="stored job inverted index query latency"
+    )
+    job_search_parser.add_argument("--jobs-dir", default=os.getenv("JOB_STORAGE_DIR"))
+    job_search_parser.add_argument("--limit", type=int, default=500)
+    job_search_parser.add_argument("--min-postings", type=int, default=100_000)
+    job_search_parser.add_argument("--repeat", type=int, default=20)
+    job_search_parser.add_argument(
+        "--queries",
+        nargs="+",
+        default=[
+            "python",
+            "kubernetes AND aws",
+            '"security clearance"',
+            "(python OR java) -contract",
+            "k8s",
+        ],
+    )
+    job_search_parser.set_defaults(func=bench_job_search)
+
+    retrieval_parser = subparsers.add_parser(
+        "resume-retrieval", help="resume section retrieval token savings vs score"
+    )
+    retrieval_parser.add_argument("--resume", default=os.getenv("DEFAULT_RESUME"))
+    retrieval_parser.add_argument("--jobs-dir", default=os.getenv("JOB_STORAGE_DIR"))
+    retrieval_parser.add_argument("--limit", type=int, default=10)
+    retrieval_parser.add_argument(
+        "--budgets", type=int, nargs="+", default=[1500, 1000, 600]
+    )
+    retrieval_parser.add_argument(
+        "--no-llm", action="store_true", help="only report resume token savings"
+    )
+    retrieval_parser.set_defaults(func=bench_resume_retrieval)
+
+    schema_parser = subparsers.add_parser(
+        "output-schema", help="compact vs full output schema completion tokens"
+    )
+    schema_parser.add_argument("--resume", default=os.getenv("DEFAULT_RESUME"))
+    schema_parser.add_argument("--jobs-dir", default=os.getenv("JOB_STORAGE_DIR"))
+    schema_parser.add_argument("--limit", type=int, default=10)
+    schema_parser.add_argument(
+        "--modes",
+        nargs="+",
+        default=list(compact_schema.SCHEMA_MODES),
+        choices=list(compact_schema.SCHEMA_MODES),
+    )
+    schema_parser.add_argument(
+        "--calls", nargs="+", default=["match", "job"], choices=["match", "job"]
+    )
+    schema_parser.set_defaults(func=bench_output_schema)
+
+    import_time_parser = subparsers.add_parser(
+        "import-time", help="module import-time profile and startup budget"
+    )
+    import_time_parser.add_argument("--module", default="crew_analyzer")
+    import_time_parser.add_argument("--budget", type=int, default=STARTUP_BUDGET_MS)
+    import_time_parser.add_argument("--repeat", type=int, default=5)
+    import_time_parser.add_argument("--top", type=int, default=25)
+    import_time_parser.add_argument(
+        "--depth", type=int, default=2, help="deepest import nesting shown"
+    )
+    import_time_parser.set_defaults(func=bench_import_time)
+
+    args = parser.parse_args()
+    args.func(args)
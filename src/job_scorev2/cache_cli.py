@@ -0,0 +1,142 @@
+# Maintenance commands for the namespaced result cache in work/cache.
+# migrate converts crew results cached by older versions (pickled CrewOutput
+# tuples in the flat work/cache database or in the namespace directories)
+# into records, once; it needs crewai installed to unpickle them.
+# usage: python cache_cli.py stats|compact|vacuum|clear [--namespace <ns>]
+#        python cache_cli.py migrate
+
+import argparse
+import json
+import os
+from diskcache import Cache
+from dotenv import load_dotenv
+from lib import utils
+from lib import records
+from lib import results_db
+
+RECORD_KINDS = ("resume", "job", "match")
+
+
+def get_namespaces(namespace: str = None) -> list:
+    if namespace:
+        return [utils.cache[namespace]]
+    return list(utils.cache.namespaces.values())
+
+
+def legacy_kind(key, value) -> str:
+    """The namespace of an entry of the flat pre-namespace cache, or None."""
+    if not isinstance(value, tuple):
+        # fetched page content, cheap to refetch
+        return None
+    if isinstance(key, tuple):
+        return "match"
+    return "job" if len(value) == 3 else "resume"
+
+
+def _store_legacy(kind: str, key, value) -> bool:
+    record = records.from_legacy(kind, value)
+    if record is None:
+        return False
+    if utils.cache[kind].get(key) is not None:
+        # cached again since, the legacy result is older
+        return True
+    utils.cache[kind][key] = record
+    if kind == "match":
+        job_record = utils.cache["job"].get(key[0])
+        job_details = job_record["meta"].get("job_details") if job_record else None
+        results_db.upsert_match(key, record, job_details or {})
+    return True
+
+
+def _migrate_directory(directory: str, kind_of) -> tuple[int, int]:
+    # read the pickles straight from the diskcache directory: the namespace
+    # codec treats them as misses
+    migrated = skipped = 0
+    legacy = Cache(directory)
+    try:
+        for key in list(legacy.iterkeys()):
+            try:
+                value = legacy.get(key)
+            except Exception as e:
+                # e.g. crewai missing, or a class that moved
+                print(f"Cannot unpickle {str(key)[:60]!r}: {e}")
+                skipped += 1
+                continue
+            if isinstance(value, bytes):
+                # already a record (or fetched content)
+                continue
+            kind = kind_of(key, value)
+            if kind is not None and _store_legacy(kind, key, value):
+                migrated += 1
+            else:
+                skipped += 1
+    finally:
+        legacy.close()
+    return migrated, skipped
+
+
+def migrate(directory: str = utils.cache.directory) -> dict:
+    """
+    Convert legacy pickled crew results into records, once.
+
+    Entries in the namespace directories are rewritten in place. The flat
+    database of the single pre-namespace cache is deleted afterwards, unless
+    some of its entries could not be converted.
+
+    Returns:
+        dict: Migrated and skipped entry counts.
+    """
+    migrated = skipped = 0
+    if utils.cache.backend_url in (None, "", "disk"):
+        for kind in RECORD_KINDS:
+            ns_dir = os.path.join(directory, kind)
+            if os.path.exists(os.path.join(ns_dir, "cache.db")):
+                counts = _migrate_directory(ns_dir, lambda key, value: kind)
+                migrated += counts[0]
+                skipped += counts[1]
+    if os.path.exists(os.path.join(directory, "cache.db")):
+        counts = _migrate_directory(directory, legacy_kind)
+        migrated += counts[0]
+        skipped += counts[1]
+        if not counts[1]:
+            legacy = Cache(directory)
+            legacy.clear()
+            legacy.close()
+            for suffix in ("", "-wal", "-shm"):
+                if os.path.exists(os.path.join(directory, "cache.db" + suffix)):
+                    os.remove(os.path.join(directory, "cache.db" + suffix))
+    return {"migrated": migrated, "skipped": skipped}
+
+
+if __name__ == "__main__":
+    load_dotenv()
+    parser = argparse.ArgumentParser(description="Result cache maintenance")
+    parser.add_argument(
+        "command", choices=["stats", "compact", "vacuum", "clear", "migrate"]
+    )
+    parser.add_argument(
+        "--namespace", choices=list(utils.cache.namespaces), default=None
+    )
+    args = parser.parse_args()
+
+    if args.command == "migrate":
+        start = utils.currenttimemillis()
+        print(json.dumps(migrate()))
+        end = utils.currenttimemillis()
+        print(f"migrate took {end - start} ms")
+        parser.exit()
+
+    for ns in get_namespaces(args.namespace):
+        start = utils.currenttimemillis()
+        if args.command == "stats":
+            print(json.dumps(ns.stats()))
+        elif args.command == "compact":
+            print(json.dumps(ns.compact()))
+        elif args.command == "vacuum":
+            before = ns.stats()["bytes"]
+            ns.vacuum()
+            print(f"{ns.namespace}: vacuumed {before} -> {ns.stats()['bytes']} bytes")
+        elif args.command == "clear":
+            print(f"{ns.namespace}: removed {ns.clear()} entries")
+        end = utils.currenttimemillis()
+        print(f"{args.command} {ns.namespace} took {end - start} ms")
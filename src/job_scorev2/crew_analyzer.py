@@ -1,19 +1,47 @@
+from __future__ import annotations
+
+import functools
+import importlib
 import os
-from crewai import Agent, Task, Crew
-from crewai.project import CrewBase, agent, crew, task
-from crewai.tools import BaseTool
-from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING
 from lib import utils
-from pydantic import BaseModel
-from crewai.llm import LLM
-from crewai.crews.crew_output import CrewOutput
+from lib import json_stream
+from lib import prompts
+from lib import tokens
+from lib import llm_scheduler
+from lib import near_dup
+from lib import records
+from lib import rescoring
+from lib import results_db
+from lib import analytics
+from lib import skills
+from lib import job_index
+from lib import resume_retrieval
+from lib import extraction_merge
+from lib import json_repair
+from lib import compact_schema
+from pydantic import ValidationError
+from lib.models import ResumeSkills, JobRequirements, JobVsResume
 import datetime
 import json
 
-openai_llm = LLM(
-    model="openai/gpt-4o",
-    api_key=os.getenv("OPENAI_API_KEY"),
-    temperature=0.0,  # Lower temperature for more consistent results.
+if TYPE_CHECKING:
+    from crewai import Crew
+    from crewai.crews.crew_output import CrewOutput
+
+# crewai and the crews / LLMs are imported on first use (crews.py), importing
+# this module must stay within STARTUP_BUDGET_MS (benchmarks.py import-time)
+CREW_ATTRIBUTES = (
+    "openai_llm",
+    "json_fix_llm",
+    "compact_llm",
+    "schema_agent_options",
+    "hr_llm",
+    "TextExtractor",
+    "ResumeCrew",
+    "JobCrew",
+    "HRCrew",
 )
 
 empty_crew_usage_metrics = {
@@ -24,163 +52,49 @@ empty_crew_usage_metrics = {
     "successful_requests": 0,
 }
 
+# documents above this many tokens are extracted in chunks (map-reduce)
+MAX_EXTRACTION_TOKENS = int(os.getenv("MAX_EXTRACTION_TOKENS", "12000"))
+EXTRACTION_CONCURRENCY = int(os.getenv("EXTRACTION_CONCURRENCY", "4"))
 
-# pydantic models for output
-class ResumeSkills(BaseModel):
-    resume_skills: list[str]
-    years_of_experience: int
-    certifications: list[str]
-    security_clearances: list[str]
-
-
-class JobRequirements(BaseModel):
-    organization: str
-    job_summary: str
-    years_of_experience: int
-    required_skills: list[str]
-    preferred_skills: list[str]
-    required_certifications: list[str]
-    required_security_clearances: list[str]
-
-
-class JobScore(BaseModel):
-    final_score: float
-    required_skill_match_score: float
-    preferred_skill_match_score: float
-    matching_required_skills_count: int
-    missing_required_skills_count: int
-    matching_preferred_skills_count: int
-    missing_preferred_skills_count: int
-    total_required_skills_count: int
-    total_preferred_skills_count: int
-    matching_certifications_count: int
-    missing_certifications_count: int
-    matching_security_clearances_count: int
-    missing_security_clearances_count: int
-
-
-class JobVsResume(BaseModel):
-    matching_required_skills: list[str]
-    missing_required_skills: list[str]
-    matching_preferred_skills: list[str]
-    missing_preferred_skills: list[str]
-    matching_certifications: list[str]
-    missing_certifications: list[str]
-    matching_security_clearances: list[str]
-    missing_security_clearances: list[str]
-    score: JobScore
-    organization: str
-    years_of_experience: int
-    job_summary: str
-    decision: str
-    reason: str
-
-
-# Tools for agents to use
-class TextExtractor(BaseTool):
-    def _run(self, text_source: str) -> str:
-        try:
-            if Path(text_source).exists():
-                if text_source.endswith(".pdf"):
-                    print(f"Extracting text from PDF: {text_source}")
-                    return utils.extract_text_from_pdf(text_source)
-                elif text_source.endswith(".txt"):
-                    print(f"Extracting text from TXT: {text_source}")
-                    return utils.extract_text_from_file(text_source)
-            elif text_source.startswith("http"):
-                print(f"Extracting text from URL: {text_source}")
-                return utils.get_text_from_url(text_source)
-            else:
-                return text_source
-        except Exception:
-            # exception is thrown if it is already text and Path will throw an exception
-            print("Assuming the text source is already raw text")
-            return text_source
-
+# expanders of compact extraction output into the full models
+EXTRACTION_EXPANDERS = {JobRequirements: compact_schema.expand_job}
 
-@CrewBase
-class ResumeCrew:
-    agents_config = "config/resume_agents.yaml"
-    tasks_config = "config/resume_tasks.yaml"
+# key of the final item yielded by hr_analyzer_crew_stream
+STREAM_RESULT_KEY = "__result__"
 
-    @agent
-    def resume_agent(self) -> Agent:
-        return Agent(
-            config=self.agents_config["resume_agent"],
-        )
 
-    @task
-    def resume_skill_analysis(self) -> Task:
-        return Task(
-            config=self.tasks_config["resume_skill_analysis"],
-            output_pydantic=ResumeSkills,
-        )
+@functools.lru_cache(maxsize=1)
+def get_job_text_index() -> near_dup.NearDuplicateIndex:
+    """Near-duplicate index of analyzed job texts (reposts, re-pasted variants)."""
+    return near_dup.NearDuplicateIndex(utils.cache["index"], "job")
 
-    @crew
-    def crew(self) -> Crew:
-        return Crew(
-            agents=self.agents,
-            tasks=self.tasks,
-            verbose=True,
-            llm=openai_llm,
-        )
 
+@functools.lru_cache(maxsize=1)
+def get_stored_job_index() -> job_index.JobIndex:
+    """Full text index of the stored jobs (work/job_index.db), opened on first use."""
+    return job_index.JobIndex(job_cache=utils.cache["job"])
 
-# CrewBase classes to pull from yaml config files
-@CrewBase
-class JobCrew:
-    agents_config = "config/job_agents.yaml"
-    tasks_config = "config/job_tasks.yaml"
 
-    @agent
-    def job_agent(self) -> Agent:
-        return Agent(
-            config=self.agents_config["job_agent"],
-        )
+def reused_usage_metrics(near_duplicate: dict) -> dict:
+    """Usage metrics of a result served from a near-duplicate cache entry."""
+    return {
+        **empty_crew_usage_metrics,
+        "reused_cache_entry": near_duplicate["label"],
+        "similarity": round(near_duplicate["similarity"], 3),
+    }
 
-    @task
-    def job_skill_analysis(self) -> Task:
-        return Task(
-            config=self.tasks_config["job_requirements_analysis"],
-            output_pydantic=JobRequirements,
-        )
 
-    @crew
-    def crew(self) -> Crew:
-        return Crew(
-            agents=self.agents,
-            tasks=self.tasks,
-            verbose=True,
-            llm=openai_llm,
-        )
+def load_crews():
+    """The crews module (crewai, the crew classes and LLMs), imported once."""
+    # a sibling module, resolved the same way as the "lib" imports above
+    return importlib.import_module("crews")
 
 
-@CrewBase
-class HRCrew:
-    agents_config = "config/hr_agents.yaml"
-    tasks_config = "config/hr_tasks.yaml"
-
-    @agent
-    def hr_agent(self) -> Agent:
-        return Agent(
-            config=self.agents_config["hr_agent"],
-        )
-
-    @task
-    def resume_to_job_match_analysis(self) -> Task:
-        return Task(
-            config=self.tasks_config["resume_to_job_match_analysis"],
-            # output_pydantic=JobVsResume,
-        )
-
-    @crew
-    def crew(self) -> Crew:
-        return Crew(
-            agents=self.agents,
-            tasks=self.tasks,
-            verbose=True,
-            llm=openai_llm,
-        )
+def __getattr__(name: str):
+    # crew_analyzer.openai_llm, crew_analyzer.JobCrew etc. load crews lazily
+    if name in CREW_ATTRIBUTES:
+        return getattr(load_crews(), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 # Helper functions
@@ -188,7 +102,7 @@ def result_to_json(result: CrewOutput) -> str:
     if result.pydantic is None:
         result_str = result.raw
         try:
-            result_json = json.loads(result_str)
+            result_json, _ = json_repair.loads(result_str)
             return result_json
         except Exception:
             return result_str
@@ -198,6 +112,45 @@ def result_to_json(result: CrewOutput) -> str:
         return result_json
 
 
+# cached results are compact versioned records (see lib/records.py), not
+# pickled CrewOutput objects
+def result_to_record(
+    kind: str, crew_result: CrewOutput, save_path: str, metadata: dict = None
+) -> dict:
+    result_json = result_to_json(crew_result)
+    data = result_json if isinstance(result_json, dict) else None
+    return records.make_record(kind, data, save_path, metadata, crew_result.raw)
+
+
+# extraction results whose skill lists are mapped onto the skill taxonomy
+CANONICAL_SKILL_KINDS = ("resume", "job")
+
+
+def record_to_result(record: dict) -> CrewOutput:
+    """Rebuild a lightweight CrewOutput (no task outputs) from a record."""
+    from crewai.crews.crew_output import CrewOutput
+    from crewai.types.usage_metrics import UsageMetrics
+
+    data = record["data"]
+    pydantic = records.to_model(record)
+    if record["kind"] in CANONICAL_SKILL_KINDS:
+        # records cached before the taxonomy existed hold raw skill strings
+        pydantic = skills.taxonomy.canonicalize_model(pydantic)
+    return CrewOutput(
+        raw=json.dumps(data) if data is not None else record.get("raw", ""),
+        pydantic=pydantic,
+        json_dict=data,
+        tasks_output=[],
+        token_usage=UsageMetrics(),
+    )
+
+
+def get_cached_record(namespace: str, key) -> dict:
+    """The cached record for key, or None on a miss or an unreadable entry."""
+    # single read-through lookup: in-process LRU, then disk
+    return utils.cache[namespace].get(key)
+
+
 # save crew output to file
 def save_resume_skill_analysis(
     crew_object: Crew, crew_result: CrewOutput, candidate_info: dict
@@ -220,7 +173,10 @@ def save_resume_skill_analysis(
 
 def get_job_file_name(crew_result: CrewOutput, job_details: dict):
     job_skill_analysis_result_json = result_to_json(crew_result)
-    job_org = job_skill_analysis_result_json.get("organization", "Unknown")
+    if not isinstance(job_skill_analysis_result_json, dict):
+        # unparseable output comes back as the raw string
+        job_skill_analysis_result_json = {}
+    job_org = job_skill_analysis_result_json.get("organization") or "Unknown"
     job_id = job_details.get("job_id", "Unknown")
     job_source = job_details.get("job_source", "Unknown")
     job_org = job_org.replace(" ", "_")
@@ -239,14 +195,34 @@ def save_job_requirements_analysis(
     return job_filename
 
 
-def save_job_text(job_text: str, crew_result: CrewOutput):
-    job_filename = get_job_file_name(crew_result)
+def save_job_text(job_text: str, crew_result: CrewOutput, job_details: dict):
+    job_filename = get_job_file_name(crew_result, job_details)
     job_storage_dir = os.getenv("JOB_STORAGE_DIR")
     with open(f"{job_storage_dir}/{job_filename}", "w") as f:
         f.write(job_text)
     return job_filename
 
 
+def store_pasted_job(job_text: str) -> tuple[str, dict]:
+    """
+    Store a pasted job posting once in JOB_STORAGE_DIR under its content id
+    and add it to the stored job index, so it shows up in the previous job
+    list, job search and the leaderboard like a fetched posting.
+
+    Returns:
+        tuple[str, dict]: The job file path and the job details.
+    """
+    job_details = utils.identify_job_source(job_text, job_text)
+    job_path = os.path.join(
+        os.getenv("JOB_STORAGE_DIR"), f"pasted_{job_details['job_id']}.txt"
+    )
+    if not os.path.exists(job_path):
+        with open(job_path, "w") as f:
+            f.write(job_text)
+        get_stored_job_index().add_document(job_path, job_text)
+    return job_path, job_details
+
+
 # save
 def save_result(
     crew_object: Crew, crew_result: CrewOutput, file_name: str, job_details: dict = None
@@ -281,9 +257,270 @@ def save_result(
     return file_name
 
 
+def save_batch_result(crew_result: CrewOutput, job_details: dict, messages: list):
+    """
+    Save a batch-scored job vs resume result in the same layout as save_result.
+
+    Args:
+        crew_result: The hydrated crew result.
+        job_details: The job details.
+        messages: The chat messages that were submitted in the batch.
+    """
+    file_name = "hr_batch_analysis_" + get_job_file_name(crew_result, job_details)
+    crew_output_storage_dir = os.getenv("CREW_OUTPUT_STORAGE_DIR")
+    with open(f"{crew_output_storage_dir}/{file_name}", "w") as f:
+        f.write("Crew Statistics\n")
+        f.write(json.dumps(crew_result.token_usage.model_dump(), indent=4))
+        f.write("\n")
+        f.write("---------\n")
+        for mesg in messages:
+            f.write(f"{mesg['role']}: {mesg['content']}\n")
+        f.write(f"Raw:\n{crew_result.raw}\n")
+        f.write("\n")
+        f.write("Job Details\n")
+        f.write(json.dumps(job_details, indent=4))
+        f.write("\n")
+    return file_name
+
+
+# LLM admission control
+# agent persona, task template and expected output around the inputs
+TASK_PROMPT_OVERHEAD_TOKENS = 1500
+EXPECTED_COMPLETION_TOKENS = 1000
+
+
+def estimate_crew_tokens(inputs: dict) -> int:
+    model = load_crews().openai_llm.model
+    input_tokens = sum(tokens.count_tokens(str(v), model) for v in inputs.values())
+    return input_tokens + TASK_PROMPT_OVERHEAD_TOKENS + EXPECTED_COMPLETION_TOKENS
+
+
+def kickoff_crew(
+    crew: Crew, inputs: dict, priority: int = llm_scheduler.PRIORITY_INTERACTIVE
+):
+    """
+    Kick off a crew through the central LLM scheduler.
+
+    The call waits for request/token admission on the model's rate limits and
+    rate limit errors are retried with backoff. Streaming crews are only
+    admitted, since a stream that already started cannot be replayed.
+
+    Args:
+        crew: The crew to kick off.
+        inputs: The crew inputs.
+        priority: llm_scheduler.PRIORITY_INTERACTIVE or PRIORITY_BATCH.
+
+    Returns:
+        CrewOutput (or CrewStreamingOutput for streaming crews).
+    """
+    model = load_crews().openai_llm.model
+    estimated_tokens = estimate_crew_tokens(inputs)
+    if crew.stream:
+        llm_scheduler.scheduler.admit(model, estimated_tokens, priority)
+        return crew.kickoff(inputs=inputs)
+    result = llm_scheduler.scheduler.run(
+        lambda: crew.kickoff(inputs=inputs), model, estimated_tokens, priority
+    )
+    llm_scheduler.scheduler.reconcile(
+        model, estimated_tokens, crew.usage_metrics.total_tokens
+    )
+    return result
+
+
+def run_extraction(
+    crew_class,
+    input_key: str,
+    text: str,
+    model_class,
+    priority: int = llm_scheduler.PRIORITY_INTERACTIVE,
+) -> tuple[Crew, CrewOutput]:
+    """
+    Run an extraction crew, map-reduce over chunks when text is too large.
+
+    Text over MAX_EXTRACTION_TOKENS is split into chunks that are extracted
+    in parallel and merged deterministically (lib/extraction_merge.py), so
+    oversized pages and resumes neither overflow the context nor serialize.
+
+    Args:
+        crew_class: ResumeCrew or JobCrew.
+        input_key: The crew input that holds the text.
+        text: The document text.
+        model_class: The output model, ResumeSkills or JobRequirements.
+        priority: The llm_scheduler priority of the crew calls.
+
+    Returns:
+        tuple[Crew, CrewOutput]: A crew carrying the summed usage metrics of
+            all chunk calls, and the (merged) result.
+    """
+    model = load_crews().openai_llm.model
+    if tokens.count_tokens(text, model) <= MAX_EXTRACTION_TOKENS:
+        crew = crew_class().crew()
+        result = kickoff_crew(crew, {input_key: text}, priority)
+        return crew, validate_extraction(result, model_class, priority)
+    from crewai.crews.crew_output import CrewOutput
+    from crewai.types.usage_metrics import UsageMetrics
+
+    chunks = tokens.split_text(text, MAX_EXTRACTION_TOKENS, model)
+    print(
+        f"{input_key} is over {MAX_EXTRACTION_TOKENS} tokens, "
+        f"extracting {len(chunks)} chunks"
+    )
+    crews = [crew_class().crew() for _ in chunks]
+    with ThreadPoolExecutor(max_workers=EXTRACTION_CONCURRENCY) as executor:
+        results = list(
+            executor.map(
+                lambda crew, chunk: validate_extraction(
+                    kickoff_crew(crew, {input_key: chunk}, priority),
+                    model_class,
+                    priority,
+                ),
+                crews,
+                chunks,
+            )
+        )
+    parts = [result.pydantic for result in results if result.pydantic is not None]
+    if not parts:
+        raise ValueError(f"None of the {len(chunks)} {input_key} chunks parsed")
+    merged = extraction_merge.MERGERS[model_class](parts)
+    usage_metrics = UsageMetrics()
+    for crew in crews:
+        usage_metrics.add_usage_metrics(crew.usage_metrics)
+    crews[0].usage_metrics = usage_metrics
+    return crews[0], CrewOutput(
+        raw=merged.model_dump_json(),
+        pydantic=merged,
+        json_dict=merged.model_dump(),
+        tasks_output=[task for result in results for task in result.tasks_output],
+        token_usage=usage_metrics,
+    )
+
+
+def fix_json_with_llm(
+    raw: str, model_class, priority: int = llm_scheduler.PRIORITY_INTERACTIVE
+) -> str:
+    """Ask the cheap json_fix_llm to rewrite raw as a valid model_class object."""
+    schema = json.dumps(model_class.model_json_schema())
+    messages = [
+        {
+            "role": "system",
+            "content": "Fix the malformed JSON the user sends. Reply with only "
+            "the corrected JSON object, keep every value, and follow this JSON "
+            f"schema:\n{schema}",
+        },
+        {"role": "user", "content": raw},
+    ]
+    fix_llm = load_crews().json_fix_llm
+    estimated_tokens = (
+        tokens.count_tokens(schema + raw, fix_llm.model) + EXPECTED_COMPLETION_TOKENS
+    )
+    return llm_scheduler.scheduler.run(
+        lambda: fix_llm.call(messages), fix_llm.model, estimated_tokens, priority
+    )
+
+
+def parse_llm_json(
+    raw: str,
+    model_class,
+    complete=None,
+    priority: int = llm_scheduler.PRIORITY_INTERACTIVE,
+    expand=None,
+):
+    """
+    Parse and validate LLM JSON output without re-running the analysis.
+
+    Malformed JSON is repaired locally (lib/json_repair.py) and validated
+    with coercion; fields derivable from the rest are filled by complete.
+    Only when that fails is the cheap fix call made. Every outcome is counted
+    in json_repair.stats().
+
+    Args:
+        raw: The raw completion text.
+        model_class: The pydantic model of the output.
+        complete: See json_repair.validate.
+        priority: The llm_scheduler priority of a fix call.
+        expand: Optional function turning a compact wire object into the
+            full model dict (lib/compact_schema.py), applied before
+            validation.
+
+    Returns:
+        The model instance, or None if the fix call failed or did not parse.
+    """
+    try:
+        data, repaired = json_repair.loads(raw)
+        if expand is not None:
+            data = expand(data)
+        try:
+            model = model_class.model_validate(data)
+        except ValidationError:
+            model = json_repair.validate(data, model_class, complete)
+            repaired = True
+        json_repair.count_outcome("repaired" if repaired else "clean")
+        if repaired:
+            print(f"Repaired malformed {model_class.__name__} output locally")
+        return model
+    except (json_repair.JSONRepairError, ValidationError) as e:
+        print(f"{model_class.__name__} output did not parse ({e}), asking for a fix")
+    try:
+        fixed = fix_json_with_llm(raw, model_class, priority)
+    except Exception as e:
+        # network, auth or rate limit errors must not discard the paid result
+        print(f"{model_class.__name__} fix call failed: {e}")
+        json_repair.count_outcome("failed")
+        return None
+    try:
+        data, _ = json_repair.loads(fixed)
+        if expand is not None:
+            data = expand(data)
+        model = json_repair.validate(data, model_class, complete)
+        json_repair.count_outcome("fixed_by_llm")
+        return model
+    except (json_repair.JSONRepairError, ValidationError) as e:
+        print(f"{model_class.__name__} fix call did not parse either: {e}")
+        json_repair.count_outcome("failed")
+        return None
+
+
+def validate_hr_result(
+    hr_result: CrewOutput, priority: int = llm_scheduler.PRIORITY_INTERACTIVE
+) -> CrewOutput:
+    """Attach the validated JobVsResume of a raw hr crew result."""
+    match = parse_llm_json(
+        hr_result.raw,
+        JobVsResume,
+        rescoring.complete_match,
+        priority,
+        compact_schema.expand_match,
+    )
+    if match is not None:
+        hr_result.pydantic = match
+        hr_result.json_dict = match.model_dump()
+    return hr_result
+
+
+def validate_extraction(
+    result: CrewOutput,
+    model_class,
+    priority: int = llm_scheduler.PRIORITY_INTERACTIVE,
+) -> CrewOutput:
+    """Attach the model of an extraction result crewai did not convert."""
+    if result.pydantic is None:
+        model = parse_llm_json(
+            result.raw,
+            model_class,
+            priority=priority,
+            expand=EXTRACTION_EXPANDERS.get(model_class),
+        )
+        if model is not None:
+            result.pydantic = model
+            result.json_dict = model.model_dump()
+    return result
+
+
 # Crew execution wrapper functions
 def resume_skill_analyzer_crew(
-    resume_source: str, get_from_cache: bool = True
+    resume_source: str,
+    get_from_cache: bool = True,
+    priority: int = llm_scheduler.PRIORITY_INTERACTIVE,
 ) -> tuple[CrewOutput, str, dict]:
     """
     Analyze the resume skills using the crew.
@@ -291,6 +528,7 @@ def resume_skill_analyzer_crew(
     Args:
         resume_source: The resume source.
         get_from_cache: Whether to get from cache.
+        priority: The llm_scheduler priority of the crew call.
 
     Returns:
         tuple[ResumeSkills, str, dict]: The resume skills, file name, and crew usage metrics.
@@ -299,36 +537,38 @@ def resume_skill_analyzer_crew(
     # extract name, email, phone number from resume text
     candidate_info = utils.nlp_parse_resume_get_name_email_phone(resume_text)
     print(candidate_info)
-    if get_from_cache and resume_text in utils.dc:
-        print("Using cached resume result")
-        cached_result = list(utils.dc[resume_text])
-        crew_usage_metrics = {
-            "total_tokens": 0,
-            "prompt_tokens": 0,
-            "cached_prompt_tokens": 0,
-            "completion_tokens": 0,
-            "successful_requests": 0,
-        }
-        cached_result.append(crew_usage_metrics)
-        return cached_result
-
-    resume_crew = ResumeCrew().crew()
+    if get_from_cache:
+        record = get_cached_record("resume", resume_text)
+        if record:
+            print("Using cached resume result")
+            return (
+                record_to_result(record),
+                record["save_path"],
+                empty_crew_usage_metrics,
+            )
+
     start = utils.currenttimemillis()
-    resume_result = resume_crew.kickoff(
-        inputs={"resume_text": resume_source},
+    resume_crew, resume_result = run_extraction(
+        load_crews().ResumeCrew, "resume_text", resume_text, ResumeSkills, priority
     )
+    skills.taxonomy.canonicalize_model(resume_result.pydantic)
     end = utils.currenttimemillis()
     print(f"Resume skill analysis took {end - start} ms")
     print("Caching result for resume")
     save_path = save_resume_skill_analysis(resume_crew, resume_result, candidate_info)
     crew_usage_metrics = resume_crew.usage_metrics.__dict__
 
-    utils.dc[resume_text] = resume_result, save_path
+    utils.cache["resume"][resume_text] = result_to_record(
+        "resume", resume_result, save_path
+    )
     return resume_result, save_path, crew_usage_metrics
 
 
 def job_requirements_analyzer_crew(
-    job_source: str, get_from_cache: bool = True
+    job_source: str,
+    get_from_cache: bool = True,
+    priority: int = llm_scheduler.PRIORITY_INTERACTIVE,
+    near_duplicate_threshold: float = None,
 ) -> tuple[CrewOutput, str, dict]:
     """
     Analyze the job requirements using the crew.
@@ -336,6 +576,9 @@ def job_requirements_analyzer_crew(
     Args:
         job_source: The job source.
         get_from_cache: Whether to get from cache.
+        priority: The llm_scheduler priority of the crew call.
+        near_duplicate_threshold: Similarity at which a cached near-duplicate
+            job text is reused, defaults to near_dup.DEFAULT_THRESHOLD.
 
     Returns:
         tuple[JobRequirements, str, dict]:
@@ -344,20 +587,30 @@ def job_requirements_analyzer_crew(
              crew usage metrics.
     """
     job_text = utils.extract_text_from_various_sources(job_source)
-    job_details = utils.identify_job_source(job_source)
+    job_details = utils.identify_job_source(job_source, job_text)
 
-    if get_from_cache and job_text in utils.dc:
-        print("Using cached job requirements result")
-        cached_result = list(utils.dc[job_text])
-        cached_result.append(empty_crew_usage_metrics)
-        return cached_result
+    if get_from_cache:
+        record = get_cached_record("job", job_text)
+        crew_usage_metrics = empty_crew_usage_metrics
+        if record is None:
+            near = get_job_text_index().lookup(job_text, near_duplicate_threshold)
+            if near:
+                record = get_cached_record("job", near["text"])
+                crew_usage_metrics = reused_usage_metrics(near)
+        if record:
+            print(f"Using cached job requirements result {record['save_path']}")
+            return (
+                record_to_result(record),
+                record["save_path"],
+                record["meta"]["job_details"],
+                crew_usage_metrics,
+            )
 
-    job_crew = JobCrew().crew()
-    input_data = {"job_text": job_text}
     start = utils.currenttimemillis()
-    job_result = job_crew.kickoff(
-        inputs=input_data,
+    job_crew, job_result = run_extraction(
+        load_crews().JobCrew, "job_text", job_text, JobRequirements, priority
     )
+    skills.taxonomy.canonicalize_model(job_result.pydantic)
     end = utils.currenttimemillis()
     print(f"Job requirements analysis took {end - start} ms")
     print("Caching result for job")
@@ -365,11 +618,233 @@ def job_requirements_analyzer_crew(
         job_crew, job_result, job_details, "job_requirements"
     )
     crew_usage_metrics = job_crew.usage_metrics.__dict__
-    save_job_text(job_text, job_result, job_details)
-    utils.dc[job_text] = job_result, save_path, job_details
+    job_filename = save_job_text(job_text, job_result, job_details)
+    utils.cache["job"][job_text] = result_to_record(
+        "job", job_result, save_path, {"job_details": job_details}
+    )
+    get_job_text_index().add(job_text, save_path)
+    get_stored_job_index().add_document(
+        os.path.join(os.getenv("JOB_STORAGE_DIR"), job_filename), job_text
+    )
     return job_result, save_path, job_details, crew_usage_metrics
 
 
+def hr_cache_key(
+    job_description: str, resume: str, us_citizen: bool, security_clearance: str
+) -> tuple:
+    return (job_description, resume, us_citizen, security_clearance)
+
+
+def hr_inputs(
+    job_description: str,
+    resume: str,
+    job_details: dict,
+    us_citizen: bool,
+    security_clearance: str,
+) -> dict:
+    # static instructions live in hr_tasks.yaml, the variable blocks are
+    # ordered resume then job so the provider prompt cache can hit
+    # with RESUME_TOKEN_BUDGET set only the resume sections relevant to the job
+    return prompts.assemble_match_inputs(
+        job_description,
+        resume_retrieval.select_relevant(resume, job_description),
+        job_details,
+        us_citizen,
+        security_clearance,
+    )
+
+
+def render_job_requirements(requirements: JobRequirements) -> str:
+    """A job posting text rebuilt from its extracted JobRequirements."""
+    lines = [
+        f"Organization: {requirements.organization}",
+        f"Summary: {requirements.job_summary}",
+        f"Years of experience: {requirements.years_of_experience}",
+    ]
+    for title, items in (
+        ("Required skills", requirements.required_skills),
+        ("Preferred skills", requirements.preferred_skills),
+        ("Required certifications", requirements.required_certifications),
+        ("Required security clearances", requirements.required_security_clearances),
+    ):
+        lines.append(f"{title}:")
+        lines.extend(f"- {item}" for item in items)
+    return "\n".join(lines)
+
+
+def fit_job_description(
+    job_description: str, priority: int = llm_scheduler.PRIORITY_INTERACTIVE
+) -> str:
+    """
+    The job text to send in the match prompt.
+
+    A job over MAX_EXTRACTION_TOKENS would crowd the resume out of the
+    context, so it is replaced by its requirements, extracted chunk-wise and
+    merged (and cached) by the job crew. The cache key of the match stays
+    the full job text.
+    """
+    model = load_crews().openai_llm.model
+    if tokens.count_tokens(job_description, model) <= MAX_EXTRACTION_TOKENS:
+        return job_description
+    job_result = job_requirements_analyzer_crew(job_description, priority=priority)[0]
+    if job_result.pydantic is None:
+        print(f"Job text is over {MAX_EXTRACTION_TOKENS} tokens, truncating it")
+        return tokens.split_text(job_description, MAX_EXTRACTION_TOKENS, model)[0]
+    print(
+        f"Job text is over {MAX_EXTRACTION_TOKENS} tokens, "
+        "matching against its extracted requirements"
+    )
+    return render_job_requirements(job_result.pydantic)
+
+
+def store_match_record(
+    cache_key: tuple,
+    record: dict,
+    job_details: dict,
+    usage_metrics: dict = None,
+    origin: str = "crew",
+):
+    """
+    Cache a match record, index its job text, add it to the results table and
+    stage it for the analytics export.
+    """
+    utils.cache["match"][cache_key] = record
+    get_job_text_index().add(cache_key[0], record["save_path"])
+    results_db.upsert_match(cache_key, record, job_details)
+    job_text, resume_text, us_citizen, security_clearance = cache_key
+    analytics.append_row(
+        analytics.match_row(
+            results_db.text_hash(resume_text),
+            results_db.text_hash(job_text),
+            us_citizen,
+            security_clearance,
+            record,
+            job_details,
+            usage_metrics,
+            origin,
+        )
+    )
+
+
+def _store_hr_result(
+    hr_crew: Crew, hr_result: CrewOutput, job_details: dict, cache_key: tuple
+) -> tuple[str, dict]:
+    print("Caching result for job vs resume")
+    save_path = save_job_requirements_analysis(
+        hr_crew, hr_result, job_details, "hr_analysis"
+    )
+    crew_usage_metrics = hr_crew.usage_metrics.__dict__
+    store_match_record(
+        cache_key,
+        result_to_record("match", hr_result, save_path),
+        job_details,
+        crew_usage_metrics,
+    )
+    return save_path, crew_usage_metrics
+
+
+def render_hr_messages(inputs: dict) -> list[dict]:
+    """Render the hr_tasks.yaml prompt for one pair outside of the crew."""
+    return prompts.render_task_messages(
+        "hr_agents.yaml",
+        "hr_tasks.yaml",
+        "hr_agent",
+        compact_schema.task_name("resume_to_job_match_analysis"),
+        inputs,
+    )
+
+
+def hydrate_hr_result(
+    raw: str, usage: dict, job_details: dict, cache_key: tuple, messages: list
+) -> tuple[CrewOutput, str, dict]:
+    """
+    Turn a raw completion (e.g. from a batch) into a cached hr result.
+
+    The result is stored in the match cache and the crew output storage dir exactly
+    like hr_analyzer_crew does, so later lookups are cache hits.
+
+    Args:
+        raw: The raw completion text.
+        usage: The provider usage dict of the completion.
+        job_details: The job details.
+        cache_key: The hr_cache_key of the pair.
+        messages: The chat messages that produced the completion.
+
+    Returns:
+        tuple[CrewOutput, str, dict]: Same shape as hr_analyzer_crew.
+    """
+    from crewai.crews.crew_output import CrewOutput
+    from crewai.types.usage_metrics import UsageMetrics
+
+    match = parse_llm_json(
+        raw,
+        JobVsResume,
+        rescoring.complete_match,
+        llm_scheduler.PRIORITY_BATCH,
+        compact_schema.expand_match,
+    )
+    json_dict = match.model_dump() if match is not None else None
+    if json_dict is not None:
+        raw = json.dumps(json_dict)
+    prompt_details = usage.get("prompt_tokens_details") or {}
+    token_usage = UsageMetrics(
+        total_tokens=usage.get("total_tokens", 0),
+        prompt_tokens=usage.get("prompt_tokens", 0),
+        cached_prompt_tokens=prompt_details.get("cached_tokens", 0),
+        completion_tokens=usage.get("completion_tokens", 0),
+        successful_requests=1,
+    )
+    hr_result = CrewOutput(
+        raw=raw,
+        pydantic=match,
+        json_dict=json_dict,
+        tasks_output=[],
+        token_usage=token_usage,
+    )
+    save_path = save_batch_result(hr_result, job_details, messages)
+    store_match_record(
+        cache_key,
+        result_to_record("match", hr_result, save_path),
+        job_details,
+        token_usage.model_dump(),
+        "batch",
+    )
+    return hr_result, save_path, token_usage.model_dump()
+
+
+def get_cached_hr_result(
+    job_description: str,
+    resume: str,
+    us_citizen: bool,
+    security_clearance: str,
+    near_duplicate_threshold: float = None,
+) -> list:
+    """
+    Look up a cached hr result for the pair, falling back to the cached result
+    of a near-duplicate job text scored against the same resume.
+
+    Returns:
+        list: [hr_result, save_path, crew_usage_metrics] or None on a miss.
+    """
+    cache_key = hr_cache_key(job_description, resume, us_citizen, security_clearance)
+    record = get_cached_record("match", cache_key)
+    if record:
+        print("Using cached hr result")
+        return [record_to_result(record), record["save_path"], empty_crew_usage_metrics]
+    near = get_job_text_index().lookup(job_description, near_duplicate_threshold)
+    if near:
+        near_key = hr_cache_key(near["text"], resume, us_citizen, security_clearance)
+        record = get_cached_record("match", near_key)
+        if record:
+            print(f"Using cached hr result of near-duplicate {near['label']}")
+            return [
+                record_to_result(record),
+                record["save_path"],
+                reused_usage_metrics(near),
+            ]
+    return None
+
+
 def hr_analyzer_crew(
     job_description: str,
     resume: str,
@@ -377,14 +852,26 @@ def hr_analyzer_crew(
     us_citizen: bool,
     security_clearance: str,
     get_from_cache: bool = True,
+    priority: int = llm_scheduler.PRIORITY_INTERACTIVE,
+    near_duplicate_threshold: float = None,
 ) -> tuple[CrewOutput, str, dict]:
     """
     Analyze the job vs resume using the crew.
 
+    A job text over MAX_EXTRACTION_TOKENS is matched against its extracted
+    requirements (fit_job_description) and, with RESUME_TOKEN_BUDGET set,
+    only the resume sections relevant to the job are sent (hr_inputs).
+
     Args:
-        job_source: The job source.
-        resume_source: The resume source.
+        job_description: The job text (also the cache key).
+        resume: The resume text (also the cache key).
+        job_details: The job details (job_source, job_id, job_url).
+        us_citizen: Whether the candidate is a US citizen.
+        security_clearance: The candidate's security clearance.
         get_from_cache: Whether to get from cache.
+        priority: The llm_scheduler priority of the crew call.
+        near_duplicate_threshold: Similarity at which the cached result of a
+            near-duplicate job text is reused.
 
     Returns:
         tuple[JobVsResume, str, dict]:
@@ -392,40 +879,249 @@ def hr_analyzer_crew(
              file name, and
              crew usage metrics.
     """
-    if (
-        get_from_cache
-        and (job_description, resume, us_citizen, security_clearance) in utils.dc
-    ):
-        print("Using cached hr result")
-        cached_result = list(
-            utils.dc[(job_description, resume, us_citizen, security_clearance)]
+    cache_key = hr_cache_key(job_description, resume, us_citizen, security_clearance)
+    if get_from_cache:
+        cached_result = get_cached_hr_result(
+            job_description,
+            resume,
+            us_citizen,
+            security_clearance,
+            near_duplicate_threshold,
         )
-        cached_result.append(empty_crew_usage_metrics)
-        return cached_result
-    input_data = {
-        "job_description": job_description,
-        "resume": resume,
-        "us_citizen": us_citizen,
-        "security_clearance": security_clearance,
-        "job_url": job_details.get("job_url", "Unknown"),
-        "job_id": job_details.get("job_id", "Unknown"),
-        "job_source": job_details.get("job_source", "Unknown"),
-    }
-    hr_crew = HRCrew().crew()
+        if cached_result:
+            return cached_result
+    input_data = hr_inputs(
+        fit_job_description(job_description, priority),
+        resume,
+        job_details,
+        us_citizen,
+        security_clearance,
+    )
+    hr_crew = load_crews().HRCrew().crew()
     start = utils.currenttimemillis()
-    hr_result = hr_crew.kickoff(
-        inputs=input_data,
+    hr_result = validate_hr_result(
+        kickoff_crew(hr_crew, input_data, priority), priority
     )
     end = utils.currenttimemillis()
     print(f"Job vs resume analysis took {end - start} ms")
-    print("Caching result for job vs resume")
-    save_path = save_job_requirements_analysis(
-        hr_crew, hr_result, job_details, "hr_analysis"
+    save_path, crew_usage_metrics = _store_hr_result(
+        hr_crew, hr_result, job_details, cache_key
     )
-    crew_usage_metrics = hr_crew.usage_metrics.__dict__
+    return hr_result, save_path, crew_usage_metrics
 
-    utils.dc[(job_description, resume, us_citizen, security_clearance)] = (
-        hr_result,
-        save_path,
+
+def hr_analyzer_crew_stream(
+    job_description: str,
+    resume: str,
+    job_details: dict,
+    us_citizen: bool,
+    security_clearance: str,
+    get_from_cache: bool = True,
+    priority: int = llm_scheduler.PRIORITY_INTERACTIVE,
+    near_duplicate_threshold: float = None,
+):
+    """
+    Streaming variant of hr_analyzer_crew.
+
+    Consumes the LLM token stream and incrementally parses the JobVsResume
+    JSON as it arrives, so callers can render each field as soon as it is
+    complete instead of waiting for the whole completion.
+
+    Args:
+        Same as hr_analyzer_crew.
+
+    Yields:
+        tuple[str, object]: (field name, value) for every top-level JobVsResume
+            field as it completes, followed by a final
+            (STREAM_RESULT_KEY, (hr_result, save_path, crew_usage_metrics))
+            carrying the same tuple hr_analyzer_crew returns.
+    """
+    cache_key = hr_cache_key(job_description, resume, us_citizen, security_clearance)
+    cached_result = None
+    if get_from_cache:
+        cached_result = get_cached_hr_result(
+            job_description,
+            resume,
+            us_citizen,
+            security_clearance,
+            near_duplicate_threshold,
+        )
+    if cached_result:
+        result_json = result_to_json(cached_result[0])
+        if isinstance(result_json, dict):
+            yield from result_json.items()
+        yield STREAM_RESULT_KEY, tuple(cached_result)
+        return
+
+    input_data = hr_inputs(
+        fit_job_description(job_description, priority),
+        resume,
+        job_details,
+        us_citizen,
+        security_clearance,
     )
-    return hr_result, save_path, crew_usage_metrics
+    hr_crew = load_crews().HRCrew().crew()
+    hr_crew.stream = True
+    parser = json_stream.IncrementalJSONParser()
+    start = utils.currenttimemillis()
+    first_field_ms = None
+    streaming_output = kickoff_crew(hr_crew, input_data, priority)
+    streamed_keys = set()
+    for chunk in streaming_output:
+        for key, value in parser.feed(chunk.content):
+            if first_field_ms is None:
+                first_field_ms = utils.currenttimemillis() - start
+                print(f"Job vs resume first field after {first_field_ms} ms")
+            key = compact_schema.MATCH_KEYS.get(key, key)
+            streamed_keys.add(key)
+            yield key, value
+    hr_result = validate_hr_result(streaming_output.result, priority)
+    # fields derived locally (the score and decision in compact mode)
+    for key, value in (hr_result.json_dict or {}).items():
+        if key not in streamed_keys:
+            yield key, value
+    end = utils.currenttimemillis()
+    print(f"Job vs resume analysis took {end - start} ms")
+    save_path, crew_usage_metrics = _store_hr_result(
+        hr_crew, hr_result, job_details, cache_key
+    )
+    yield STREAM_RESULT_KEY, (hr_result, save_path, crew_usage_metrics)
+
+
+def get_resume_skills(
+    resume_text: str, priority: int = llm_scheduler.PRIORITY_INTERACTIVE
+) -> ResumeSkills:
+    """The ResumeSkills of a resume text, from cache or the resume crew."""
+    resume_result, save_path, _ = resume_skill_analyzer_crew(
+        resume_text, priority=priority
+    )
+    if resume_result.pydantic is None:
+        raise ValueError(f"Resume skill analysis did not parse, see {save_path}")
+    return resume_result.pydantic
+
+
+def rescore_resume_matches(
+    old_resume: str,
+    new_resume: str,
+    jobs: list[dict],
+    us_citizen: bool,
+    security_clearance: str,
+    call_llm: bool = True,
+    priority: int = llm_scheduler.PRIORITY_BATCH,
+) -> list[dict]:
+    """
+    Re-score the cached job vs resume results of an edited resume.
+
+    The skill diff between the old and new resume is applied to each cached
+    result of the old resume and the score recomputed locally (see
+    lib/rescoring.py). Only pairs whose decision could flip go through the
+    HR crew again. Results are cached under the new resume's key.
+
+    Args:
+        old_resume: The previous resume text.
+        new_resume: The edited resume text.
+        jobs: {"text", "path"} of the stored jobs to re-score.
+        us_citizen: Whether the candidate is a US citizen.
+        security_clearance: The candidate's security clearance.
+        call_llm: Run the HR crew for pairs that need it, otherwise only
+            report them.
+        priority: The llm_scheduler priority of the crew calls.
+
+    Returns:
+        list[dict]: One row per job with its status, decision and reason.
+    """
+    start = utils.currenttimemillis()
+    diff = rescoring.skill_diff(
+        get_resume_skills(old_resume, priority), get_resume_skills(new_resume, priority)
+    )
+    print(f"Resume diff: {diff}")
+    rows = []
+    for job in jobs:
+        row = {"job": job["path"], "status": "", "decision": None, "reason": None}
+        rows.append(row)
+        new_key = hr_cache_key(job["text"], new_resume, us_citizen, security_clearance)
+        record = get_cached_record(
+            "match",
+            hr_cache_key(job["text"], old_resume, us_citizen, security_clearance),
+        )
+        cached_match = records.to_model(record) if record else None
+        if cached_match is None:
+            row["status"] = "no baseline"
+            continue
+        job_details = utils.identify_job_source(job["path"], job["text"])
+        if rescoring.is_empty_diff(diff):
+            store_match_record(new_key, record, job_details, origin="rescore")
+            row.update(status="unchanged", decision=cached_match.decision)
+            continue
+        rescored, llm_reason = rescoring.rescore_match(cached_match, diff)
+        if llm_reason is None:
+            store_match_record(
+                new_key,
+                records.make_record(
+                    "match",
+                    rescored.model_dump(),
+                    record["save_path"],
+                    {"rescored_from": record["save_path"]},
+                ),
+                job_details,
+                origin="rescore",
+            )
+            row.update(
+                status="local", decision=rescored.decision, reason=rescored.reason
+            )
+        elif call_llm:
+            hr_result, _, _ = hr_analyzer_crew(
+                job["text"],
+                new_resume,
+                job_details,
+                us_citizen,
+                security_clearance,
+                get_from_cache=False,
+                priority=priority,
+            )
+            result_json = result_to_json(hr_result)
+            decision = (
+                result_json.get("decision") if isinstance(result_json, dict) else None
+            )
+            row.update(status="llm", decision=decision, reason=llm_reason)
+        else:
+            row.update(status="needs llm", reason=llm_reason)
+    end = utils.currenttimemillis()
+    statuses = {}
+    for row in rows:
+        statuses[row["status"]] = statuses.get(row["status"], 0) + 1
+    print(f"Re-scored {len(rows)} jobs in {end - start} ms: {statuses}")
+    return rows
+
+
+def unscored_jobs(
+    resume_text: str, jobs: list[dict], us_citizen: bool, security_clearance: str
+) -> list[dict]:
+    """
+    The stored jobs without a result for the resume in the results table.
+
+    Jobs with a cached match result that predates the results table are
+    added to it on the way, so only jobs that really need scoring are returned.
+
+    Args:
+        resume_text: The resume text.
+        jobs: {"text", "path"} of the stored jobs.
+        us_citizen: Whether the candidate is a US citizen.
+        security_clearance: The candidate's security clearance.
+    """
+    scored = results_db.scored_job_hashes(resume_text, us_citizen, security_clearance)
+    unscored = []
+    for job in jobs:
+        if results_db.text_hash(job["text"]) in scored:
+            continue
+        cache_key = hr_cache_key(
+            job["text"], resume_text, us_citizen, security_clearance
+        )
+        record = get_cached_record("match", cache_key)
+        if record:
+            results_db.upsert_match(
+                cache_key, record, utils.identify_job_source(job["path"], job["text"])
+            )
+        else:
+            unscored.append(job)
+    return unscored
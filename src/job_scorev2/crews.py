@@ -0,0 +1,159 @@
+# Crew and LLM definitions. Importing crewai (and constructing its LLM
+# clients) dominates process startup, so crew_analyzer imports this module on
+# first use only (see crew_analyzer.load_crews and benchmarks.py import-time).
+
+import os
+from crewai import Agent, Task, Crew
+from crewai.project import CrewBase, agent, crew, task
+from crewai.tools import BaseTool
+from crewai.llm import LLM
+from pathlib import Path
+from lib import utils
+from lib import compact_schema
+from lib.models import ResumeSkills, JobRequirements
+
+openai_llm = LLM(
+    model="openai/gpt-4o",
+    api_key=os.getenv("OPENAI_API_KEY"),
+    temperature=0.0,  # Lower temperature for more consistent results.
+)
+
+# cheap model for the last-resort "fix this JSON" call on unparseable output
+json_fix_llm = LLM(
+    model=os.getenv("JSON_FIX_MODEL", "openai/gpt-4o-mini"),
+    api_key=os.getenv("OPENAI_API_KEY"),
+    temperature=0.0,
+)
+
+# OUTPUT_SCHEMA_MODE=compact calls answer in provider JSON mode
+compact_llm = LLM(
+    model=openai_llm.model,
+    api_key=os.getenv("OPENAI_API_KEY"),
+    temperature=0.0,
+    response_format=compact_schema.JSON_RESPONSE_FORMAT,
+)
+
+
+def hr_llm() -> LLM:
+    """The LLM settings of HR match calls, also used for their batch requests."""
+    return compact_llm if compact_schema.is_compact() else openai_llm
+
+
+def schema_agent_options() -> dict:
+    """Agent options of the current output schema mode (lib/compact_schema.py)."""
+    return {"llm": compact_llm} if compact_schema.is_compact() else {}
+
+
+# Tools for agents to use
+class TextExtractor(BaseTool):
+    def _run(self, text_source: str) -> str:
+        try:
+            if Path(text_source).exists():
+                if text_source.endswith(".pdf"):
+                    print(f"Extracting text from PDF: {text_source}")
+                    return utils.extract_text_from_pdf(text_source)
+                elif text_source.endswith(".txt"):
+                    print(f"Extracting text from TXT: {text_source}")
+                    return utils.extract_text_from_file(text_source)
+            elif text_source.startswith("http"):
+                print(f"Extracting text from URL: {text_source}")
+                return utils.get_text_from_url(text_source)
+            else:
+                return text_source
+        except Exception:
+            # exception is thrown if it is already text and Path will throw an exception
+            print("Assuming the text source is already raw text")
+            return text_source
+
+
+@CrewBase
+class ResumeCrew:
+    agents_config = "config/resume_agents.yaml"
+    tasks_config = "config/resume_tasks.yaml"
+
+    @agent
+    def resume_agent(self) -> Agent:
+        return Agent(
+            config=self.agents_config["resume_agent"],
+        )
+
+    @task
+    def resume_skill_analysis(self) -> Task:
+        return Task(
+            config=self.tasks_config["resume_skill_analysis"],
+            output_pydantic=ResumeSkills,
+        )
+
+    @crew
+    def crew(self) -> Crew:
+        return Crew(
+            agents=self.agents,
+            tasks=self.tasks,
+            verbose=True,
+            llm=openai_llm,
+        )
+
+
+# CrewBase classes to pull from yaml config files
+@CrewBase
+class JobCrew:
+    agents_config = "config/job_agents.yaml"
+    tasks_config = "config/job_tasks.yaml"
+
+    @agent
+    def job_agent(self) -> Agent:
+        return Agent(
+            config=self.agents_config["job_agent"],
+            **schema_agent_options(),
+        )
+
+    @task
+    def job_skill_analysis(self) -> Task:
+        # compact output is expanded locally (crew_analyzer.validate_extraction),
+        # crewai's converter would re-ask for the full schema
+        return Task(
+            config=self.tasks_config[
+                compact_schema.task_name("job_requirements_analysis")
+            ],
+            output_pydantic=None if compact_schema.is_compact() else JobRequirements,
+        )
+
+    @crew
+    def crew(self) -> Crew:
+        return Crew(
+            agents=self.agents,
+            tasks=self.tasks,
+            verbose=True,
+            llm=openai_llm,
+        )
+
+
+@CrewBase
+class HRCrew:
+    agents_config = "config/hr_agents.yaml"
+    tasks_config = "config/hr_tasks.yaml"
+
+    @agent
+    def hr_agent(self) -> Agent:
+        return Agent(
+            config=self.agents_config["hr_agent"],
+            **schema_agent_options(),
+        )
+
+    @task
+    def resume_to_job_match_analysis(self) -> Task:
+        return Task(
+            config=self.tasks_config[
+                compact_schema.task_name("resume_to_job_match_analysis")
+            ],
+            # output_pydantic=JobVsResume,
+        )
+
+    @crew
+    def crew(self) -> Crew:
+        return Crew(
+            agents=self.agents,
+            tasks=self.tasks,
+            verbose=True,
+            llm=openai_llm,
+        )
@@ -1,11 +1,15 @@
 import streamlit as st
 import os
 import traceback
-import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from job_scorev2 import crew_analyzer
-from job_scorev2.lib import utils
+from job_scorev2 import batch_scorer
+
+# the same "lib" crew_analyzer imports: as job_scorev2.lib it would be a second
+# module with its own cache manager (memory tier and stats)
+from lib import utils
 from dotenv import load_dotenv
-from datetime import datetime
 
 # TODO: select a previous uploaded job from jobs.
 # TODO: Check for failure to access/download the job url and inform user.
@@ -25,6 +29,10 @@ if "initialized" not in st.session_state:
         st.session_state.resume_storage_dir = resume_storage_dir
         st.session_state.job_storage_dir = job_storage_dir
         st.session_state.crew_output_storage_dir = crew_output_storage_dir
+        # index jobs stored since the last run for the sidebar search
+        crew_analyzer.get_stored_job_index().sync(
+            job_storage_dir, utils.extract_text_from_various_sources
+        )
 
 st.set_page_config(page_title="Resume Job Scorer", layout="wide")
 
@@ -42,8 +50,397 @@ def display_usage_metrics(usage_metrics):
     )
 
 
+def display_decision_complete(final_decision_path, usage_metrics):
+    col_final_decision1, col_final_decision2 = st.columns([0.8, 0.2])
+    with col_final_decision1:
+        st.success(
+            f"**Final decision complete!**  \n"
+            f"Decision analysis saved to: `{final_decision_path}`"
+        )
+        if usage_metrics.get("reused_cache_entry"):
+            st.info(
+                f"Reused the cached result of a near-duplicate posting: "
+                f"`{usage_metrics['reused_cache_entry']}` "
+                f"(similarity {usage_metrics['similarity']:.0%})"
+            )
+    with col_final_decision2:
+        display_usage_metrics(usage_metrics)
+
+
+# -- result sections --
+# Each section renders from a (possibly partial) result dict, so the same code
+# serves the blocking path and the streaming path.
+JOB_CARD_FIELDS = ("organization", "job_summary")
+SKILLS_FIELDS = (
+    "matching_required_skills",
+    "missing_required_skills",
+    "matching_preferred_skills",
+    "missing_preferred_skills",
+)
+DECISION_FIELDS = ("decision", "reason")
+SCORE_FIELDS = ("score",)
+
+
+def render_job_card(result_json):
+    # Job Details
+    org = result_json.get("organization")
+    job_summary = result_json.get("job_summary")
+
+    st.write(
+        f"""
+        <div style="padding: 15px; border: 1px solid #ddd; border-radius: 8px; background-color: #f9f9f9; margin-bottom: 15px;">
+            <h3 style="margin-top: 0; color: #333;">{org}</h3>
+            <p style="margin-bottom: 10px;"><strong>Role Summary:</strong> {job_summary}</p>
+        </div>
+        """,
+        unsafe_allow_html=True,
+    )
+
+
+def render_decision(result_json):
+    decision = result_json.get("decision")
+    reason = result_json.get("reason")
+    st.subheader("Resume vs Job Decision")
+    if decision == "Pass":
+        st.success(f"Candidate resume is a good fit for the Job! Reason: {reason}")
+    else:
+        st.error(f"Candidate resume is not a good fit for the Job! Reason: {reason}")
+
+
+def render_score(result_json):
+    # Score Section
+    if "score" in result_json:
+        score_data = result_json["score"]
+        final_score = score_data.get("final_score", 0)
+        percentage = final_score * 100
+
+        # Color coding
+        if percentage >= 80:
+            color = "green"
+        elif percentage >= 50:
+            color = "orange"  # Streamlit uses orange for warning/yellowish
+        else:
+            color = "red"
+
+        st.markdown(
+            f"""
+            <div style="text-align: center; padding: 20px; border-radius: 10px; background-color: #f0f2f6;">
+                <h2>Match Score</h2>
+                <h1 style="color: {color}; font-size: 72px;">{percentage:.1f}%</h1>
+            </div>
+        """,
+            unsafe_allow_html=True,
+        )
+        st.markdown("### 📊 Skills Analysis")
+        # Detailed Score Metrics
+        col1, col2 = st.columns(2)
+        with col1:
+            st.metric(
+                "Required Skills Match",
+                f"{score_data.get('required_skill_match_score', 0) * 100:.1f}%",
+            )
+            st.text(
+                f"Matched: {score_data.get('matching_required_skills_count', 0)} / {score_data.get('total_required_skills_count', 0)}"
+            )
+        with col2:
+            st.metric(
+                "Preferred Skills Match",
+                f"{score_data.get('preferred_skill_match_score', 0) * 100:.1f}%",
+            )
+            st.text(
+                f"Matched: {score_data.get('matching_preferred_skills_count', 0)} / {score_data.get('total_preferred_skills_count', 0)}"
+            )
+
+    else:
+        st.warning("Score data not found in the output.")
+
+
+def render_skills(result_json):
+    # Skills Breakdown
+    col3, col4 = st.columns(2)
+
+    with col3:
+        if (
+            "missing_required_skills" in result_json
+            and result_json["missing_required_skills"]
+        ):
+            skills_list = "\n".join(
+                [f"- {skill}" for skill in result_json["missing_required_skills"]]
+            )
+            st.error(f"**Missing:**\n\n{skills_list}")
+        st.subheader("Required Skills")
+        if (
+            "matching_required_skills" in result_json
+            and result_json["matching_required_skills"]
+        ):
+            skills_list = "\n".join(
+                [f"- {skill}" for skill in result_json["matching_required_skills"]]
+            )
+            st.success(f"**Matching:**\n\n{skills_list}")
+
+    with col4:
+        if (
+            "missing_preferred_skills" in result_json
+            and result_json["missing_preferred_skills"]
+        ):
+            skills_list = "\n".join(
+                [f"- {skill}" for skill in result_json["missing_preferred_skills"]]
+            )
+            st.error(f"**Missing:**\n\n{skills_list}")
+        st.subheader("Preferred Skills")
+        if (
+            "matching_preferred_skills" in result_json
+            and result_json["matching_preferred_skills"]
+        ):
+            skills_list = "\n".join(
+                [f"- {skill}" for skill in result_json["matching_preferred_skills"]]
+            )
+            st.success(f"**Matching:**\n\n{skills_list}")
+
+
+def render_streamed_analysis(
+    job_text,
+    resume_text,
+    job_details,
+    us_citizen,
+    security_clearance,
+    job_caching,
+    near_duplicate_threshold,
+):
+    """
+    Render each result section as soon as its fields arrive from the stream.
+    """
+    status_placeholder = st.empty()
+    st.header("Analysis Results")
+    # placeholders are laid out in display order, filled in arrival order
+    sections = [
+        (JOB_CARD_FIELDS, render_job_card, st.empty()),
+        (DECISION_FIELDS, render_decision, st.empty()),
+        (SCORE_FIELDS, render_score, st.empty()),
+    ]
+    st.divider()
+    sections.append((SKILLS_FIELDS, render_skills, st.empty()))
+    rendered = set()
+    result_json = {}
+    start = utils.currenttimemillis()
+    with status_placeholder.container():
+        with st.spinner("Streaming Job vs Resume analysis..."):
+            for key, value in crew_analyzer.hr_analyzer_crew_stream(
+                job_text,
+                resume_text,
+                job_details,
+                us_citizen,
+                security_clearance,
+                job_caching,
+                near_duplicate_threshold=near_duplicate_threshold,
+            ):
+                if key == crew_analyzer.STREAM_RESULT_KEY:
+                    _, final_decision_path, usage_metrics = value
+                    break
+                result_json[key] = value
+                for fields, render, placeholder in sections:
+                    if fields in rendered:
+                        continue
+                    if all(field in result_json for field in fields):
+                        with placeholder.container():
+                            render(result_json)
+                        rendered.add(fields)
+                        print(
+                            f"Rendered {fields[0]} section after "
+                            f"{utils.currenttimemillis() - start} ms"
+                        )
+    with status_placeholder.container():
+        display_decision_complete(final_decision_path, usage_metrics)
+    # render whatever the stream could not complete (e.g. malformed output)
+    for fields, render, placeholder in sections:
+        if fields not in rendered:
+            with placeholder.container():
+                render(result_json)
+    st.divider()
+
+
+# -- leaderboard --
+LEADERBOARD_ORDER = {
+    "final_score": "Final score",
+    "required_skill_match_score": "Required skill score",
+    "decision": "Decision",
+    "organization": "Organization",
+}
+LEADERBOARD_COLUMNS = [
+    "organization",
+    "final_score",
+    "required_skill_match_score",
+    "decision",
+    "job_source",
+    "required_clearances",
+    "job_url",
+    "reason",
+]
+
+
+@st.cache_data
+def load_resume_text(resume_path, mtime):
+    # mtime is part of the cache key so an edited resume is re-extracted
+    return utils.extract_text_from_various_sources(resume_path)
+
+
+def render_leaderboard(resume_path, us_citizen, security_clearance):
+    st.header("Job Leaderboard")
+    if resume_path is None:
+        st.warning("Select a stored resume to see its leaderboard.")
+        return
+    results_db = crew_analyzer.results_db
+    resume_text = load_resume_text(resume_path, os.path.getmtime(resume_path))
+    filter_values = results_db.filter_values(resume_text)
+    col_order, col_direction, col_source, col_clearance = st.columns(4)
+    order_by = col_order.selectbox(
+        "Sort by", list(LEADERBOARD_ORDER), format_func=LEADERBOARD_ORDER.get
+    )
+    direction = col_direction.selectbox("Order", ["Descending", "Ascending"])
+    sources = col_source.multiselect("Source", filter_values["sources"])
+    clearance = col_clearance.selectbox(
+        "Required clearance", ["Any", "None required"] + filter_values["clearances"]
+    )
+    start = utils.currenttimemillis()
+    rows = results_db.leaderboard(
+        resume_text,
+        us_citizen,
+        security_clearance,
+        sources=sources,
+        clearance={"Any": None, "None required": ""}.get(clearance, clearance),
+        order_by=order_by,
+        descending=direction == "Descending",
+    )
+    end = utils.currenttimemillis()
+    st.caption(f"{len(rows)} scored jobs, loaded in {end - start} ms")
+    st.dataframe(
+        rows,
+        column_order=LEADERBOARD_COLUMNS,
+        column_config={
+            "final_score": st.column_config.ProgressColumn(
+                "Final score", min_value=0.0, max_value=1.0, format="percent"
+            ),
+            "required_skill_match_score": st.column_config.ProgressColumn(
+                "Required skills", min_value=0.0, max_value=1.0, format="percent"
+            ),
+            "job_url": st.column_config.LinkColumn("Job URL"),
+        },
+        hide_index=True,
+    )
+
+    batch_thread = st.session_state.get("leaderboard_batch")
+    if batch_thread is not None and batch_thread.is_alive():
+        st.info(
+            "Batch scoring of unscored jobs is running, results appear here "
+            "as the batch completes."
+        )
+    elif st.button("Batch score unscored jobs"):
+        with st.spinner("Looking for unscored jobs..."):
+            jobs = utils.load_stored_texts(st.session_state.job_storage_dir)
+            unscored = crew_analyzer.unscored_jobs(
+                resume_text, jobs, us_citizen, security_clearance
+            )
+        if not unscored:
+            st.success("Every stored job is scored for this resume.")
+            return
+        batch_thread = threading.Thread(
+            target=batch_scorer.run_batch,
+            args=(
+                [resume_path],
+                [job["path"] for job in unscored],
+                us_citizen,
+                security_clearance,
+                os.getenv("BATCH_PROVIDER", "openai"),
+            ),
+            daemon=True,
+        )
+        batch_thread.start()
+        st.session_state.leaderboard_batch = batch_thread
+        st.info(f"Submitted {len(unscored)} unscored jobs for batch scoring.")
+
+
+PREFETCH_WORKERS = int(os.getenv("PREFETCH_WORKERS", "4"))
+
+
+@st.cache_resource
+def prefetch_executor():
+    # shared by all sessions, survives reruns
+    return ThreadPoolExecutor(
+        max_workers=PREFETCH_WORKERS, thread_name_prefix="prefetch"
+    )
+
+
+def prefetch_job(job_url):
+    """Fetch and extract a job URL."""
+    job_text = utils.extract_text_from_various_sources(job_url)
+    job_details = utils.identify_job_source(job_url, job_text)
+    return job_text, job_details
+
+
+def warm_job_requirements(job_url):
+    try:
+        crew_analyzer.job_requirements_analyzer_crew(
+            job_url, priority=crew_analyzer.llm_scheduler.PRIORITY_BATCH
+        )
+    except Exception as e:
+        print(f"Warming job requirements of {job_url} failed: {e}")
+
+
+def warm_after_prefetch(job_url):
+    """
+    Run the job requirements crew once the job prefetch of job_url is done,
+    fire-and-forget: the Analyze click only ever waits on the fetch itself.
+    """
+    warmed = st.session_state.setdefault("warmed_jobs", set())
+    entry = st.session_state.get("prefetch", {}).get("job")
+    if job_url in warmed or entry is None or entry[0] != job_url:
+        return
+    warmed.add(job_url)
+    executor = prefetch_executor()
+
+    def submit_warm_up(job_future):
+        if not job_future.cancelled() and job_future.exception() is None:
+            executor.submit(warm_job_requirements, job_url)
+
+    entry[1].add_done_callback(submit_warm_up)
+
+
+def prefetch(kind, source, function, *args):
+    """Start function(*args) in the background unless source already is."""
+    pending = st.session_state.setdefault("prefetch", {})
+    if kind not in pending or pending[kind][0] != source:
+        print(f"Prefetching {kind}: {source}")
+        pending[kind] = (source, prefetch_executor().submit(function, *args))
+
+
+def prefetched(kind, source):
+    """
+    The prefetched result for source, waiting for it if it is still running.
+    None when source was not prefetched or the prefetch failed.
+    """
+    entry = st.session_state.get("prefetch", {}).get(kind)
+    if entry is None or entry[0] != source:
+        return None
+    try:
+        return entry[1].result()
+    except Exception as e:
+        print(f"Prefetch of {kind} {source} failed: {e}")
+        return None
+
+
+def record_latency(start, prefetch_enabled):
+    latency = utils.currenttimemillis() - start
+    mode = "prefetch" if prefetch_enabled else "no prefetch"
+    print(f"Click to result took {latency} ms ({mode})")
+    st.caption(f"Click to result: {latency} ms ({mode})")
+    st.session_state.setdefault("latencies", []).append(
+        {"mode": mode, "click_to_result_ms": latency}
+    )
+
+
 # Sidebar for inputs
 with st.sidebar:
+    view = st.radio("View", ["Match", "Leaderboard"], horizontal=True)
     st.markdown("### Candidate")
     # list last 3 uploaded resumes in ./work/resumes in a dropdown  sort by date newest to oldest
     if st.button("Rescan Resume Folder"):
@@ -53,9 +450,21 @@ with st.sidebar:
     resume_files = ["Upload Resume (PDF)"] + resume_files[:3]
     resume_file = st.selectbox("Resume", resume_files, index=0)
     if resume_file == "Upload Resume (PDF)":
-        resume_file = st.file_uploader(
+        resume_upload = st.file_uploader(
             "Upload Resume (PDF or TXT)", type=["pdf", "txt"]
         )
+        resume_file = None
+        if resume_upload is not None:
+            # stored by content hash, a repeat upload reuses its entry
+            resume_file, new_upload = utils.content_store.put_bytes(
+                resume_upload.getvalue(),
+                "resume_" + resume_upload.name.replace(" ", "_"),
+            )
+            uploaded = st.session_state.setdefault("uploaded_resumes", set())
+            if not new_upload and resume_file not in uploaded:
+                st.caption(f"Already uploaded as {os.path.basename(resume_file)}")
+            elif new_upload:
+                uploaded.add(resume_file)
         previous_resume = False
     else:
         resume_file = os.path.join(st.session_state.resume_storage_dir, resume_file)
@@ -72,9 +481,28 @@ with st.sidebar:
 
     st.markdown("### Job")
     if st.button("Rescan Job Folder"):
-        previous_job_files = [
-            "Previous Job Submissions"
-        ] + utils.get_list_of_files_desc(st.session_state.job_storage_dir)
+        crew_analyzer.get_stored_job_index().sync(
+            st.session_state.job_storage_dir,
+            utils.extract_text_from_various_sources,
+        )
+    job_query = st.text_input(
+        "Search stored jobs",
+        placeholder='kubernetes AND ("ts/sci" OR "top secret") -contract',
+        help="Terms are ANDed; supports OR, NOT/-term, parentheses and "
+        '"quoted phrases". Skill aliases match their canonical skill.',
+    )
+    if job_query.strip():
+        start = utils.currenttimemillis()
+        try:
+            matches = crew_analyzer.get_stored_job_index().search(job_query)
+        except crew_analyzer.job_index.QuerySyntaxError as e:
+            st.warning(f"Invalid search: {e}")
+            matches = []
+        end = utils.currenttimemillis()
+        st.caption(f"{len(matches)} matching jobs in {end - start} ms")
+        previous_job_files = ["Previous Job Submissions"] + [
+            os.path.basename(match["path"]) for match in matches
+        ]
     else:
         previous_job_files = [
             "Previous Job Submissions"
@@ -89,211 +517,144 @@ with st.sidebar:
     job_caching = st.checkbox(
         "Use cached result if available", key="job_caching", value=True
     )
+    near_duplicate_threshold = st.slider(
+        "Near-duplicate similarity threshold",
+        min_value=0.5,
+        max_value=1.0,
+        value=crew_analyzer.near_dup.DEFAULT_THRESHOLD,
+        step=0.01,
+        help="Reuse the cached result of a posting at least this similar",
+    )
+    stream_results = st.checkbox(
+        "Stream results as they arrive", key="stream_results", value=True
+    )
+    prefetch_enabled = st.checkbox(
+        "Speculative prefetch",
+        key="prefetch_enabled",
+        value=True,
+        help="Fetch and extract the job and resume as soon as they are entered",
+    )
+    warm_job_crew = st.checkbox(
+        "Prefetch job requirements (LLM)",
+        key="warm_job_crew",
+        value=False,
+        disabled=not prefetch_enabled,
+        help="Also run the job requirements crew for a typed job URL",
+    )
     analyze_button = st.button("Analyze Match")
 
+    # start the slow parts of an analysis while the user is still on the form
+    if prefetch_enabled:
+        if resume_file is not None:
+            prefetch(
+                "resume",
+                resume_file,
+                utils.extract_text_from_various_sources,
+                resume_file,
+            )
+        if job_url != "" and previous_job_file == "Previous Job Submissions":
+            prefetch("job", job_url, prefetch_job, job_url)
+            if warm_job_crew:
+                warm_after_prefetch(job_url)
+
     st.divider()
     # show crew .env config items
-
-if analyze_button:
+    with st.expander("Cache statistics"):
+        st.dataframe(utils.cache.stats(), hide_index=True)
+    with st.expander("LLM output parsing"):
+        # "repaired" outputs are re-asks avoided by local JSON repair
+        st.dataframe([crew_analyzer.json_repair.stats()], hide_index=True)
+    if st.session_state.get("latencies"):
+        with st.expander("Click to result latency"):
+            st.dataframe(st.session_state.latencies, hide_index=True)
+
+if view == "Leaderboard":
+    render_leaderboard(
+        resume_file if previous_resume else None, us_citizen, security_clearance
+    )
+elif analyze_button:
     if resume_file is not None and (
         job_url != ""
         or job_text != ""
         or previous_job_file != "Previous Job Submissions"
     ):
+        click_start = utils.currenttimemillis()
         with st.spinner("Preparing files..."):
             if previous_job_file != "Previous Job Submissions":
                 job_url = os.path.join(
                     st.session_state.job_storage_dir, previous_job_file
                 )
-            elif job_text:
-                # write to a temp file
-                with tempfile.NamedTemporaryFile(
-                    delete=False, suffix=".txt", dir=st.session_state.job_storage_dir
-                ) as tmp_file:
-                    tmp_file.write(job_text.encode())
-                    tmp_file_path = tmp_file.name
-                job_url = tmp_file_path
-                job_details = utils.identify_job_source(job_url)
-            else:
-                job_details = utils.identify_job_source(job_url)
                 job_text = utils.extract_text_from_various_sources(job_url)
-            if not previous_resume:
-                resume_file_extension = resume_file.name.split(".")[-1]
-                with tempfile.NamedTemporaryFile(
-                    delete=False,
-                    prefix="resume_" + resume_file.name.replace(" ", "_"),
-                    suffix=f"_{datetime.now().strftime('%Y-%m-%d_%H-%M-%S')}.{resume_file_extension}",
-                ) as tmp_file:
-                    tmp_file.write(resume_file.getvalue())
-                    tmp_file_path = tmp_file.name
+                job_details = utils.identify_job_source(job_url, job_text)
+            elif job_text:
+                # pasted text gets an id from its content, so pasting the same
+                # posting again maps to the same job file and cache entries
+                _, job_details = crew_analyzer.store_pasted_job(job_text)
             else:
-                tmp_file_path = resume_file
+                prefetched_job = prefetched("job", job_url)
+                if prefetched_job:
+                    job_text, job_details = prefetched_job
+                else:
+                    job_text = utils.extract_text_from_various_sources(job_url)
+                    job_details = utils.identify_job_source(job_url, job_text)
 
-            resume_text = utils.extract_text_from_various_sources(tmp_file_path)
+            resume_text = prefetched(
+                "resume", resume_file
+            ) or utils.extract_text_from_various_sources(resume_file)
         try:
-            with st.spinner("Analyzing Job vs Resume skills and Deciding..."):
-                (
-                    final_decision,
-                    final_decision_path,
-                    job_crew_usage_metrics,
-                ) = crew_analyzer.hr_analyzer_crew(
+            if stream_results:
+                render_streamed_analysis(
                     job_text,
                     resume_text,
                     job_details,
                     us_citizen,
                     security_clearance,
                     job_caching,
+                    near_duplicate_threshold,
                 )
-
-                col_final_decision1, col_final_decision2 = st.columns([0.8, 0.2])
-                with col_final_decision1:
-                    st.success(
-                        f"**Final decision complete!**  \n"
-                        f"Decision analysis saved to: `{final_decision_path}`"
-                    )
-                with col_final_decision2:
-                    display_usage_metrics(job_crew_usage_metrics)
-
-            # Parse the output
-            try:
-                result_json = crew_analyzer.result_to_json(final_decision)
-            except Exception as e:
-                st.error(f"Failed to parse result JSON: {e}")
-                st.text(final_decision.raw)
-                st.stop()
-
-            # Display Results
-            st.header("Analysis Results")
-
-            # Job Details
-            org = result_json.get("organization")
-            job_summary = result_json.get("job_summary")
-
-            st.write(
-                f"""
-                <div style="padding: 15px; border: 1px solid #ddd; border-radius: 8px; background-color: #f9f9f9; margin-bottom: 15px;">
-                    <h3 style="margin-top: 0; color: #333;">{org}</h3>
-                    <p style="margin-bottom: 10px;"><strong>Role Summary:</strong> {job_summary}</p>
-                </div>
-                """,
-                unsafe_allow_html=True,
-            )
-
-            decision = result_json.get("decision")
-            reason = result_json.get("reason")
-            st.subheader("Resume vs Job Decision")
-            if decision == "Pass":
-                st.success(
-                    f"Candidate resume is a good fit for the Job! Reason: {reason}"
-                )
+                record_latency(click_start, prefetch_enabled)
             else:
-                st.error(
-                    f"Candidate resume is not a good fit for the Job! Reason: {reason}"
-                )
-
-            # Score Section
-            if "score" in result_json:
-                score_data = result_json["score"]
-                final_score = score_data.get("final_score", 0)
-                percentage = final_score * 100
-
-                # Color coding
-                if percentage >= 80:
-                    color = "green"
-                elif percentage >= 50:
-                    color = "orange"  # Streamlit uses orange for warning/yellowish
-                else:
-                    color = "red"
-
-                st.markdown(
-                    f"""
-                    <div style="text-align: center; padding: 20px; border-radius: 10px; background-color: #f0f2f6;">
-                        <h2>Match Score</h2>
-                        <h1 style="color: {color}; font-size: 72px;">{percentage:.1f}%</h1>
-                    </div>
-                """,
-                    unsafe_allow_html=True,
-                )
-                st.markdown("### 📊 Skills Analysis")
-                # Detailed Score Metrics
-                col1, col2 = st.columns(2)
-                with col1:
-                    st.metric(
-                        "Required Skills Match",
-                        f"{score_data.get('required_skill_match_score', 0) * 100:.1f}%",
-                    )
-                    st.text(
-                        f"Matched: {score_data.get('matching_required_skills_count', 0)} / {score_data.get('total_required_skills_count', 0)}"
-                    )
-                with col2:
-                    st.metric(
-                        "Preferred Skills Match",
-                        f"{score_data.get('preferred_skill_match_score', 0) * 100:.1f}%",
-                    )
-                    st.text(
-                        f"Matched: {score_data.get('matching_preferred_skills_count', 0)} / {score_data.get('total_preferred_skills_count', 0)}"
+                with st.spinner("Analyzing Job vs Resume skills and Deciding..."):
+                    (
+                        final_decision,
+                        final_decision_path,
+                        job_crew_usage_metrics,
+                    ) = crew_analyzer.hr_analyzer_crew(
+                        job_text,
+                        resume_text,
+                        job_details,
+                        us_citizen,
+                        security_clearance,
+                        job_caching,
+                        near_duplicate_threshold=near_duplicate_threshold,
                     )
 
-            else:
-                st.warning("Score data not found in the output.")
-
-            st.divider()
-
-            # Skills Breakdown
-            col3, col4 = st.columns(2)
-
-            with col3:
-                if (
-                    "missing_required_skills" in result_json
-                    and result_json["missing_required_skills"]
-                ):
-                    skills_list = "\n".join(
-                        [
-                            f"- {skill}"
-                            for skill in result_json["missing_required_skills"]
-                        ]
+                    display_decision_complete(
+                        final_decision_path, job_crew_usage_metrics
                     )
-                    st.error(f"**Missing:**\n\n{skills_list}")
-                st.subheader("Required Skills")
-                if (
-                    "matching_required_skills" in result_json
-                    and result_json["matching_required_skills"]
-                ):
-                    skills_list = "\n".join(
-                        [
-                            f"- {skill}"
-                            for skill in result_json["matching_required_skills"]
-                        ]
-                    )
-                    st.success(f"**Matching:**\n\n{skills_list}")
-
-            with col4:
-                if (
-                    "missing_preferred_skills" in result_json
-                    and result_json["missing_preferred_skills"]
-                ):
-                    skills_list = "\n".join(
-                        [
-                            f"- {skill}"
-                            for skill in result_json["missing_preferred_skills"]
-                        ]
-                    )
-                    st.error(f"**Missing:**\n\n{skills_list}")
-                st.subheader("Preferred Skills")
-                if (
-                    "matching_preferred_skills" in result_json
-                    and result_json["matching_preferred_skills"]
-                ):
-                    skills_list = "\n".join(
-                        [
-                            f"- {skill}"
-                            for skill in result_json["matching_preferred_skills"]
-                        ]
-                    )
-                    st.success(f"**Matching:**\n\n{skills_list}")
-
-            st.divider()
 
+                # Parse the output
+                try:
+                    result_json = crew_analyzer.result_to_json(final_decision)
+                except Exception as e:
+                    st.error(f"Failed to parse result JSON: {e}")
+                    st.text(final_decision.raw)
+                    st.stop()
+
+                # Display Results
+                st.header("Analysis Results")
+                render_job_card(result_json)
+                render_decision(result_json)
+                render_score(result_json)
+                st.divider()
+                render_skills(result_json)
+                st.divider()
+                record_latency(click_start, prefetch_enabled)
+
+        except crew_analyzer.llm_scheduler.RateLimitExceeded as e:
+            st.warning(
+                f"The LLM provider is rate limiting requests, please retry shortly. ({e})"
+            )
         except Exception as e:
             st.error(f"An error occurred during analysis: {e}")
             st.code(traceback.format_exc())
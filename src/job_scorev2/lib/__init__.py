@@ -0,0 +1,12 @@
+from pathlib import Path
+
+from dotenv import find_dotenv, load_dotenv
+
+# Load .env before any lib module reads its env-configured settings at import
+# (cache backend and policies, prompt layout, rate limits, paths, ...); the
+# scripts and the dashboard call load_dotenv() only after their imports.
+# The .env of the working directory (or a parent) wins over the project one,
+# variables already set in the environment win over both.
+PROJECT_ENV_FILE = Path(__file__).resolve().parents[3] / ".env"
+load_dotenv(find_dotenv(usecwd=True))
+load_dotenv(PROJECT_ENV_FILE)
@@ -0,0 +1,348 @@
+import contextlib
+import datetime
+import fcntl
+import glob
+import json
+import os
+import re
+import time
+import uuid
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+from .models import JobScore
+
+# Columnar export of every job vs resume result for analytics.
+# Each stored result is written as one flat row into its own small part file
+# of a hive partitioned Parquet dataset (scored_month=YYYY-MM/part-*.parquet),
+# so the dataset is current after every result; compact() merges the part
+# files of a partition. Rows that cannot be written right away (no pyarrow, a
+# write error) and bulk exports (backfill) go through a JSONL staging file
+# that flush() moves into the dataset. The staging file is shared by every
+# process (dashboard, warmup, batch_scorer), so appending to it and claiming
+# it for a flush hold a cross-process file lock. Query with e.g.
+#   duckdb: SELECT job_source, avg(final_score) FROM
+#       read_parquet('work/analytics/match_results/**/*.parquet',
+#                    hive_partitioning = true) GROUP BY 1
+# Without pyarrow (the optional "analytics" dependency) the rows stay in the
+# staging file (readable with duckdb's read_json or pandas.read_json(lines=True)).
+ANALYTICS_DIR = os.getenv("ANALYTICS_DIR", "work/analytics")
+DATASET_NAME = "match_results"
+LIST_COLUMNS = [
+    "matching_required_skills",
+    "missing_required_skills",
+    "matching_preferred_skills",
+    "missing_preferred_skills",
+    "matching_certifications",
+    "missing_certifications",
+    "matching_security_clearances",
+    "missing_security_clearances",
+]
+USAGE_COLUMNS = [
+    "total_tokens",
+    "prompt_tokens",
+    "cached_prompt_tokens",
+    "completion_tokens",
+    "successful_requests",
+]
+SCORE_COLUMNS = list(JobScore.model_fields)
+if pa is not None:
+    SCHEMA = pa.schema(
+        [
+            ("resume_hash", pa.string()),
+            ("job_hash", pa.string()),
+            ("us_citizen", pa.bool_()),
+            ("security_clearance", pa.string()),
+            ("job_source", pa.string()),
+            ("job_id", pa.string()),
+            ("job_url", pa.string()),
+            ("organization", pa.string()),
+            ("years_of_experience", pa.int64()),
+            ("job_summary", pa.string()),
+            ("decision", pa.string()),
+            ("reason", pa.string()),
+            *[(column, pa.list_(pa.string())) for column in LIST_COLUMNS],
+            *[
+                (column, pa.float64() if "score" in column else pa.int64())
+                for column in SCORE_COLUMNS
+            ],
+            *[(column, pa.int64()) for column in USAGE_COLUMNS],
+            ("origin", pa.string()),
+            ("save_path", pa.string()),
+            ("scored_at", pa.timestamp("ms", tz="UTC")),
+        ]
+    )
+
+
+def dataset_dir(analytics_dir: str = ANALYTICS_DIR) -> str:
+    return os.path.join(analytics_dir, DATASET_NAME)
+
+
+def staging_path(analytics_dir: str = ANALYTICS_DIR) -> str:
+    return os.path.join(analytics_dir, f"{DATASET_NAME}.staging.jsonl")
+
+
+def _lock_path(analytics_dir: str) -> str:
+    return os.path.join(analytics_dir, f".{DATASET_NAME}.lock")
+
+
+@contextlib.contextmanager
+def _locked(analytics_dir: str):
+    """Exclusive lock on the staging file, across threads and processes."""
+    os.makedirs(analytics_dir, exist_ok=True)
+    with open(_lock_path(analytics_dir), "a") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def match_row(
+    resume_hash: str,
+    job_hash: str,
+    us_citizen: bool,
+    security_clearance: str,
+    record: dict,
+    job_details: dict = None,
+    usage_metrics: dict = None,
+    origin: str = "crew",
+    scored_at: float = None,
+) -> dict:
+    """
+    Flatten a match record, its job metadata and usage into one row.
+
+    Args:
+        resume_hash: results_db.text_hash of the resume text.
+        job_hash: results_db.text_hash of the job text.
+        us_citizen: The candidate setting of the result.
+        security_clearance: The candidate clearance of the result.
+        record: The match record (see lib/records.py).
+        job_details: The job details (job_source, job_id, job_url).
+        usage_metrics: The crew usage metrics of the call that produced it.
+        origin: "crew", "batch", "rescore" or "backfill".
+        scored_at: Epoch seconds, defaults to now.
+    """
+    data = record["data"] or {}
+    score = data.get("score") or {}
+    job_details = job_details or {}
+    usage_metrics = usage_metrics or {}
+    row = {
+        "resume_hash": resume_hash,
+        "job_hash": job_hash,
+        "us_citizen": bool(us_citizen),
+        "security_clearance": security_clearance,
+        "job_source": job_details.get("job_source") or "Unknown",
+        "job_id": str(job_details.get("job_id") or ""),
+        "job_url": job_details.get("job_url") or "",
+        "organization": data.get("organization"),
+        "years_of_experience": data.get("years_of_experience"),
+        "job_summary": data.get("job_summary"),
+        "decision": data.get("decision"),
+        "reason": data.get("reason"),
+        "origin": origin,
+        "save_path": record["save_path"],
+        "scored_at": int((scored_at or time.time()) * 1000),
+    }
+    for column in LIST_COLUMNS:
+        row[column] = [str(item) for item in data.get(column) or []]
+    for column in SCORE_COLUMNS:
+        row[column] = score.get(column)
+    for column in USAGE_COLUMNS:
+        row[column] = usage_metrics.get(column, 0)
+    return row
+
+
+def stage_rows(rows: list[dict], analytics_dir: str = ANALYTICS_DIR):
+    """Append rows to the staging file, for the next flush()."""
+    with _locked(analytics_dir):
+        with open(staging_path(analytics_dir), "a") as f:
+            for row in rows:
+                f.write(json.dumps(row) + "\n")
+
+
+def append_row(row: dict, analytics_dir: str = ANALYTICS_DIR):
+    """
+    Add a row to the dataset as its own part file. Never raises: it runs on
+    the request path, a row that cannot be written is staged instead.
+    """
+    if pa is not None:
+        try:
+            _write_part(
+                [row], os.path.join(dataset_dir(analytics_dir), _partition(row))
+            )
+            return
+        except Exception as e:
+            print(f"Analytics write failed ({e}), staging the row")
+    try:
+        stage_rows([row], analytics_dir)
+    except OSError as e:
+        # the result is already stored, backfill can export it later
+        print(f"Analytics staging failed: {e}")
+
+
+def _partition(row: dict) -> str:
+    if not isinstance(row.get("scored_at"), (int, float)):
+        row["scored_at"] = int(time.time() * 1000)
+    month = datetime.datetime.fromtimestamp(
+        row["scored_at"] / 1000, datetime.timezone.utc
+    ).strftime("%Y-%m")
+    return f"scored_month={month}"
+
+
+def _to_int(value):
+    # LLM output: 5, 5.0, "5", "5+" or "5-7 years" (the lower bound)
+    if value is None or isinstance(value, (bool, int)):
+        return None if value is None else int(value)
+    if isinstance(value, float):
+        return int(value) if value == value and abs(value) != float("inf") else None
+    match = re.search(r"\d+", str(value))
+    return int(match.group(0)) if match else None
+
+
+def _to_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def coerce_row(row: dict) -> dict:
+    """A row with every value coerced to its SCHEMA column type (or None)."""
+    coerced = {}
+    for field in SCHEMA:
+        value = row.get(field.name)
+        if value is None or pa.types.is_timestamp(field.type):
+            coerced[field.name] = value
+        elif pa.types.is_list(field.type):
+            items = value if isinstance(value, list) else [value]
+            coerced[field.name] = [str(item) for item in items if item is not None]
+        elif pa.types.is_boolean(field.type):
+            coerced[field.name] = bool(value)
+        elif pa.types.is_integer(field.type):
+            coerced[field.name] = _to_int(value)
+        elif pa.types.is_floating(field.type):
+            coerced[field.name] = _to_float(value)
+        else:
+            coerced[field.name] = value if isinstance(value, str) else str(value)
+    return coerced
+
+
+def _restore_claimed(claimed: str, rows: list[dict], analytics_dir: str):
+    # put rows that were not written back in front of the staging file
+    staging = staging_path(analytics_dir)
+    with _locked(analytics_dir):
+        with open(claimed, "w") as f:
+            for row in rows:
+                f.write(json.dumps(row) + "\n")
+            if os.path.exists(staging):
+                with open(staging) as staged:
+                    f.write(staged.read())
+        os.replace(claimed, staging)
+
+
+def _write_part(rows: list[dict], partition_dir: str):
+    os.makedirs(partition_dir, exist_ok=True)
+    table = pa.Table.from_pylist([coerce_row(row) for row in rows], schema=SCHEMA)
+    part_name = f"part-{int(time.time() * 1000)}-{uuid.uuid4().hex[:8]}.parquet"
+    # write under a temp name so readers never see a partial file
+    tmp_path = os.path.join(partition_dir, f".{part_name}.tmp")
+    pq.write_table(table, tmp_path, compression="zstd")
+    os.replace(tmp_path, os.path.join(partition_dir, part_name))
+
+
+def flush(analytics_dir: str = ANALYTICS_DIR) -> int:
+    """
+    Move all staged rows into the Parquet dataset.
+
+    Never raises. On a failure the rows not yet written go back into the
+    staging file for the next flush.
+
+    Returns:
+        int: The number of rows written (0 without pyarrow).
+    """
+    if pa is None:
+        print("pyarrow is not installed, analytics rows stay in the staging file")
+        return 0
+    staging = staging_path(analytics_dir)
+    claimed = f"{staging}.{uuid.uuid4().hex[:8]}.flushing"
+    with _locked(analytics_dir):
+        if not os.path.exists(staging):
+            return 0
+        # claim the staged rows, new rows go to a fresh staging file; writers
+        # only append under the lock, so no line lands in the claimed file
+        os.replace(staging, claimed)
+    with open(claimed) as f:
+        lines = [line for line in f if line.strip()]
+    rows = []
+    for line in lines:
+        try:
+            rows.append(json.loads(line))
+        except json.JSONDecodeError:
+            print(f"Dropping unreadable analytics row: {line[:100]}")
+    partitions = {}
+    for row in rows:
+        partitions.setdefault(_partition(row), []).append(row)
+    written = 0
+    try:
+        for partition in list(partitions):
+            _write_part(
+                partitions[partition],
+                os.path.join(dataset_dir(analytics_dir), partition),
+            )
+            written += len(partitions.pop(partition))
+    except Exception as e:
+        unwritten = [row for part in partitions.values() for row in part]
+        print(f"Analytics flush failed ({e}), {len(unwritten)} rows restaged")
+        _restore_claimed(claimed, unwritten, analytics_dir)
+        return written
+    os.remove(claimed)
+    print(f"Flushed {written} analytics rows into the dataset")
+    return written
+
+
+def compact(analytics_dir: str = ANALYTICS_DIR) -> int:
+    """
+    Merge the part files of each partition into one, keeping only the latest
+    row per result (resume, job, candidate setting).
+
+    Returns:
+        int: The number of partitions rewritten.
+    """
+    if pa is None:
+        print("pyarrow is not installed, nothing to compact")
+        return 0
+    # one compaction at a time; part files written meanwhile are not in the
+    # listed parts, so they are kept for the next compaction
+    with _locked(analytics_dir):
+        return _compact(analytics_dir)
+
+
+def _compact(analytics_dir: str) -> int:
+    rewritten = 0
+    for partition_dir in sorted(
+        glob.glob(os.path.join(dataset_dir(analytics_dir), "*"))
+    ):
+        parts = sorted(glob.glob(os.path.join(partition_dir, "part-*.parquet")))
+        if len(parts) < 2:
+            continue
+        latest = {}
+        for part in parts:
+            for row in pq.read_table(part, schema=SCHEMA).to_pylist():
+                key = (
+                    row["resume_hash"],
+                    row["job_hash"],
+                    row["us_citizen"],
+                    row["security_clearance"],
+                )
+                if key not in latest or row["scored_at"] >= latest[key]["scored_at"]:
+                    latest[key] = row
+        _write_part(list(latest.values()), partition_dir)
+        for part in parts:
+            os.remove(part)
+        rewritten += 1
+    return rewritten
@@ -0,0 +1,204 @@
+import json
+import os
+import time
+import uuid
+from pathlib import Path
+
+# terminal states of the provider batch interface
+BATCH_DONE_STATES = ("completed", "failed", "expired", "cancelled")
+BATCH_ENDPOINT = "/v1/chat/completions"
+
+
+def batch_request_line(
+    custom_id: str,
+    model: str,
+    messages: list[dict],
+    temperature: float = None,
+    response_format: dict = None,
+) -> dict:
+    """
+    One line of a batch submission file (OpenAI batch JSONL format).
+
+    Args:
+        custom_id: The id the result is matched back by.
+        model: The model name, without a provider prefix.
+        messages: The chat messages.
+        temperature: The sampling temperature, the provider default if None.
+        response_format: The provider response format (e.g. JSON mode), if any.
+    """
+    body = {"model": model, "messages": messages}
+    if temperature is not None:
+        body["temperature"] = temperature
+    if response_format:
+        body["response_format"] = response_format
+    return {
+        "custom_id": custom_id,
+        "method": "POST",
+        "url": BATCH_ENDPOINT,
+        "body": body,
+    }
+
+
+def write_batch_file(path: str, request_lines: list[dict]) -> str:
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w") as f:
+        for line in request_lines:
+            f.write(json.dumps(line) + "\n")
+    return path
+
+
+def parse_batch_output(output_text: str) -> dict:
+    """
+    Parse a batch output file into {custom_id: {"content", "usage", "error"}}.
+    """
+    results = {}
+    for line in output_text.splitlines():
+        if not line.strip():
+            continue
+        record = json.loads(line)
+        response = record.get("response") or {}
+        body = response.get("body") or {}
+        choices = body.get("choices") or [{}]
+        results[record["custom_id"]] = {
+            "content": choices[0].get("message", {}).get("content"),
+            "usage": body.get("usage") or {},
+            "error": record.get("error"),
+        }
+    return results
+
+
+class OpenAIBatchClient:
+    """Submits batch files through the OpenAI batch API (batch pricing)."""
+
+    def __init__(self, api_key: str = None):
+        from openai import OpenAI
+
+        self.client = OpenAI(api_key=api_key or os.getenv("OPENAI_API_KEY"))
+
+    def submit(self, batch_file_path: str) -> str:
+        with open(batch_file_path, "rb") as f:
+            batch_file = self.client.files.create(file=f, purpose="batch")
+        batch = self.client.batches.create(
+            input_file_id=batch_file.id,
+            endpoint=BATCH_ENDPOINT,
+            completion_window="24h",
+        )
+        return batch.id
+
+    def status(self, batch_id: str) -> str:
+        return self.client.batches.retrieve(batch_id).status
+
+    def results(self, batch_id: str) -> dict:
+        batch = self.client.batches.retrieve(batch_id)
+        if batch.output_file_id is None:
+            return {}
+        output_text = self.client.files.content(batch.output_file_id).text
+        return parse_batch_output(output_text)
+
+
+class LocalBatchClient:
+    """
+    Local stand-in for the provider batch interface.
+
+    Requests are answered by `responder(body) -> (content, usage)` at submit
+    time and written to an output file in the provider format, so the full
+    render/submit/poll/hydrate path can run without network access.
+    """
+
+    def __init__(self, work_dir: str = "work/batches/local", responder=None):
+        self.work_dir = Path(work_dir)
+        self.work_dir.mkdir(parents=True, exist_ok=True)
+        self.responder = responder or empty_match_responder
+
+    def submit(self, batch_file_path: str) -> str:
+        batch_id = f"local_batch_{uuid.uuid4().hex[:12]}"
+        output_lines = []
+        with open(batch_file_path, "r") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                request = json.loads(line)
+                content, usage = self.responder(request["body"])
+                output_lines.append(
+                    {
+                        "custom_id": request["custom_id"],
+                        "response": {
+                            "status_code": 200,
+                            "body": {
+                                "choices": [{"message": {"content": content}}],
+                                "usage": usage,
+                            },
+                        },
+                        "error": None,
+                    }
+                )
+        write_batch_file(self.work_dir / f"{batch_id}_output.jsonl", output_lines)
+        return batch_id
+
+    def status(self, batch_id: str) -> str:
+        if (self.work_dir / f"{batch_id}_output.jsonl").exists():
+            return "completed"
+        return "failed"
+
+    def results(self, batch_id: str) -> dict:
+        with open(self.work_dir / f"{batch_id}_output.jsonl", "r") as f:
+            return parse_batch_output(f.read())
+
+
+def empty_match_responder(body: dict) -> tuple[str, dict]:
+    """Default LocalBatchClient responder: a valid, all-empty match result."""
+    content = {
+        "organization": "Unknown",
+        "years_of_experience": 0,
+        "job_summary": "",
+        "matching_required_skills": [],
+        "missing_required_skills": [],
+        "matching_preferred_skills": [],
+        "missing_preferred_skills": [],
+        "matching_certifications": [],
+        "missing_certifications": [],
+        "matching_security_clearances": [],
+        "missing_security_clearances": [],
+        "decision": "Fail",
+        "reason": "Local batch stand-in",
+        "score": {
+            "final_score": 0.0,
+            "required_skill_match_score": 0.0,
+            "preferred_skill_match_score": 0.0,
+            "matching_required_skills_count": 0,
+            "missing_required_skills_count": 0,
+            "matching_preferred_skills_count": 0,
+            "missing_preferred_skills_count": 0,
+            "total_required_skills_count": 0,
+            "total_preferred_skills_count": 0,
+            "matching_certifications_count": 0,
+            "missing_certifications_count": 0,
+            "matching_security_clearances_count": 0,
+            "missing_security_clearances_count": 0,
+        },
+    }
+    prompt_chars = sum(len(m["content"]) for m in body["messages"])
+    usage = {
+        "prompt_tokens": prompt_chars // 4,
+        "completion_tokens": 0,
+        "total_tokens": prompt_chars // 4,
+    }
+    return json.dumps(content), usage
+
+
+def get_batch_client(provider: str, **kwargs):
+    if provider == "openai":
+        return OpenAIBatchClient(**kwargs)
+    elif provider == "local":
+        return LocalBatchClient(**kwargs)
+    raise ValueError(f"Unknown batch provider: {provider}")
+
+
+def poll_batch(client, batch_id: str, poll_interval: int = 60) -> str:
+    """Block until the batch reaches a terminal state and return that state."""
+    while True:
+        status = client.status(batch_id)
+        print(f"Batch {batch_id} status: {status}")
+        if status in BATCH_DONE_STATES:
+            return status
+        time.sleep(poll_interval)
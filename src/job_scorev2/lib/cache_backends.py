@@ -0,0 +1,358 @@
+import abc
+import base64
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from diskcache import Cache
+
+EVICTION_POLICIES = {
+    "lru": "least-recently-used",
+    "lfu": "least-frequently-used",
+}
+
+
+class CacheBackend(abc.ABC):
+    """
+    Storage interface behind a NamespaceCache.
+
+    A backend stores the (already encoded) values of one namespace and
+    enforces that namespace's size limit, eviction policy and per-entry TTL.
+    """
+
+    @abc.abstractmethod
+    def get(self, key, default=None): ...
+
+    @abc.abstractmethod
+    def set(self, key, value, expire: float = None): ...
+
+    @abc.abstractmethod
+    def delete(self, key): ...
+
+    @abc.abstractmethod
+    def update(self, key, fn, expire: float = None):
+        """
+        Replace the value at key with fn(value), atomically across processes.
+        fn gets None for a missing key, may be called more than once, and
+        returns the new value or None to leave the entry as it is.
+        """
+
+    @abc.abstractmethod
+    def clear(self) -> int: ...
+
+    @abc.abstractmethod
+    def items(self):
+        """Iterate (key, value) over the live entries, without counting hits."""
+
+    @abc.abstractmethod
+    def stats(self) -> tuple[int, int]:
+        """(hits, misses) of this namespace."""
+
+    @abc.abstractmethod
+    def entry_count(self) -> int: ...
+
+    @abc.abstractmethod
+    def volume(self) -> int:
+        """Bytes used by this namespace."""
+
+    @abc.abstractmethod
+    def compact(self) -> dict:
+        """Drop expired entries and evict down to the size limit."""
+
+    def vacuum(self):
+        """Give space freed by deleted entries back, where applicable."""
+
+
+class DiskCacheBackend(CacheBackend):
+    """Local diskcache directory per namespace (the default)."""
+
+    def __init__(self, directory: str, size_limit: int, eviction: str):
+        self.directory = directory
+        self.store = Cache(
+            directory,
+            size_limit=size_limit,
+            eviction_policy=EVICTION_POLICIES[eviction],
+        )
+        self.store.stats(enable=True)
+
+    def get(self, key, default=None):
+        return self.store.get(key, default)
+
+    def set(self, key, value, expire: float = None):
+        self.store.set(key, value, expire=expire)
+
+    def delete(self, key):
+        del self.store[key]
+
+    def update(self, key, fn, expire: float = None):
+        # BEGIN IMMEDIATE: no other process writes between the read and the set
+        with self.store.transact():
+            value = fn(self.store.get(key))
+            if value is not None:
+                self.store.set(key, value, expire=expire)
+
+    def clear(self) -> int:
+        return self.store.clear()
+
+    def items(self):
+        # scan through a second handle that neither counts hits nor bumps the
+        # LRU/LFU access fields of every entry, which get() on self.store
+        # would do; reset(update=False) changes only this handle, not the
+        # settings stored for the directory
+        reader = Cache(self.directory)
+        reader.reset("statistics", 0, update=False)
+        reader.reset("eviction_policy", "none", update=False)
+        missing = object()
+        try:
+            for key in reader.iterkeys():
+                value = reader.get(key, missing)
+                # expired or deleted since the key was listed
+                if value is not missing:
+                    yield key, value
+        finally:
+            reader.close()
+
+    def stats(self) -> tuple[int, int]:
+        return self.store.stats()
+
+    def entry_count(self) -> int:
+        return len(self.store)
+
+    def volume(self) -> int:
+        return self.store.volume()
+
+    def compact(self) -> dict:
+        expired = self.store.expire()
+        culled = self.store.cull()
+        self.store.check(fix=True)
+        return {"expired": expired, "culled": culled}
+
+    def vacuum(self):
+        with sqlite3.connect(
+            os.path.join(self.directory, "cache.db"), isolation_level=None
+        ) as con:
+            con.execute("VACUUM")
+
+
+def _to_json(value):
+    # json keeps neither bytes nor tuples (cache keys, near_dup band members)
+    if isinstance(value, bytes):
+        return {"__bytes__": base64.b64encode(value).decode()}
+    if isinstance(value, tuple):
+        return {"__tuple__": [_to_json(item) for item in value]}
+    if isinstance(value, list):
+        return [_to_json(item) for item in value]
+    if isinstance(value, dict):
+        return {key: _to_json(item) for key, item in value.items()}
+    return value
+
+
+def _from_json(value):
+    if isinstance(value, list):
+        return [_from_json(item) for item in value]
+    if isinstance(value, dict):
+        if "__bytes__" in value:
+            return base64.b64decode(value["__bytes__"])
+        if "__tuple__" in value:
+            return tuple(_from_json(item) for item in value["__tuple__"])
+        return {key: _from_json(item) for key, item in value.items()}
+    return value
+
+
+def encode_entry(key, value) -> bytes:
+    """JSON blob of a (key, value) entry, never pickled (a shared server is
+    not trusted to hand back only what this process wrote)."""
+    return json.dumps(_to_json([key, value]), separators=(",", ":")).encode()
+
+
+def decode_entry(blob: bytes) -> tuple:
+    key, value = _from_json(json.loads(blob))
+    return key, value
+
+
+class RedisCacheBackend(CacheBackend):
+    """
+    Namespace stored in a Redis-compatible server, shared by every process
+    and host pointing at the same url.
+
+    Entries are JSON encoded (key, value) pairs (see encode_entry) under a
+    hash of the key and use native key expiry for the TTL. A sorted set per
+    namespace ranks entries by last access (lru) or access count (lfu), a
+    hash keeps entry sizes and a counter their total, so the namespace can
+    be culled to its size limit the same way diskcache does. Bookkeeping of
+    entries redis expired is dropped when they are next read (or on
+    compact).
+    """
+
+    def __init__(self, url: str, namespace: str, size_limit: int, eviction: str):
+        import redis
+
+        self.client = redis.Redis.from_url(url)
+        self.prefix = f"job_score:{namespace}"
+        self.size_limit = size_limit
+        self.eviction = eviction
+        self.rank_key = f"{self.prefix}:__rank__"
+        self.size_key = f"{self.prefix}:__size__"
+        self.volume_key = f"{self.prefix}:__volume__"
+        self.stats_key = f"{self.prefix}:__stats__"
+
+    def _key(self, key) -> str:
+        digest = hashlib.sha256(encode_entry(key, None)).hexdigest()
+        return f"{self.prefix}:{digest}"
+
+    def _touch(self, pipe, redis_key: str):
+        if self.eviction == "lfu":
+            pipe.zincrby(self.rank_key, 1, redis_key)
+        else:
+            pipe.zadd(self.rank_key, {redis_key: time.time()})
+
+    def _forget(self, redis_keys: list) -> int:
+        """Drop the rank/size bookkeeping of redis_keys, return the bytes freed."""
+        if not redis_keys:
+            return 0
+        pipe = self.client.pipeline()
+        pipe.hmget(self.size_key, redis_keys)
+        pipe.zrem(self.rank_key, *redis_keys)
+        pipe.hdel(self.size_key, *redis_keys)
+        sizes = pipe.execute()[0]
+        freed = sum(int(size) for size in sizes if size is not None)
+        if freed:
+            self.client.decrby(self.volume_key, freed)
+        return freed
+
+    def get(self, key, default=None):
+        redis_key = self._key(key)
+        blob = self.client.get(redis_key)
+        pipe = self.client.pipeline()
+        if blob is None:
+            pipe.hincrby(self.stats_key, "misses", 1)
+            pipe.execute()
+            # expired by redis, or never set
+            self._forget([redis_key])
+            return default
+        pipe.hincrby(self.stats_key, "hits", 1)
+        self._touch(pipe, redis_key)
+        pipe.execute()
+        return decode_entry(blob)[1]
+
+    def set(self, key, value, expire: float = None):
+        redis_key = self._key(key)
+        blob = encode_entry(key, value)
+        old_size = int(self.client.hget(self.size_key, redis_key) or 0)
+        pipe = self.client.pipeline()
+        pipe.set(redis_key, blob, px=int(expire * 1000) if expire else None)
+        pipe.hset(self.size_key, redis_key, len(blob))
+        pipe.incrby(self.volume_key, len(blob) - old_size)
+        self._touch(pipe, redis_key)
+        volume = pipe.execute()[2]
+        if volume > self.size_limit:
+            self._cull()
+
+    def delete(self, key):
+        redis_key = self._key(key)
+        self.client.delete(redis_key)
+        self._forget([redis_key])
+
+    def update(self, key, fn, expire: float = None):
+        import redis
+
+        redis_key = self._key(key)
+        with self.client.pipeline() as pipe:
+            while True:
+                try:
+                    # optimistic transaction, retried if another client
+                    # changes the entry between the read and the write
+                    pipe.watch(redis_key)
+                    blob = pipe.get(redis_key)
+                    value = fn(decode_entry(blob)[1] if blob is not None else None)
+                    if value is None:
+                        pipe.unwatch()
+                        return
+                    old_size = int(pipe.hget(self.size_key, redis_key) or 0)
+                    blob = encode_entry(key, value)
+                    pipe.multi()
+                    pipe.set(redis_key, blob, px=int(expire * 1000) if expire else None)
+                    pipe.hset(self.size_key, redis_key, len(blob))
+                    pipe.incrby(self.volume_key, len(blob) - old_size)
+                    self._touch(pipe, redis_key)
+                    volume = pipe.execute()[2]
+                    break
+                except redis.WatchError:
+                    continue
+        if volume > self.size_limit:
+            self._cull()
+
+    def clear(self) -> int:
+        redis_keys = self.client.zrange(self.rank_key, 0, -1)
+        if redis_keys:
+            self.client.delete(*redis_keys)
+        self.client.delete(
+            self.rank_key, self.size_key, self.volume_key, self.stats_key
+        )
+        return len(redis_keys)
+
+    def items(self):
+        for redis_key in self.client.zrange(self.rank_key, 0, -1):
+            blob = self.client.get(redis_key)
+            if blob is None:
+                self._forget([redis_key])
+                continue
+            yield decode_entry(blob)
+
+    def stats(self) -> tuple[int, int]:
+        counters = self.client.hgetall(self.stats_key)
+        return int(counters.get(b"hits", 0)), int(counters.get(b"misses", 0))
+
+    def entry_count(self) -> int:
+        return self.client.zcard(self.rank_key)
+
+    def volume(self) -> int:
+        return int(self.client.get(self.volume_key) or 0)
+
+    def _expire(self) -> int:
+        # entries that redis already expired still have rank/size bookkeeping
+        expired = [
+            redis_key
+            for redis_key in self.client.zrange(self.rank_key, 0, -1)
+            if not self.client.exists(redis_key)
+        ]
+        self._forget(expired)
+        return len(expired)
+
+    def _cull(self) -> int:
+        culled = 0
+        while self.volume() > self.size_limit:
+            lowest = self.client.zpopmin(self.rank_key)
+            if not lowest:
+                break
+            redis_key = lowest[0][0]
+            self.client.delete(redis_key)
+            self._forget([redis_key])
+            culled += 1
+        return culled
+
+    def compact(self) -> dict:
+        return {"expired": self._expire(), "culled": self._cull()}
+
+
+def make_backend(
+    backend_url: str, directory: str, namespace: str, size_limit: int, eviction: str
+) -> CacheBackend:
+    """
+    Create the backend of a namespace from a backend url.
+
+    Args:
+        backend_url: "disk" (default) or a redis url (redis://, rediss://, unix://).
+        directory: The local cache directory, used by the disk backend.
+        namespace: The namespace name.
+        size_limit: The namespace size limit in bytes.
+        eviction: "lru" or "lfu".
+    """
+    if not backend_url or backend_url == "disk":
+        return DiskCacheBackend(
+            os.path.join(directory, namespace), size_limit, eviction
+        )
+    if backend_url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisCacheBackend(backend_url, namespace, size_limit, eviction)
+    raise ValueError(f"Unknown cache backend: {backend_url}")
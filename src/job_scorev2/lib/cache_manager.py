@@ -0,0 +1,298 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from . import records
+from .cache_backends import DiskCacheBackend, make_backend
+
+MB = 1024 * 1024
+DAY = 24 * 60 * 60
+# "disk" keeps every namespace in a local diskcache directory; a redis url
+# (e.g. redis://cache-host:6379/0) shares the namespaces between processes
+# and hosts.
+DEFAULT_BACKEND = os.getenv("CACHE_BACKEND", "disk")
+
+# Default policy per namespace. Every value can be overridden from the env,
+# e.g. CACHE_FETCH_SIZE_LIMIT_MB=256, CACHE_FETCH_TTL_DAYS=3,
+# CACHE_MATCH_EVICTION=lfu, CACHE_MATCH_MEMORY_ENTRIES=512.
+# A TTL of 0 means entries never expire. memory_entries bounds the in-process
+# LRU tier in front of the disk cache (0 disables it); it is always off on a
+# redis backend, where another host may have changed an entry since.
+NAMESPACE_POLICIES = {
+    # raw downloaded pages, cheap to refetch and go stale
+    "fetch": {
+        "size_limit_mb": 512,
+        "eviction": "lru",
+        "ttl_days": 7,
+        "memory_entries": 0,
+    },
+    # text/markdown extracted from pages and documents
+    "extraction": {
+        "size_limit_mb": 256,
+        "eviction": "lru",
+        "ttl_days": 30,
+        "memory_entries": 128,
+    },
+    # LLM results, expensive to recompute, stored as lib/records.py records
+    "resume": {
+        "size_limit_mb": 256,
+        "eviction": "lfu",
+        "ttl_days": 0,
+        "memory_entries": 64,
+        "codec": "record",
+    },
+    "job": {
+        "size_limit_mb": 512,
+        "eviction": "lfu",
+        "ttl_days": 90,
+        "memory_entries": 256,
+        "codec": "record",
+    },
+    "match": {
+        "size_limit_mb": 1024,
+        "eviction": "lfu",
+        "ttl_days": 90,
+        "memory_entries": 512,
+        "codec": "record",
+    },
+    # lookup structures such as the near-duplicate index
+    "index": {
+        "size_limit_mb": 256,
+        "eviction": "lru",
+        "ttl_days": 0,
+        "memory_entries": 0,
+    },
+    # LLM rate limit buckets shared by every process (lib/llm_scheduler.py)
+    "limits": {
+        "size_limit_mb": 1,
+        "eviction": "lru",
+        "ttl_days": 0,
+        "memory_entries": 0,
+    },
+}
+CODECS = {"record": records}
+
+
+def load_policy(namespace: str) -> dict:
+    policy = dict(NAMESPACE_POLICIES[namespace])
+    prefix = f"CACHE_{namespace.upper()}_"
+    if os.getenv(prefix + "SIZE_LIMIT_MB"):
+        policy["size_limit_mb"] = int(os.getenv(prefix + "SIZE_LIMIT_MB"))
+    if os.getenv(prefix + "EVICTION"):
+        policy["eviction"] = os.getenv(prefix + "EVICTION")
+    if os.getenv(prefix + "TTL_DAYS"):
+        policy["ttl_days"] = float(os.getenv(prefix + "TTL_DAYS"))
+    if os.getenv(prefix + "MEMORY_ENTRIES"):
+        policy["memory_entries"] = int(os.getenv(prefix + "MEMORY_ENTRIES"))
+    return policy
+
+
+class MemoryLRU:
+    """Bounded, thread-safe in-process LRU of decoded values with expiry."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+
+    def get(self, key, default=None):
+        if not self.max_entries:
+            return default
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return default
+            expires_at, value = entry
+            if expires_at is not None and expires_at < time.time():
+                del self.entries[key]
+                return default
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value, expire: float = None):
+        if not self.max_entries:
+            return
+        with self.lock:
+            expires_at = time.time() + expire if expire else None
+            self.entries[key] = (expires_at, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def discard(self, key):
+        with self.lock:
+            self.entries.pop(key, None)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+class NamespaceCache:
+    """
+    One cache namespace with its own size limit, eviction policy and TTL.
+
+    Two tiers: a bounded in-process LRU of decoded values in front of the
+    storage backend (local diskcache or a shared redis), read-through and
+    write-through. The LRU tier is only used on the disk backend: in front of
+    a shared redis it would keep serving values other hosts have replaced. Namespaces with a codec store encoded values in the backend
+    and hand out decoded ones. Supports the dict-style access the code used on
+    the single diskcache, but get() is the preferred single lookup.
+    """
+
+    _MISSING = object()
+
+    def __init__(
+        self,
+        directory: str,
+        namespace: str,
+        policy: dict,
+        backend_url: str = DEFAULT_BACKEND,
+    ):
+        self.namespace = namespace
+        self.policy = policy
+        self.ttl = policy["ttl_days"] * DAY or None
+        self.codec = CODECS.get(policy.get("codec"))
+        self.backend = make_backend(
+            backend_url,
+            directory,
+            namespace,
+            policy["size_limit_mb"] * MB,
+            policy["eviction"],
+        )
+        self.memory = MemoryLRU(
+            policy.get("memory_entries", 0)
+            if isinstance(self.backend, DiskCacheBackend)
+            else 0
+        )
+
+    def __contains__(self, key) -> bool:
+        return self.get(key, self._MISSING) is not self._MISSING
+
+    def __getitem__(self, key):
+        value = self.get(key, self._MISSING)
+        if value is self._MISSING:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key, value):
+        self.set(key, value)
+
+    def __delitem__(self, key):
+        self.memory.discard(key)
+        self.backend.delete(key)
+
+    def get(self, key, default=None):
+        value = self.memory.get(key, self._MISSING)
+        if value is not self._MISSING:
+            return value
+        value = self.backend.get(key, self._MISSING)
+        if value is self._MISSING:
+            return default
+        if self.codec is not None:
+            value = self.codec.loads(value)
+            if value is None:
+                return default
+        self.memory.set(key, value, self.ttl)
+        return value
+
+    def set(self, key, value, expire: float = None):
+        expire = expire or self.ttl
+        stored = self.codec.dumps(value) if self.codec is not None else value
+        self.backend.set(key, stored, expire=expire)
+        self.memory.set(key, value, expire)
+
+    def update(self, key, fn):
+        """
+        Replace the value at key with fn(value), atomic across processes (see
+        CacheBackend.update).
+        """
+        if self.codec is not None:
+            raise TypeError(f"{self.namespace} stores encoded records")
+        self.memory.discard(key)
+        self.backend.update(key, fn, expire=self.ttl)
+
+    def add_member(self, key, member):
+        """Append member to the list at key, atomic across processes."""
+
+        def append(members):
+            members = members or []
+            return None if member in members else members + [member]
+
+        self.update(key, append)
+
+    def items(self):
+        """Iterate (key, decoded value) over every entry of the namespace."""
+        for key, value in self.backend.items():
+            if self.codec is not None:
+                value = self.codec.loads(value)
+                if value is None:
+                    continue
+            yield key, value
+
+    def stats(self) -> dict:
+        hits, misses = self.backend.stats()
+        memory_hits = self.memory.hits
+        lookups = memory_hits + hits + misses
+        return {
+            "namespace": self.namespace,
+            "entries": self.backend.entry_count(),
+            "bytes": self.backend.volume(),
+            "memory_entries": len(self.memory.entries),
+            "memory_hits": memory_hits,
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": (memory_hits + hits) / lookups if lookups else 0.0,
+            "size_limit_mb": self.policy["size_limit_mb"],
+            "eviction": self.policy["eviction"],
+            "ttl_days": self.policy["ttl_days"],
+        }
+
+    def compact(self) -> dict:
+        """Drop expired entries and evict down to the size limit."""
+        return {"namespace": self.namespace, **self.backend.compact()}
+
+    def vacuum(self):
+        """Give space freed by deleted entries back to the filesystem."""
+        self.backend.vacuum()
+
+    def clear(self) -> int:
+        self.memory.clear()
+        return self.backend.clear()
+
+
+class CacheManager:
+    """
+    Namespaced caches (fetch, extraction, resume, job, match, index, limits) in one
+    directory or on one shared backend (see DEFAULT_BACKEND).
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        namespaces: list[str] = None,
+        backend_url: str = DEFAULT_BACKEND,
+    ):
+        self.directory = directory
+        self.backend_url = backend_url
+        self.namespaces = {
+            namespace: NamespaceCache(
+                directory, namespace, load_policy(namespace), backend_url
+            )
+            for namespace in (namespaces or NAMESPACE_POLICIES)
+        }
+
+    def __getitem__(self, namespace: str) -> NamespaceCache:
+        return self.namespaces[namespace]
+
+    def stats(self) -> list[dict]:
+        return [ns.stats() for ns in self.namespaces.values()]
+
+    def compact(self) -> list[dict]:
+        return [ns.compact() for ns in self.namespaces.values()]
+
+    def vacuum(self):
+        for ns in self.namespaces.values():
+            ns.vacuum()
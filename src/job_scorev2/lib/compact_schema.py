@@ -0,0 +1,70 @@
+import os
+
+from .rescoring import complete_match
+
+# Compact wire schema for the match and job requirement completions.
+# Completion tokens dominate call latency, so in "compact" mode the model
+# answers with short keys and without the fields derivable from the rest
+# (the score object with its counts and the decision, see
+# rescoring.complete_match), in provider JSON mode. The compact object is
+# expanded locally into the full JobVsResume / JobRequirements models, so
+# caches, records and callers only ever see the full schema.
+# "full" keeps the verbose schema of hr_tasks.yaml / job_tasks.yaml.
+SCHEMA_MODES = ("full", "compact")
+schema_mode = os.getenv("OUTPUT_SCHEMA_MODE", "full")
+# provider JSON mode (response_format) of the compact calls
+JSON_RESPONSE_FORMAT = {"type": "json_object"}
+COMPACT_TASK_SUFFIX = "_compact"
+
+MATCH_KEYS = {
+    "org": "organization",
+    "yoe": "years_of_experience",
+    "sum": "job_summary",
+    "req_ok": "matching_required_skills",
+    "req_no": "missing_required_skills",
+    "pref_ok": "matching_preferred_skills",
+    "pref_no": "missing_preferred_skills",
+    "cert_ok": "matching_certifications",
+    "cert_no": "missing_certifications",
+    "clr_ok": "matching_security_clearances",
+    "clr_no": "missing_security_clearances",
+    "why": "reason",
+}
+JOB_KEYS = {
+    "org": "organization",
+    "sum": "job_summary",
+    "yoe": "years_of_experience",
+    "req": "required_skills",
+    "pref": "preferred_skills",
+    "cert": "required_certifications",
+    "clr": "required_security_clearances",
+}
+
+
+def is_compact() -> bool:
+    return schema_mode == "compact"
+
+
+def task_name(task: str) -> str:
+    """The yaml task key of task in the current schema mode."""
+    return task + COMPACT_TASK_SUFFIX if is_compact() else task
+
+
+def expand_keys(data: dict, keys: dict) -> dict:
+    """Rename compact keys to full ones, full keys pass through unchanged."""
+    return {keys.get(key, key): value for key, value in data.items()}
+
+
+def expand_match(data: dict) -> dict:
+    """
+    Expand a compact match object into a full JobVsResume dict: rename the
+    keys, then derive the score object and decision from the match lists.
+    """
+    if not MATCH_KEYS.keys() & data.keys():
+        return data
+    return complete_match(expand_keys(data, MATCH_KEYS))
+
+
+def expand_job(data: dict) -> dict:
+    """Expand a compact job object into a full JobRequirements dict."""
+    return expand_keys(data, JOB_KEYS)
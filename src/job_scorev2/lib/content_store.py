@@ -0,0 +1,93 @@
+import hashlib
+import os
+import uuid
+
+# Content-addressed store of uploaded files and their extracted text, keyed
+# by the SHA-256 of the file bytes:
+#   {CONTENT_STORE_DIR}/ab/abcdef.../<original file name>   (source bytes)
+#   {CONTENT_STORE_DIR}/ab/abcdef.../extracted.md           (parsed text)
+# The same bytes uploaded again (under any name) resolve to the existing
+# entry, and a stored extraction is reused instead of converting again.
+CONTENT_STORE_DIR = os.getenv("CONTENT_STORE_DIR", "work/content")
+EXTRACTED_NAME = "extracted.md"
+CHUNK_SIZE = 1 << 20
+
+
+def digest_bytes(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def digest_file(path: str) -> str:
+    """SHA-256 of a file's bytes, read in chunks."""
+    sha = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+def _write_atomic(path: str, data: bytes):
+    # write under a temp name so a concurrent reader never sees a partial file
+    tmp_path = f"{path}.{uuid.uuid4().hex[:8]}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+class ContentStore:
+    """
+    Files and extracted text addressed by the SHA-256 of the file bytes.
+
+    Args:
+        directory: The root directory of the store.
+    """
+
+    def __init__(self, directory: str = CONTENT_STORE_DIR):
+        self.directory = directory
+
+    def entry_dir(self, digest: str) -> str:
+        return os.path.join(self.directory, digest[:2], digest)
+
+    def source_path(self, digest: str) -> str:
+        """The stored source file of digest, or None if it was never stored."""
+        entry_dir = self.entry_dir(digest)
+        if not os.path.isdir(entry_dir):
+            return None
+        for file_name in sorted(os.listdir(entry_dir)):
+            if file_name != EXTRACTED_NAME and not file_name.endswith(".tmp"):
+                return os.path.join(entry_dir, file_name)
+        return None
+
+    def put_bytes(self, data: bytes, file_name: str) -> tuple[str, bool]:
+        """
+        Store uploaded bytes, collapsing duplicates onto the existing entry.
+
+        Args:
+            data: The file bytes.
+            file_name: The name to store a new entry under.
+
+        Returns:
+            tuple[str, bool]: The stored file path, and whether it was new.
+        """
+        digest = digest_bytes(data)
+        existing = self.source_path(digest)
+        if existing:
+            return existing, False
+        os.makedirs(self.entry_dir(digest), exist_ok=True)
+        path = os.path.join(self.entry_dir(digest), os.path.basename(file_name))
+        _write_atomic(path, data)
+        return path, True
+
+    def get_text(self, digest: str) -> str:
+        """The stored extracted text of digest, or None."""
+        try:
+            with open(os.path.join(self.entry_dir(digest), EXTRACTED_NAME)) as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def put_text(self, digest: str, text: str):
+        os.makedirs(self.entry_dir(digest), exist_ok=True)
+        _write_atomic(
+            os.path.join(self.entry_dir(digest), EXTRACTED_NAME), text.encode()
+        )
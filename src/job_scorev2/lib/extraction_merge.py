@@ -0,0 +1,68 @@
+from collections import Counter
+
+from .models import JobRequirements, ResumeSkills
+from .skills import taxonomy
+
+# Deterministic reduce step of the map-reduce extraction of oversized
+# documents (see crew_analyzer.run_extraction): the partial results of the
+# chunks, in document order, are merged into one result. Lists are unioned
+# in order of first mention with taxonomy aliases collapsed, counts take the
+# maximum, and free text comes from the first chunk that has it.
+UNKNOWN_VALUES = {"", "unknown", "n/a", "none", "not specified"}
+
+
+def _known(value: str) -> bool:
+    return isinstance(value, str) and value.strip().lower() not in UNKNOWN_VALUES
+
+
+def _union(lists: list[list[str]], exclude: list[str] = ()) -> list[str]:
+    excluded = {taxonomy.canonical_key(item) for item in exclude}
+    merged = taxonomy.canonicalize([item for items in lists for item in items])
+    return [item for item in merged if taxonomy.canonical_key(item) not in excluded]
+
+
+def _most_common(values: list[str]) -> str:
+    known = [value.strip() for value in values if _known(value)]
+    if not known:
+        return values[0] if values else ""
+    counts = Counter(known)
+    # ties go to the earliest chunk
+    return max(known, key=lambda value: (counts[value], -known.index(value)))
+
+
+def merge_resume_skills(parts: list[ResumeSkills]) -> ResumeSkills:
+    return ResumeSkills(
+        resume_skills=_union([part.resume_skills for part in parts]),
+        years_of_experience=max(part.years_of_experience for part in parts),
+        certifications=_union([part.certifications for part in parts]),
+        security_clearances=_union([part.security_clearances for part in parts]),
+    )
+
+
+def merge_job_requirements(parts: list[JobRequirements]) -> JobRequirements:
+    required_skills = _union([part.required_skills for part in parts])
+    return JobRequirements(
+        organization=_most_common([part.organization for part in parts]),
+        job_summary=next(
+            (part.job_summary for part in parts if _known(part.job_summary)),
+            parts[0].job_summary,
+        ),
+        years_of_experience=max(part.years_of_experience for part in parts),
+        required_skills=required_skills,
+        # a skill required by one chunk is not also preferred
+        preferred_skills=_union(
+            [part.preferred_skills for part in parts], exclude=required_skills
+        ),
+        required_certifications=_union(
+            [part.required_certifications for part in parts]
+        ),
+        required_security_clearances=_union(
+            [part.required_security_clearances for part in parts]
+        ),
+    )
+
+
+MERGERS = {
+    ResumeSkills: merge_resume_skills,
+    JobRequirements: merge_job_requirements,
+}
@@ -0,0 +1,299 @@
+import os
+import re
+import sqlite3
+import threading
+
+from .skills import taxonomy
+
+# Persistent full-text index over the stored job postings in SQLite FTS5:
+# the extracted job text (as tokenize() tokens, so "c++" and "c#" survive)
+# plus the canonical skills of the taxonomy scan and of the cached
+# JobRequirements (in their own column). Queries support AND (implicit), OR,
+# NOT/-term, parentheses and "quoted phrases"; a query term that is a
+# taxonomy alias ("k8s", "TS/SCI") also matches postings with that canonical
+# skill. A query is compiled into one FTS5 MATCH expression, or into a
+# boolean condition over MATCH subqueries where FTS5 cannot express it (a
+# NOT without a positive term), so no doc id list ever leaves SQLite.
+JOB_INDEX_PATH = os.getenv("JOB_INDEX_PATH", "work/job_index.db")
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+[+#]*")
+QUERY_PATTERN = re.compile(r'"[^"]*"|\(|\)|-|[^\s()"]+')
+# a token tokenize() never produces, for terms that cannot match anything
+NO_MATCH = '"no_match_"'
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    doc_id INTEGER PRIMARY KEY,
+    path TEXT UNIQUE NOT NULL,
+    mtime REAL NOT NULL,
+    title TEXT
+);
+CREATE INDEX IF NOT EXISTS jobs_mtime ON jobs (mtime);
+CREATE VIRTUAL TABLE IF NOT EXISTS job_text USING fts5(
+    body, skills, tokenize = "unicode61 tokenchars '+#_'"
+);
+"""
+# doc ids of the postings matching an FTS5 expression
+MATCH_SQL = "SELECT rowid AS doc_id FROM job_text WHERE job_text MATCH ?"
+
+
+def tokenize(text: str) -> list[str]:
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+class QuerySyntaxError(ValueError):
+    pass
+
+
+class JobIndex:
+    """
+    Inverted index of the job postings in one storage directory.
+
+    Args:
+        db_path: The SQLite file of the index.
+        job_cache: The "job" cache namespace, to index the skills of cached
+            JobRequirements results (optional).
+    """
+
+    def __init__(self, db_path: str = JOB_INDEX_PATH, job_cache=None):
+        self.db_path = db_path
+        self.job_cache = job_cache
+        self.lock = threading.Lock()
+        with self._connect() as con:
+            con.execute("PRAGMA journal_mode=WAL")
+            if con.execute(
+                "SELECT 1 FROM sqlite_master WHERE name = 'postings'"
+            ).fetchone():
+                # the earlier term -> positions table, sync() re-indexes
+                con.execute("DROP TABLE postings")
+                con.execute("DELETE FROM jobs")
+            con.executescript(SCHEMA)
+        con.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def _skill_ids(self, text: str) -> tuple[set[str], str]:
+        skill_ids = set(taxonomy.scan(text))
+        title = None
+        record = self.job_cache.get(text) if self.job_cache is not None else None
+        if record and record.get("data"):
+            data = record["data"]
+            title = data.get("organization")
+            for field in (
+                "required_skills",
+                "preferred_skills",
+                "required_certifications",
+                "required_security_clearances",
+            ):
+                for skill in data.get(field) or []:
+                    skill_id = taxonomy.canonical_id(skill)
+                    if skill_id:
+                        skill_ids.add(skill_id)
+        return skill_ids, title
+
+    def add_document(self, path: str, text: str, mtime: float = None):
+        """Index (or re-index) the posting stored at path."""
+        skill_ids, title = self._skill_ids(text)
+        body = " ".join(tokenize(text))
+        mtime = mtime if mtime is not None else os.path.getmtime(path)
+        with self.lock, self._connect() as con:
+            row = con.execute(
+                "SELECT doc_id FROM jobs WHERE path = ?", (path,)
+            ).fetchone()
+            if row:
+                doc_id = row[0]
+                con.execute("DELETE FROM job_text WHERE rowid = ?", (doc_id,))
+                con.execute(
+                    "UPDATE jobs SET mtime = ?, title = ? WHERE doc_id = ?",
+                    (mtime, title, doc_id),
+                )
+            else:
+                doc_id = con.execute(
+                    "INSERT INTO jobs (path, mtime, title) VALUES (?, ?, ?)",
+                    (path, mtime, title),
+                ).lastrowid
+            con.execute(
+                "INSERT INTO job_text (rowid, body, skills) VALUES (?, ?, ?)",
+                (doc_id, body, " ".join(sorted(skill_ids))),
+            )
+        con.close()
+
+    def remove_document(self, path: str):
+        with self.lock, self._connect() as con:
+            row = con.execute(
+                "SELECT doc_id FROM jobs WHERE path = ?", (path,)
+            ).fetchone()
+            if row:
+                con.execute("DELETE FROM job_text WHERE rowid = ?", (row[0],))
+                con.execute("DELETE FROM jobs WHERE doc_id = ?", (row[0],))
+        con.close()
+
+    def sync(self, folder: str, extract_text) -> dict:
+        """
+        Bring the index up to date with a storage directory: index new and
+        modified files, drop deleted ones.
+
+        Args:
+            folder: The job storage directory.
+            extract_text: Function returning the text of a stored file.
+
+        Returns:
+            dict: Counts of added, updated and removed postings.
+        """
+        with self._connect() as con:
+            indexed = dict(con.execute("SELECT path, mtime FROM jobs"))
+        con.close()
+        counts = {"added": 0, "updated": 0, "removed": 0}
+        on_disk = set()
+        for entry in os.scandir(folder):
+            if not entry.is_file():
+                continue
+            on_disk.add(entry.path)
+            mtime = entry.stat().st_mtime
+            if indexed.get(entry.path) == mtime:
+                continue
+            text = extract_text(entry.path)
+            if not isinstance(text, str):
+                continue
+            counts["updated" if entry.path in indexed else "added"] += 1
+            self.add_document(entry.path, text, mtime)
+        for path in set(indexed) - on_disk:
+            self.remove_document(path)
+            counts["removed"] += 1
+        return counts
+
+    # -- queries --
+    def search(self, query: str, limit: int = 200) -> list[dict]:
+        """
+        Run a boolean/phrase query.
+
+        Args:
+            query: e.g. 'kubernetes AND ("ts/sci" OR "top secret") -contract'.
+            limit: Maximum number of results.
+
+        Returns:
+            list[dict]: {"path", "title"} of the matching postings, newest first.
+
+        Raises:
+            QuerySyntaxError: The query does not parse.
+        """
+        tokens = QUERY_PATTERN.findall(query)
+        if not tokens:
+            return []
+        condition, params = to_condition(parse_query(tokens))
+        with self._connect() as con:
+            rows = con.execute(
+                f"SELECT path, title FROM jobs WHERE {condition} "
+                "ORDER BY mtime DESC LIMIT ?",
+                (*params, limit),
+            ).fetchall()
+        con.close()
+        return [{"path": path, "title": title} for path, title in rows]
+
+
+def parse_query(tokens: list[str]) -> tuple:
+    """
+    Parse query tokens (QUERY_PATTERN) into a tree of ("term", text),
+    ("not", node), ("and", [nodes]) and ("or", [nodes]).
+    """
+    # recursive descent: or_expr := and_expr (OR and_expr)*
+    #                    and_expr := unary (AND? unary)*
+    #                    unary := (NOT | -) unary | ( or_expr ) | phrase | term
+    position = 0
+
+    def peek():
+        return tokens[position] if position < len(tokens) else None
+
+    def unary():
+        nonlocal position
+        token = peek()
+        if token is None:
+            raise QuerySyntaxError("unexpected end of query")
+        position += 1
+        if token in ("-", "NOT"):
+            return ("not", unary())
+        if token == "(":
+            result = or_expr()
+            if peek() != ")":
+                raise QuerySyntaxError("missing )")
+            position += 1
+            return result
+        if token == ")":
+            raise QuerySyntaxError("unexpected )")
+        return ("term", token.strip('"'))
+
+    def and_expr():
+        nonlocal position
+        nodes = [unary()]
+        while peek() not in (None, ")", "OR"):
+            if peek() == "AND":
+                position += 1
+            nodes.append(unary())
+        return nodes[0] if len(nodes) == 1 else ("and", nodes)
+
+    def or_expr():
+        nonlocal position
+        nodes = [and_expr()]
+        while peek() == "OR":
+            position += 1
+            nodes.append(and_expr())
+        return nodes[0] if len(nodes) == 1 else ("or", nodes)
+
+    result = or_expr()
+    if position != len(tokens):
+        raise QuerySyntaxError(f"unexpected {tokens[position]}")
+    return result
+
+
+def term_expression(text: str) -> str:
+    """FTS5 expression of a query term: its phrase, or its canonical skill."""
+    parts = []
+    tokens = tokenize(text)
+    if tokens:
+        parts.append(f'body : "{" ".join(tokens)}"')
+    skill_id = taxonomy.canonical_id(text)
+    if skill_id:
+        parts.append(f'skills : "{skill_id}"')
+    return f"({' OR '.join(parts)})" if parts else NO_MATCH
+
+
+def to_match(node: tuple) -> str:
+    """The node as one FTS5 MATCH expression, None if FTS5 cannot express it."""
+    kind = node[0]
+    if kind == "term":
+        return term_expression(node[1])
+    if kind == "not":
+        # FTS5 NOT is binary, "a NOT b" only
+        return None
+    positives = [to_match(child) for child in node[1] if child[0] != "not"]
+    negatives = [to_match(child[1]) for child in node[1] if child[0] == "not"]
+    if None in positives or None in negatives:
+        return None
+    if kind == "or":
+        return None if negatives else f"({' OR '.join(positives)})"
+    if not positives:
+        return None
+    return f"({' AND '.join(positives)})" + "".join(
+        f" NOT {negative}" for negative in negatives
+    )
+
+
+def to_condition(node: tuple) -> tuple[str, list]:
+    """
+    The node as a WHERE condition on jobs.doc_id: membership in one MATCH
+    where possible, else AND / OR / NOT of the children's conditions. Each
+    MATCH subquery runs once, and the newest-first scan of jobs can stop at
+    the result limit.
+
+    Returns:
+        tuple[str, list]: The SQL condition and its parameters.
+    """
+    expression = to_match(node)
+    if expression is not None:
+        return f"doc_id IN ({MATCH_SQL})", [expression]
+    if node[0] == "not":
+        condition, params = to_condition(node[1])
+        return f"NOT ({condition})", params
+    parts = [to_condition(child) for child in node[1]]
+    operator = " AND " if node[0] == "and" else " OR "
+    condition = operator.join(f"({part})" for part, _ in parts)
+    return condition, [p for _, part_params in parts for p in part_params]
@@ -0,0 +1,220 @@
+import atexit
+import fcntl
+import json
+import os
+import re
+import threading
+import time
+
+from pydantic import ValidationError
+
+# Tolerant parsing of LLM JSON output, so a malformed completion is repaired
+# locally instead of re-running the whole analysis. repair_json handles
+# markdown fences and surrounding prose, # and // comments (the prompt
+# examples have them), single-quoted strings, Python True/False/None,
+# trailing commas and objects truncated mid-way (open strings and brackets
+# are closed, a dangling key or comma is dropped).
+FENCE_PATTERN = re.compile(r"```(?:json)?\s*(.*?)(?:```|$)", re.DOTALL | re.IGNORECASE)
+PYTHON_LITERALS = {"True": "true", "False": "false", "None": "null"}
+DANGLING_KEY_PATTERN = re.compile(r'([{,])\s*"(?:[^"\\]|\\.)*"\s*$')
+# how LLM outputs were parsed: "clean", "repaired" (a re-ask avoided),
+# "fixed_by_llm" (cheap fix call) or "failed". Counted in memory and added
+# to the stats file (shared by every process) at most every
+# STATS_FLUSH_SECONDS and at exit.
+STATS_PATH = os.getenv("JSON_REPAIR_STATS_PATH", "work/json_repair_stats.json")
+STATS_FLUSH_SECONDS = float(os.getenv("JSON_REPAIR_STATS_FLUSH_SECONDS", "60"))
+OUTCOMES = ("clean", "repaired", "fixed_by_llm", "failed")
+_stats_lock = threading.Lock()
+# stats path -> outcome counts not yet in that file
+_pending = {}
+_last_flush = time.monotonic()
+
+
+class JSONRepairError(ValueError):
+    pass
+
+
+def _strip_fences(text: str) -> str:
+    match = FENCE_PATTERN.search(text)
+    if match and "{" in match.group(1):
+        text = match.group(1)
+    start = text.find("{")
+    if start == -1:
+        raise JSONRepairError("no JSON object in text")
+    return text[start:]
+
+
+def _drop_dangling(out: list[str]):
+    # remove a trailing comma, or a key whose value never arrived
+    text = "".join(out).rstrip()
+    while True:
+        trimmed = text.rstrip()
+        if trimmed.endswith(","):
+            text = trimmed[:-1]
+        elif trimmed.endswith(":"):
+            # drop the ':' and the key string before it
+            key_start = trimmed[:-1].rstrip().rfind('"', 0, len(trimmed) - 2)
+            text = trimmed[:key_start] if key_start != -1 else trimmed[:-1]
+        else:
+            break
+    out[:] = [text]
+
+
+def repair_json(text: str) -> str:
+    """
+    Rewrite almost-JSON into valid JSON text (best effort).
+
+    Raises:
+        JSONRepairError: If the text holds no JSON object.
+    """
+    text = _strip_fences(text)
+    out = []
+    stack = []
+    quote = None
+    escape = False
+    i = 0
+    while i < len(text):
+        char = text[i]
+        if quote:
+            if escape:
+                escape = False
+                out.append(char)
+            elif char == "\\":
+                escape = True
+                out.append(char)
+            elif char == quote:
+                quote = None
+                out.append('"')
+            elif char == '"':
+                # a double quote inside a single-quoted string
+                out.append('\\"')
+            elif char == "\n":
+                out.append("\\n")
+            else:
+                out.append(char)
+        elif char in "\"'":
+            quote = char
+            out.append('"')
+        elif char == "#" or text.startswith("//", i):
+            while i < len(text) and text[i] != "\n":
+                i += 1
+            continue
+        elif char in "{[":
+            stack.append("}" if char == "{" else "]")
+            out.append(char)
+        elif char in "}]":
+            _drop_dangling(out)
+            if stack:
+                out.append(stack.pop())
+            if not stack:
+                break
+        elif char.isalpha():
+            word = re.match(r"[A-Za-z]+", text[i:]).group(0)
+            out.append(PYTHON_LITERALS.get(word, word))
+            i += len(word)
+            continue
+        else:
+            out.append(char)
+        i += 1
+    if quote:
+        out.append('"')
+    if stack and stack[-1] == "}":
+        # truncated inside an object key
+        out[:] = [DANGLING_KEY_PATTERN.sub(r"\1", "".join(out))]
+    _drop_dangling(out)
+    out.extend(reversed(stack))
+    return "".join(out)
+
+
+def loads(text: str) -> tuple[dict, bool]:
+    """
+    Parse a JSON object from LLM output.
+
+    Returns:
+        tuple[dict, bool]: The object, and whether it needed repairs.
+
+    Raises:
+        JSONRepairError: If it cannot be parsed even after repairs.
+    """
+    try:
+        return json.loads(_strip_fences(text).strip().rstrip("`").strip()), False
+    except (json.JSONDecodeError, JSONRepairError):
+        pass
+    try:
+        parsed = json.loads(repair_json(text))
+    except json.JSONDecodeError as e:
+        raise JSONRepairError(f"unrepairable JSON: {e}") from e
+    if not isinstance(parsed, dict):
+        raise JSONRepairError("JSON is not an object")
+    return parsed, True
+
+
+def validate(data: dict, model_class, complete=None):
+    """
+    Validate data against a pydantic model (lax mode coerces "5" to 5).
+
+    Args:
+        data: The parsed object.
+        model_class: The pydantic model.
+        complete: Optional function filling fields that can be derived
+            locally (e.g. a score from the match lists), called on data
+            before a second validation attempt.
+
+    Raises:
+        pydantic.ValidationError: If it does not validate.
+    """
+    try:
+        return model_class.model_validate(data)
+    except ValidationError:
+        if complete is None:
+            raise
+    return model_class.model_validate(complete(dict(data)))
+
+
+def _read_stats(path: str) -> dict:
+    try:
+        with open(path) as f:
+            return {**dict.fromkeys(OUTCOMES, 0), **json.load(f)}
+    except (FileNotFoundError, json.JSONDecodeError):
+        return dict.fromkeys(OUTCOMES, 0)
+
+
+def stats(path: str = STATS_PATH) -> dict:
+    """Parse outcome counts so far, including the unflushed ones of this process."""
+    counts = _read_stats(path)
+    with _stats_lock:
+        for outcome, count in _pending.get(path, {}).items():
+            counts[outcome] += count
+    return counts
+
+
+def count_outcome(outcome: str, path: str = STATS_PATH):
+    with _stats_lock:
+        pending = _pending.setdefault(path, dict.fromkeys(OUTCOMES, 0))
+        pending[outcome] += 1
+        due = time.monotonic() - _last_flush >= STATS_FLUSH_SECONDS
+    if due:
+        flush_stats()
+
+
+@atexit.register
+def flush_stats():
+    """Add the counts of this process to the stats files."""
+    global _last_flush
+    with _stats_lock:
+        _last_flush = time.monotonic()
+        for path, pending in list(_pending.items()):
+            if not any(pending.values()):
+                continue
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            # other processes add their counts to the same file
+            with open(f"{path}.lock", "a") as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                counts = _read_stats(path)
+                for outcome, count in pending.items():
+                    counts[outcome] += count
+                tmp_path = f"{path}.{os.getpid()}.tmp"
+                with open(tmp_path, "w") as f:
+                    json.dump(counts, f)
+                os.replace(tmp_path, path)
+            del _pending[path]
@@ -0,0 +1,96 @@
+import json
+
+
+class IncrementalJSONParser:
+    """
+    Incrementally parses a single top-level JSON object from a token stream.
+
+    Text is fed in arbitrary chunks as it arrives from the LLM. Every time a
+    top-level field of the object is complete, it is returned from feed() as a
+    (key, value) pair, so callers can act on early fields before the whole
+    completion is available. Anything before the first '{' (e.g. a ```json
+    fence or "Final Answer:" prefix) is ignored.
+    """
+
+    def __init__(self):
+        self.buffer = ""
+        self.fields = {}
+        self.done = False
+        self._pos = 0
+        self._started = False
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._key_start = None
+        self._key = None
+        self._value_start = None
+
+    def feed(self, chunk: str) -> list[tuple[str, object]]:
+        """
+        Add a chunk of text and return the top-level fields completed by it.
+
+        Args:
+            chunk: The next piece of streamed text.
+
+        Returns:
+            list[tuple[str, object]]: The newly completed (key, value) pairs.
+        """
+        completed = []
+        if self.done or not chunk:
+            return completed
+        self.buffer += chunk
+        while self._pos < len(self.buffer) and not self.done:
+            char = self.buffer[self._pos]
+            if not self._started:
+                if char == "{":
+                    self._started = True
+                    self._depth = 1
+                self._pos += 1
+                continue
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                    if self._depth == 1 and self._key is None:
+                        # closing quote of a top-level key
+                        self._key = json.loads(
+                            self.buffer[self._key_start : self._pos + 1]
+                        )
+                self._pos += 1
+                continue
+
+            if char == '"':
+                self._in_string = True
+                if self._depth == 1 and self._key is None:
+                    self._key_start = self._pos
+            elif char == ":" and self._depth == 1 and self._value_start is None:
+                self._value_start = self._pos + 1
+            elif char in "{[":
+                self._depth += 1
+            elif char in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    self._complete_field(completed)
+                    self.done = True
+            elif char == "," and self._depth == 1:
+                self._complete_field(completed)
+            self._pos += 1
+        return completed
+
+    def _complete_field(self, completed: list):
+        if self._key is not None and self._value_start is not None:
+            value_text = self.buffer[self._value_start : self._pos].strip()
+            try:
+                value = json.loads(value_text)
+            except Exception:
+                # keep unparseable scalars as text rather than dropping them
+                value = value_text.strip('"')
+            self.fields[self._key] = value
+            completed.append((self._key, value))
+        self._key = None
+        self._key_start = None
+        self._value_start = None
@@ -0,0 +1,232 @@
+import functools
+import heapq
+import itertools
+import os
+import random
+import threading
+import time
+from .cache_manager import CacheManager
+
+# lower value is admitted first
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BATCH = 10
+
+
+class RateLimitExceeded(Exception):
+    """Raised when a call is still rate limited after all retries."""
+
+
+def is_rate_limit_error(exc: Exception) -> bool:
+    # litellm/openai raise RateLimitError, other providers surface a plain 429
+    return "RateLimit" in type(exc).__name__ or "429" in str(exc)
+
+
+class TokenBucket:
+    """
+    Classic token bucket refilled continuously at `rate` per second. Uses the
+    wall clock, its state is shared with other processes (see ModelLimits).
+    """
+
+    def __init__(self, capacity: float, rate: float):
+        self.capacity = capacity
+        self.rate = rate
+        self.tokens = capacity
+        self.updated = time.time()
+
+    def state(self) -> list:
+        return [self.tokens, self.updated]
+
+    def load(self, state: list):
+        self.tokens, self.updated = state
+
+    def _refill(self):
+        now = time.time()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until `amount` can be taken (0 if available now)."""
+        self._refill()
+        # a request larger than the bucket is admitted once the bucket is full
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate
+
+    def take(self, amount: float):
+        self._refill()
+        self.tokens -= min(amount, self.capacity)
+
+    def drain(self):
+        self._refill()
+        self.tokens = min(self.tokens, 0)
+
+
+class ModelLimits:
+    """
+    Request and token buckets of one model (requests/min, tokens/min).
+
+    With a store (a cache namespace) the bucket state lives there under key
+    and every operation is a read-modify-write of it, so all processes on
+    the same cache backend draw from one pair of buckets.
+    """
+
+    def __init__(self, rpm: int, tpm: int, store=None, key=None):
+        self.requests = TokenBucket(rpm, rpm / 60)
+        self.tokens = TokenBucket(tpm, tpm / 60)
+        self.store = store
+        self.key = key
+
+    def _apply(self, operation):
+        if self.store is None:
+            return operation()
+        result = None
+
+        def update(state):
+            nonlocal result
+            if state is None:
+                # first use: full buckets
+                self.requests.load([self.requests.capacity, time.time()])
+                self.tokens.load([self.tokens.capacity, time.time()])
+            else:
+                self.requests.load(state["requests"])
+                self.tokens.load(state["tokens"])
+            result = operation()
+            return {"requests": self.requests.state(), "tokens": self.tokens.state()}
+
+        self.store.update(self.key, update)
+        return result
+
+    def try_take(self, tokens: int) -> float:
+        """Take a request and `tokens` if both are available, else return
+        the seconds to wait."""
+
+        def operation():
+            wait = max(self.requests.wait_time(1), self.tokens.wait_time(tokens))
+            if wait == 0:
+                self.requests.take(1)
+                self.tokens.take(tokens)
+            return wait
+
+        return self._apply(operation)
+
+    def take_tokens(self, tokens: int):
+        self._apply(lambda: self.tokens.take(tokens))
+
+    def drain_requests(self):
+        self._apply(self.requests.drain)
+
+
+class LLMScheduler:
+    """
+    Central admission control for LLM calls.
+
+    Every call waits in a priority queue until it is first in line and the
+    model's request and token buckets can admit it. Rate limit errors that
+    still happen are retried with exponential backoff and jitter, and drain
+    the buckets so other queued calls back off too. The buckets are shared
+    by every process on the cache backend (the provider limits are per API
+    key, not per process); the priority queue orders the calls of this
+    process only.
+    """
+
+    def __init__(
+        self,
+        rpm: int = None,
+        tpm: int = None,
+        max_retries: int = 5,
+        base_backoff: float = 2.0,
+        store_factory=None,
+    ):
+        self.rpm = rpm or int(os.getenv("LLM_RPM_LIMIT", "500"))
+        self.tpm = tpm or int(os.getenv("LLM_TPM_LIMIT", "30000"))
+        self.max_retries = max_retries
+        self.base_backoff = base_backoff
+        # returns the cache namespace holding the shared buckets, None keeps
+        # them in this process
+        self.store_factory = store_factory
+        self.limits = {}
+        self.queue = []
+        self.counter = itertools.count()
+        self.condition = threading.Condition()
+
+    def _limits(self, model: str) -> ModelLimits:
+        if model not in self.limits:
+            store = self.store_factory() if self.store_factory else None
+            self.limits[model] = ModelLimits(
+                self.rpm, self.tpm, store, ("llm_limits", model)
+            )
+        return self.limits[model]
+
+    def admit(self, model: str, tokens: int, priority: int = PRIORITY_INTERACTIVE):
+        """Block until a call of `tokens` estimated tokens may be sent."""
+        ticket = (priority, next(self.counter))
+        with self.condition:
+            heapq.heappush(self.queue, ticket)
+            try:
+                while True:
+                    if self.queue[0] == ticket:
+                        wait = self._limits(model).try_take(tokens)
+                        if wait == 0:
+                            return
+                    else:
+                        wait = None
+                    self.condition.wait(timeout=wait)
+            finally:
+                self.queue.remove(ticket)
+                heapq.heapify(self.queue)
+                self.condition.notify_all()
+
+    def reconcile(self, model: str, estimated_tokens: int, actual_tokens: int):
+        """Charge the token bucket for the difference to the actual usage."""
+        if actual_tokens > estimated_tokens:
+            with self.condition:
+                self._limits(model).take_tokens(actual_tokens - estimated_tokens)
+
+    def backoff(self, model: str, attempt: int):
+        with self.condition:
+            self._limits(model).drain_requests()
+        delay = self.base_backoff * (2**attempt)
+        time.sleep(delay / 2 + random.uniform(0, delay / 2))
+
+    def run(
+        self,
+        fn,
+        model: str,
+        tokens: int,
+        priority: int = PRIORITY_INTERACTIVE,
+    ):
+        """
+        Run `fn()` under admission control, retrying rate limit errors.
+
+        Args:
+            fn: The call to make.
+            model: The model name the call is made against.
+            tokens: Estimated prompt plus completion tokens of the call.
+            priority: PRIORITY_INTERACTIVE or PRIORITY_BATCH.
+
+        Returns:
+            The result of fn().
+        """
+        for attempt in range(self.max_retries + 1):
+            self.admit(model, tokens, priority)
+            try:
+                return fn()
+            except Exception as e:
+                if not is_rate_limit_error(e):
+                    raise
+                print(f"Rate limited on {model} (attempt {attempt + 1}): {e}")
+                if attempt == self.max_retries:
+                    raise RateLimitExceeded(
+                        f"{model} still rate limited after {attempt + 1} attempts"
+                    ) from e
+                self.backoff(model, attempt)
+
+
+@functools.lru_cache(maxsize=1)
+def limits_store():
+    """The "limits" cache namespace, opened on first use."""
+    return CacheManager("work/cache", ["limits"])["limits"]
+
+
+scheduler = LLMScheduler(store_factory=limits_store)
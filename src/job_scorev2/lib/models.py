@@ -0,0 +1,52 @@
+from pydantic import BaseModel
+
+
+# pydantic models for output
+class ResumeSkills(BaseModel):
+    resume_skills: list[str]
+    years_of_experience: int
+    certifications: list[str]
+    security_clearances: list[str]
+
+
+class JobRequirements(BaseModel):
+    organization: str
+    job_summary: str
+    years_of_experience: int
+    required_skills: list[str]
+    preferred_skills: list[str]
+    required_certifications: list[str]
+    required_security_clearances: list[str]
+
+
+class JobScore(BaseModel):
+    final_score: float
+    required_skill_match_score: float
+    preferred_skill_match_score: float
+    matching_required_skills_count: int
+    missing_required_skills_count: int
+    matching_preferred_skills_count: int
+    missing_preferred_skills_count: int
+    total_required_skills_count: int
+    total_preferred_skills_count: int
+    matching_certifications_count: int
+    missing_certifications_count: int
+    matching_security_clearances_count: int
+    missing_security_clearances_count: int
+
+
+class JobVsResume(BaseModel):
+    matching_required_skills: list[str]
+    missing_required_skills: list[str]
+    matching_preferred_skills: list[str]
+    missing_preferred_skills: list[str]
+    matching_certifications: list[str]
+    missing_certifications: list[str]
+    matching_security_clearances: list[str]
+    missing_security_clearances: list[str]
+    score: JobScore
+    organization: str
+    years_of_experience: int
+    job_summary: str
+    decision: str
+    reason: str
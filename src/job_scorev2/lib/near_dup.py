@@ -0,0 +1,145 @@
+import hashlib
+import os
+import re
+
+# MinHash over word shingles with LSH banding: BANDS * ROWS permutations.
+# With 32 bands of 4 rows, pairs above ~0.5 jaccard almost always share a
+# band and become candidates, which are then checked against the threshold.
+SHINGLE_SIZE = 5
+BANDS = 32
+ROWS = 4
+NUM_PERM = BANDS * ROWS
+DEFAULT_THRESHOLD = float(os.getenv("NEAR_DUP_THRESHOLD", "0.85"))
+USE_VECTORS = os.getenv("NEAR_DUP_USE_VECTORS", "false").lower() == "true"
+VECTOR_THRESHOLD = 0.95
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+_seed = hashlib.sha256(b"job_scorev2.near_dup").digest()
+_PERMUTATIONS = [
+    (
+        int.from_bytes(hashlib.sha256(_seed + bytes([i, 0])).digest()[:8], "big")
+        % _MERSENNE_PRIME
+        | 1,
+        int.from_bytes(hashlib.sha256(_seed + bytes([i, 1])).digest()[:8], "big")
+        % _MERSENNE_PRIME,
+    )
+    for i in range(NUM_PERM)
+]
+
+
+def normalize_text(text: str) -> list[str]:
+    """Lowercase word tokens, ignoring whitespace, markdown and punctuation."""
+    return re.findall(r"[a-z0-9+#]+", text.lower())
+
+
+def shingles(text: str, size: int = SHINGLE_SIZE) -> set[str]:
+    words = normalize_text(text)
+    if len(words) <= size:
+        return {" ".join(words)}
+    return {" ".join(words[i : i + size]) for i in range(len(words) - size + 1)}
+
+
+def minhash_signature(text: str) -> list[int]:
+    hashes = [
+        int.from_bytes(hashlib.blake2b(s.encode(), digest_size=4).digest(), "big")
+        for s in shingles(text)
+    ]
+    return [
+        min(((a * h + b) % _MERSENNE_PRIME) & _MAX_HASH for h in hashes)
+        for a, b in _PERMUTATIONS
+    ]
+
+
+def estimated_jaccard(signature_a: list[int], signature_b: list[int]) -> float:
+    same = sum(1 for a, b in zip(signature_a, signature_b) if a == b)
+    return same / len(signature_a)
+
+
+def _band_hashes(signature: list[int]) -> list[str]:
+    return [
+        hashlib.blake2b(
+            repr(signature[i * ROWS : (i + 1) * ROWS]).encode(), digest_size=8
+        ).hexdigest()
+        for i in range(BANDS)
+    ]
+
+
+def _vector_similarity(text_a: str, text_b: str) -> float:
+    from . import utils
+
+    nlp = utils.get_nlp()
+    doc_a = nlp(text_a)
+    doc_b = nlp(text_b)
+    if not doc_a.vector_norm or not doc_b.vector_norm:
+        return 0.0
+    return doc_a.similarity(doc_b)
+
+
+class NearDuplicateIndex:
+    """
+    Persistent MinHash LSH index of texts, stored in a cache namespace.
+
+    Each indexed text keeps its signature and a label (shown to the user
+    when the entry is reused). lookup() returns the most similar indexed
+    text at or above the threshold, optionally confirmed by spaCy vectors.
+    """
+
+    def __init__(self, cache, kind: str, threshold: float = DEFAULT_THRESHOLD):
+        self.cache = cache
+        self.kind = kind
+        self.threshold = threshold
+
+    def _entry_key(self, text: str) -> tuple:
+        digest = hashlib.sha256(text.encode()).hexdigest()
+        return ("near_dup", self.kind, "entry", digest)
+
+    def _band_key(self, band: int, band_hash: str) -> tuple:
+        return ("near_dup", self.kind, "band", band, band_hash)
+
+    def add(self, text: str, label: str):
+        entry_key = self._entry_key(text)
+        if entry_key in self.cache:
+            return
+        signature = minhash_signature(text)
+        self.cache[entry_key] = {"signature": signature, "text": text, "label": label}
+        for band, band_hash in enumerate(_band_hashes(signature)):
+            # several processes index jobs: a plain get and set of the member
+            # list would drop members added concurrently
+            self.cache.add_member(self._band_key(band, band_hash), entry_key)
+
+    def lookup(self, text: str, threshold: float = None) -> dict:
+        """
+        Find the closest indexed near-duplicate of text.
+
+        Args:
+            text: The text to look up.
+            threshold: Minimum estimated jaccard similarity, defaults to the
+                index threshold.
+
+        Returns:
+            dict: {"text", "label", "similarity"} of the best match, or None.
+        """
+        threshold = self.threshold if threshold is None else threshold
+        signature = minhash_signature(text)
+        candidates = set()
+        for band, band_hash in enumerate(_band_hashes(signature)):
+            candidates.update(self.cache.get(self._band_key(band, band_hash), []))
+        best = None
+        for entry_key in candidates:
+            entry = self.cache.get(entry_key)
+            if entry is None:
+                continue
+            similarity = estimated_jaccard(signature, entry["signature"])
+            if similarity >= threshold and (
+                best is None or similarity > best["similarity"]
+            ):
+                best = {
+                    "text": entry["text"],
+                    "label": entry["label"],
+                    "similarity": similarity,
+                }
+        if best and USE_VECTORS:
+            if _vector_similarity(text, best["text"]) < VECTOR_THRESHOLD:
+                return None
+        return best
@@ -0,0 +1,144 @@
+import os
+import re
+from pathlib import Path
+
+import yaml
+
+CONFIG_DIR = Path(__file__).resolve().parent.parent / "config"
+# same placeholder syntax crewai interpolates in task/agent yaml ({name})
+PLACEHOLDER_PATTERN = re.compile(r"\{([A-Za-z_][A-Za-z0-9_]*)\}")
+
+
+def load_config(file_name: str) -> dict:
+    with open(CONFIG_DIR / file_name, "r") as f:
+        return yaml.safe_load(f)
+
+
+def interpolate(template: str, inputs: dict) -> str:
+    """
+    Replace {name} placeholders with values from inputs.
+
+    Unknown placeholders and other braces (e.g. the JSON examples in
+    expected_output) are left untouched.
+    """
+    return PLACEHOLDER_PATTERN.sub(
+        lambda m: str(inputs[m.group(1)]) if m.group(1) in inputs else m.group(0),
+        template,
+    )
+
+
+def render_task_messages(
+    agents_file: str, tasks_file: str, agent_name: str, task_name: str, inputs: dict
+) -> list[dict]:
+    """
+    Render a yaml task into chat messages outside of a crew.
+
+    The layout follows what crewai sends for a single-task agent without
+    tools: the agent persona as the system message and the task description
+    plus expected output as the user message.
+
+    Args:
+        agents_file: The agents yaml file name in the config directory.
+        tasks_file: The tasks yaml file name in the config directory.
+        agent_name: The agent key in the agents yaml.
+        task_name: The task key in the tasks yaml.
+        inputs: The task inputs.
+
+    Returns:
+        list[dict]: The chat messages.
+    """
+    agent_config = load_config(agents_file)[agent_name]
+    task_config = load_config(tasks_file)[task_name]
+    system_prompt = (
+        f"You are {agent_config['role']}. {agent_config['backstory'].strip()}\n"
+        f"Your personal goal is: {agent_config['goal']}"
+    )
+    description = interpolate(task_config["description"], inputs)
+    expected_output = interpolate(task_config["expected_output"], inputs)
+    user_prompt = (
+        f"Current Task: {description}\n\n"
+        f"This is the expected criteria for your final answer: {expected_output}\n"
+        "you MUST return the actual complete content as the final answer, "
+        "not a summary.\n\nBegin!"
+    )
+    return [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": user_prompt},
+    ]
+
+
+# -- match prompt layout --
+# Providers cache the longest previously seen prompt prefix. The match prompt
+# is therefore assembled static instructions first (in hr_tasks.yaml), then
+# the per-resume block, then the per-job block, so scoring one resume against
+# many jobs re-uses everything up to the job block.
+# "legacy" keeps the old job-before-resume order for benchmarking.
+MATCH_LAYOUTS = {
+    "prefix_cache": ("resume", "job"),
+    "legacy": ("job", "resume"),
+}
+match_layout = os.getenv("HR_PROMPT_LAYOUT", "prefix_cache")
+
+
+def build_resume_block(resume: str, us_citizen: bool, security_clearance: str) -> str:
+    return (
+        "## Candidate\n"
+        f"* Candidate is US Citizen: {us_citizen}\n"
+        f"* Candidate has Security Clearance: {security_clearance}\n"
+        "* Resume:\n"
+        "--- START OF RESUME ---\n"
+        f"{resume}\n"
+        "--- END OF RESUME ---\n"
+    )
+
+
+def build_job_block(job_description: str, job_details: dict) -> str:
+    return (
+        "## Job\n"
+        f"* Job url: {job_details.get('job_url', 'Unknown')}\n"
+        f"* Job ID: {job_details.get('job_id', 'Unknown')}\n"
+        f"* Job Source: {job_details.get('job_source', 'Unknown')}\n"
+        "* Job description:\n"
+        "--- START OF JOB DESCRIPTION ---\n"
+        f"{job_description}\n"
+        "--- END OF JOB DESCRIPTION ---\n"
+    )
+
+
+def assemble_match_inputs(
+    job_description: str,
+    resume: str,
+    job_details: dict,
+    us_citizen: bool,
+    security_clearance: str,
+    layout: str = None,
+) -> dict:
+    """
+    Assemble the variable part of the match prompt in cache-friendly order.
+
+    Args:
+        job_description: The job description text.
+        resume: The resume text.
+        job_details: The job details.
+        us_citizen: Whether the candidate is a US citizen.
+        security_clearance: The candidate's security clearance.
+        layout: A MATCH_LAYOUTS key, defaults to match_layout.
+
+    Returns:
+        dict: The hr_tasks.yaml inputs.
+    """
+    blocks = {
+        "resume": build_resume_block(resume, us_citizen, security_clearance),
+        "job": build_job_block(job_description, job_details),
+    }
+    order = MATCH_LAYOUTS[layout or match_layout]
+    return {"match_inputs": "\n".join(blocks[name] for name in order)}
+
+
+def cached_token_ratio(usage_metrics_list: list[dict]) -> float:
+    """Share of prompt tokens served from the provider prompt cache."""
+    prompt_tokens = sum(u.get("prompt_tokens", 0) for u in usage_metrics_list)
+    cached_tokens = sum(u.get("cached_prompt_tokens", 0) for u in usage_metrics_list)
+    if prompt_tokens == 0:
+        return 0.0
+    return cached_tokens / prompt_tokens
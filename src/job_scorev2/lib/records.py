@@ -0,0 +1,125 @@
+import json
+import os
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+from .models import ResumeSkills, JobRequirements, JobVsResume
+
+# Cached crew results are stored as small versioned records instead of
+# pickled CrewOutput objects: the parsed pydantic result plus the metadata
+# the callers need. Transcripts stay in the crew output storage dir and are
+# only read on demand via load_transcript().
+SCHEMA_VERSION = 1
+RECORD_MODELS = {
+    "resume": ResumeSkills,
+    "job": JobRequirements,
+    "match": JobVsResume,
+}
+# MIGRATIONS[v] upgrades a version v record to version v + 1
+MIGRATIONS = {}
+
+
+def make_record(
+    kind: str, data, save_path: str, metadata: dict = None, raw: str = None
+) -> dict:
+    """
+    Build a cache record.
+
+    Args:
+        kind: "resume", "job" or "match".
+        data: The parsed result (model dump), or None if it could not be parsed.
+        save_path: The transcript file name in the crew output storage dir.
+        metadata: Extra fields callers need back on a hit (e.g. job_details).
+        raw: The raw output, only kept when data could not be parsed.
+
+    Returns:
+        dict: The record.
+    """
+    record = {
+        "v": SCHEMA_VERSION,
+        "kind": kind,
+        "data": data,
+        "save_path": save_path,
+        "meta": metadata or {},
+    }
+    if data is None:
+        record["raw"] = raw
+    return record
+
+
+def from_legacy(kind: str, value) -> dict:
+    """
+    Convert a legacy cache entry, a pickled (CrewOutput, save_path) tuple
+    (plus job_details for jobs), into a record.
+
+    Returns:
+        dict: The record, or None if value is not a legacy entry.
+    """
+    if not isinstance(value, (tuple, list)) or len(value) < 2:
+        return None
+    crew_output, save_path = value[0], value[1]
+    if not hasattr(crew_output, "raw") or not isinstance(save_path, str):
+        return None
+    pydantic = getattr(crew_output, "pydantic", None)
+    data = pydantic.model_dump() if pydantic is not None else crew_output.json_dict
+    metadata = None
+    if kind == "job" and len(value) > 2 and isinstance(value[2], dict):
+        metadata = {"job_details": value[2]}
+    return make_record(kind, data, save_path, metadata, crew_output.raw)
+
+
+def dumps(record: dict) -> bytes:
+    if msgpack is not None:
+        return msgpack.packb(record, use_bin_type=True)
+    return json.dumps(record, separators=(",", ":")).encode()
+
+
+def loads(blob) -> dict:
+    """
+    Decode and upgrade a cached record.
+
+    Returns:
+        dict: The record at SCHEMA_VERSION, or None if blob is not a record
+            or cannot be upgraded. Legacy pickled CrewOutput entries are
+            converted once by "cache_cli.py migrate" (see from_legacy).
+    """
+    if not isinstance(blob, bytes):
+        return None
+    try:
+        # json records start with "{", anything else is msgpack
+        if blob[:1] == b"{":
+            record = json.loads(blob)
+        elif msgpack is not None:
+            record = msgpack.unpackb(blob, raw=False)
+        else:
+            return None
+    except Exception:
+        return None
+    while record.get("v", 0) < SCHEMA_VERSION:
+        migrate = MIGRATIONS.get(record.get("v", 0))
+        if migrate is None:
+            return None
+        record = migrate(record)
+    if record.get("v") != SCHEMA_VERSION:
+        return None
+    return record
+
+
+def to_model(record: dict):
+    """The record's data as its pydantic model, or None if it does not validate."""
+    if record["data"] is None:
+        return None
+    try:
+        return RECORD_MODELS[record["kind"]].model_validate(record["data"])
+    except Exception:
+        return None
+
+
+def load_transcript(record: dict) -> str:
+    """Read the full crew transcript of a record from the crew output dir."""
+    crew_output_storage_dir = os.getenv("CREW_OUTPUT_STORAGE_DIR")
+    with open(os.path.join(crew_output_storage_dir, record["save_path"]), "r") as f:
+        return f.read()
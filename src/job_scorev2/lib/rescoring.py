@@ -0,0 +1,252 @@
+from .models import ResumeSkills, JobScore, JobVsResume
+from .skills import taxonomy
+
+# Local re-scoring of cached job vs resume results after a resume edit.
+# The match lists of a cached JobVsResume are patched with the skills that
+# were added to or removed from the resume and the JobScore is recomputed
+# with the formula of hr_tasks.yaml. Only pairs whose decision could flip
+# (an edit that cannot be resolved exactly and straddles the threshold, a
+# clearance or experience change) need the LLM again.
+PASS_THRESHOLD = 0.7
+REQUIRED_WEIGHT = 0.7
+PREFERRED_WEIGHT = 0.3
+
+# ResumeSkills field -> the JobVsResume (matching, missing) lists it feeds
+DIFF_CATEGORIES = {
+    "resume_skills": [
+        ("matching_required_skills", "missing_required_skills"),
+        ("matching_preferred_skills", "missing_preferred_skills"),
+    ],
+    "certifications": [("matching_certifications", "missing_certifications")],
+    "security_clearances": [
+        ("matching_security_clearances", "missing_security_clearances")
+    ],
+}
+
+
+def skill_diff(old: ResumeSkills, new: ResumeSkills) -> dict:
+    """
+    The skills, certifications and clearances that changed between two
+    extractions of a resume, compared by canonical skill (see lib/skills.py).
+
+    Returns:
+        dict: {field: {"added": [...], "removed": [...]}} per DIFF_CATEGORIES
+            field, plus "years_of_experience": (old, new).
+    """
+    diff = {}
+    for field in DIFF_CATEGORIES:
+        old_items = {taxonomy.canonical_key(i): i for i in getattr(old, field)}
+        new_items = {taxonomy.canonical_key(i): i for i in getattr(new, field)}
+        diff[field] = {
+            "added": [new_items[k] for k in new_items if k not in old_items],
+            "removed": [old_items[k] for k in old_items if k not in new_items],
+        }
+    diff["years_of_experience"] = (old.years_of_experience, new.years_of_experience)
+    return diff
+
+
+def is_empty_diff(diff: dict) -> bool:
+    old_years, new_years = diff["years_of_experience"]
+    return old_years == new_years and not any(
+        diff[field]["added"] or diff[field]["removed"] for field in DIFF_CATEGORIES
+    )
+
+
+def _ratio(matching: int, missing: int) -> float:
+    # a category without requirements cannot be missed
+    total = matching + missing
+    return matching / total if total else 1.0
+
+
+def _final_score(
+    required_matching: int,
+    required_missing: int,
+    preferred_matching: int,
+    preferred_missing: int,
+) -> float:
+    return round(
+        _ratio(required_matching, required_missing) * REQUIRED_WEIGHT
+        + _ratio(preferred_matching, preferred_missing) * PREFERRED_WEIGHT,
+        4,
+    )
+
+
+def score_bounds(
+    required_matching: int,
+    required_missing: int,
+    preferred_matching: int,
+    preferred_missing: int,
+    removed: int = 0,
+    added: int = 0,
+) -> tuple[float, float]:
+    """
+    The lowest and highest final score reachable when each of removed items
+    may cost one matching requirement and each of added items may cover one
+    missing requirement, required or preferred, whichever moves the score
+    the most (a preferred item can outweigh a required one).
+
+    Returns:
+        tuple[float, float]: (lowest, highest) final score.
+    """
+
+    def splits(count, required_available, preferred_available):
+        for required in range(min(count, required_available) + 1):
+            yield required, min(count - required, preferred_available)
+
+    lowest = min(
+        _final_score(
+            required_matching - required,
+            required_missing + required,
+            preferred_matching - preferred,
+            preferred_missing + preferred,
+        )
+        for required, preferred in splits(
+            removed, required_matching, preferred_matching
+        )
+    )
+    highest = max(
+        _final_score(
+            required_matching + required,
+            required_missing - required,
+            preferred_matching + preferred,
+            preferred_missing - preferred,
+        )
+        for required, preferred in splits(added, required_missing, preferred_missing)
+    )
+    return lowest, highest
+
+
+def compute_score(match: dict) -> JobScore:
+    """Recompute the JobScore of a JobVsResume dict from its match lists."""
+    counts = {
+        f"{kind}_{name}_count": len(match[f"{kind}_{name}"])
+        for kind in ("matching", "missing")
+        for name in (
+            "required_skills",
+            "preferred_skills",
+            "certifications",
+            "security_clearances",
+        )
+    }
+    required = _ratio(
+        counts["matching_required_skills_count"],
+        counts["missing_required_skills_count"],
+    )
+    preferred = _ratio(
+        counts["matching_preferred_skills_count"],
+        counts["missing_preferred_skills_count"],
+    )
+    return JobScore(
+        final_score=_final_score(
+            counts["matching_required_skills_count"],
+            counts["missing_required_skills_count"],
+            counts["matching_preferred_skills_count"],
+            counts["missing_preferred_skills_count"],
+        ),
+        required_skill_match_score=round(required, 4),
+        preferred_skill_match_score=round(preferred, 4),
+        total_required_skills_count=counts["matching_required_skills_count"]
+        + counts["missing_required_skills_count"],
+        total_preferred_skills_count=counts["matching_preferred_skills_count"]
+        + counts["missing_preferred_skills_count"],
+        **counts,
+    )
+
+
+def decide(final_score: float) -> str:
+    return "Pass" if final_score >= PASS_THRESHOLD else "Fail"
+
+
+def complete_match(match: dict) -> dict:
+    """
+    Fill the fields of a partial JobVsResume dict that follow from its match
+    lists (score, decision, reason), e.g. of a completion truncated before
+    its final score object. Missing lists count as empty.
+    """
+    for pairs in DIFF_CATEGORIES.values():
+        for matching, missing in pairs:
+            match.setdefault(matching, [])
+            match.setdefault(missing, [])
+    if not isinstance(match.get("score"), dict) or "final_score" not in match["score"]:
+        match["score"] = compute_score(match).model_dump()
+    final_score = match["score"]["final_score"]
+    match.setdefault("decision", decide(final_score))
+    match.setdefault(
+        "reason", f"Score {final_score:.0%} computed from the matched skill lists"
+    )
+    return match
+
+
+def _move(match: dict, source: str, target: str, item: str) -> bool:
+    """Move item (by canonical skill) from match[source] to match[target]."""
+    for existing in match[source]:
+        if taxonomy.canonical_key(existing) == taxonomy.canonical_key(item):
+            match[source].remove(existing)
+            match[target].append(existing)
+            return True
+    return False
+
+
+def rescore_match(match: JobVsResume, diff: dict) -> tuple[JobVsResume, str]:
+    """
+    Apply a resume skill diff to a cached job vs resume result.
+
+    Added resume items that name a missing requirement become matching and
+    removed items that name a matching requirement become missing. Items that
+    do not name a requirement exactly may still match one semantically, so
+    the score is bounded by assuming each of them could move one requirement,
+    and the decision is only trusted when both bounds agree.
+
+    Args:
+        match: The cached result for the old resume.
+        diff: skill_diff(old resume skills, new resume skills).
+
+    Returns:
+        tuple[JobVsResume, str]: The re-scored result, and why the LLM is
+            needed again (None when the local result is final).
+    """
+    data = match.model_dump()
+    unresolved_added = 0
+    unresolved_removed = 0
+    for field, list_pairs in DIFF_CATEGORIES.items():
+        for item in diff[field]["added"]:
+            if not any(_move(data, missing, hit, item) for hit, missing in list_pairs):
+                unresolved_added += 1
+        for item in diff[field]["removed"]:
+            if not any(_move(data, hit, missing, item) for hit, missing in list_pairs):
+                unresolved_removed += 1
+
+    score = compute_score(data)
+    data["score"] = score.model_dump()
+    data["decision"] = decide(score.final_score)
+    rescored = JobVsResume.model_validate(data)
+
+    if decide(compute_score(match.model_dump()).final_score) != match.decision:
+        # the cached decision was a judgement call beyond the score formula
+        return rescored, "cached decision does not follow the score formula"
+    old_years, new_years = diff["years_of_experience"]
+    required_years = match.years_of_experience
+    if (old_years >= required_years) != (new_years >= required_years):
+        return rescored, "years of experience crossed the requirement"
+    if bool(match.missing_security_clearances) != bool(
+        rescored.missing_security_clearances
+    ):
+        return rescored, "security clearance requirement changed"
+
+    # worst case every unresolved removal costs a matching requirement,
+    # best case every unresolved addition covers a missing one
+    lowest, highest = score_bounds(
+        score.matching_required_skills_count,
+        score.missing_required_skills_count,
+        score.matching_preferred_skills_count,
+        score.missing_preferred_skills_count,
+        unresolved_removed,
+        unresolved_added,
+    )
+    if decide(lowest) != decide(highest):
+        return rescored, "unresolved skill changes straddle the pass threshold"
+    rescored.reason = (
+        f"Re-scored locally after a resume edit: score {score.final_score:.0%} is "
+        f"{'above' if rescored.decision == 'Pass' else 'below'} {PASS_THRESHOLD:.0%}"
+    )
+    return rescored, None
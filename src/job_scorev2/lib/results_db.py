@@ -0,0 +1,256 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+
+from .skills import taxonomy
+
+# Flat, indexed table of every job vs resume result, written next to the match
+# cache so the leaderboard can rank all scored jobs of a resume with one query
+# instead of decoding cache records.
+RESULTS_DB_PATH = os.getenv("RESULTS_DB_PATH", "work/results.db")
+ORDER_COLUMNS = {
+    "final_score": "final_score",
+    "required_skill_match_score": "required_skill_match_score",
+    "decision": "decision",
+    "organization": "organization COLLATE NOCASE",
+}
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS match_results (
+    resume_hash TEXT NOT NULL,
+    job_hash TEXT NOT NULL,
+    us_citizen INTEGER NOT NULL,
+    security_clearance TEXT NOT NULL,
+    organization TEXT,
+    job_source TEXT,
+    job_id TEXT,
+    job_url TEXT,
+    required_clearances TEXT,
+    final_score REAL,
+    required_skill_match_score REAL,
+    decision TEXT,
+    reason TEXT,
+    save_path TEXT,
+    scored_at REAL,
+    PRIMARY KEY (resume_hash, job_hash, us_citizen, security_clearance)
+);
+CREATE INDEX IF NOT EXISTS match_results_score
+    ON match_results (resume_hash, final_score DESC);
+CREATE INDEX IF NOT EXISTS match_results_source
+    ON match_results (resume_hash, job_source);
+-- required clearances of a result by taxonomy.canonical_key, for exact
+-- filtering ("Secret" must not match "Top Secret")
+CREATE TABLE IF NOT EXISTS match_clearances (
+    resume_hash TEXT NOT NULL,
+    job_hash TEXT NOT NULL,
+    us_citizen INTEGER NOT NULL,
+    security_clearance TEXT NOT NULL,
+    clearance_key TEXT NOT NULL,
+    PRIMARY KEY (resume_hash, job_hash, us_citizen, security_clearance, clearance_key)
+);
+CREATE INDEX IF NOT EXISTS match_clearances_key
+    ON match_clearances (resume_hash, clearance_key);
+"""
+RESULT_KEY_COLUMNS = "resume_hash, job_hash, us_citizen, security_clearance"
+# the match_clearances rows of a match_results row
+RESULT_CLEARANCES = (
+    "SELECT 1 FROM match_clearances c WHERE c.resume_hash = match_results.resume_hash "
+    "AND c.job_hash = match_results.job_hash "
+    "AND c.us_citizen = match_results.us_citizen "
+    "AND c.security_clearance = match_results.security_clearance"
+)
+_initialized = set()
+_lock = threading.Lock()
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode()).hexdigest()[:32]
+
+
+def connect(db_path: str = RESULTS_DB_PATH) -> sqlite3.Connection:
+    con = sqlite3.connect(db_path, timeout=30)
+    con.row_factory = sqlite3.Row
+    with _lock:
+        if db_path not in _initialized:
+            con.execute("PRAGMA journal_mode=WAL")
+            con.executescript(SCHEMA)
+            _backfill_clearances(con)
+            _initialized.add(db_path)
+    return con
+
+
+def _write_clearances(con: sqlite3.Connection, result_key: tuple, clearances):
+    con.execute(
+        f"DELETE FROM match_clearances WHERE ({RESULT_KEY_COLUMNS}) = (?, ?, ?, ?)",
+        result_key,
+    )
+    con.executemany(
+        "INSERT OR IGNORE INTO match_clearances VALUES (?, ?, ?, ?, ?)",
+        [
+            (*result_key, taxonomy.canonical_key(clearance))
+            for clearance in clearances
+            if clearance.strip()
+        ],
+    )
+
+
+def _backfill_clearances(con: sqlite3.Connection):
+    # results stored before match_clearances existed
+    unindexed = RESULT_CLEARANCES.replace("match_results.", "m.")
+    rows = con.execute(
+        f"SELECT {RESULT_KEY_COLUMNS}, required_clearances FROM match_results m "
+        f"WHERE required_clearances != '' AND NOT EXISTS ({unindexed})"
+    ).fetchall()
+    with con:
+        for row in rows:
+            _write_clearances(con, tuple(row)[:4], row[4].split(", "))
+
+
+def upsert_match(
+    cache_key: tuple, record: dict, job_details: dict, db_path: str = RESULTS_DB_PATH
+):
+    """
+    Insert or replace the row of a match cache record.
+
+    Args:
+        cache_key: The hr_cache_key (job text, resume text, us_citizen, clearance).
+        record: The match record (see lib/records.py).
+        job_details: The job details (job_source, job_id, job_url).
+    """
+    job_text, resume_text, us_citizen, security_clearance = cache_key
+    data = record["data"] or {}
+    score = data.get("score") or {}
+    required_clearances = sorted(
+        set(data.get("matching_security_clearances", []))
+        | set(data.get("missing_security_clearances", []))
+    )
+    with connect(db_path) as con:
+        con.execute(
+            "INSERT OR REPLACE INTO match_results VALUES "
+            "(?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                text_hash(resume_text),
+                text_hash(job_text),
+                int(bool(us_citizen)),
+                security_clearance,
+                data.get("organization"),
+                (job_details or {}).get("job_source") or "Unknown",
+                (job_details or {}).get("job_id"),
+                (job_details or {}).get("job_url"),
+                ", ".join(required_clearances),
+                score.get("final_score"),
+                score.get("required_skill_match_score"),
+                data.get("decision"),
+                data.get("reason"),
+                record["save_path"],
+                time.time(),
+            ),
+        )
+        _write_clearances(
+            con,
+            (
+                text_hash(resume_text),
+                text_hash(job_text),
+                int(bool(us_citizen)),
+                security_clearance,
+            ),
+            required_clearances,
+        )
+    con.close()
+
+
+def leaderboard(
+    resume_text: str,
+    us_citizen: bool,
+    security_clearance: str,
+    sources: list[str] = None,
+    clearance: str = None,
+    order_by: str = "final_score",
+    descending: bool = True,
+    db_path: str = RESULTS_DB_PATH,
+) -> list[dict]:
+    """
+    Every scored job of a resume, ranked.
+
+    Args:
+        resume_text: The resume text.
+        us_citizen: The candidate setting the jobs were scored with.
+        security_clearance: The candidate clearance the jobs were scored with.
+        sources: Only these job sources (all when empty).
+        clearance: Only jobs requiring this clearance (compared by
+            taxonomy.canonical_key), "" for jobs requiring none, None for all.
+        order_by: One of ORDER_COLUMNS.
+        descending: Sort order.
+
+    Returns:
+        list[dict]: One row per scored job.
+    """
+    query = (
+        "SELECT * FROM match_results WHERE resume_hash = ? "
+        "AND us_citizen = ? AND security_clearance = ?"
+    )
+    params = [text_hash(resume_text), int(bool(us_citizen)), security_clearance]
+    if sources:
+        query += f" AND job_source IN ({', '.join('?' * len(sources))})"
+        params += sources
+    if clearance == "":
+        query += " AND required_clearances = ''"
+    elif clearance is not None:
+        query += f" AND EXISTS ({RESULT_CLEARANCES} AND c.clearance_key = ?)"
+        params.append(taxonomy.canonical_key(clearance))
+    query += f" ORDER BY {ORDER_COLUMNS[order_by]} {'DESC' if descending else 'ASC'}"
+    with connect(db_path) as con:
+        rows = [dict(row) for row in con.execute(query, params)]
+    con.close()
+    return rows
+
+
+def scored_job_hashes(
+    resume_text: str,
+    us_citizen: bool,
+    security_clearance: str,
+    db_path: str = RESULTS_DB_PATH,
+) -> set[str]:
+    with connect(db_path) as con:
+        hashes = {
+            row["job_hash"]
+            for row in con.execute(
+                "SELECT job_hash FROM match_results WHERE resume_hash = ? "
+                "AND us_citizen = ? AND security_clearance = ?",
+                (text_hash(resume_text), int(bool(us_citizen)), security_clearance),
+            )
+        }
+    con.close()
+    return hashes
+
+
+def filter_values(resume_text: str, db_path: str = RESULTS_DB_PATH) -> dict:
+    """The job sources and required clearances present for a resume."""
+    with connect(db_path) as con:
+        rows = con.execute(
+            "SELECT DISTINCT job_source, required_clearances FROM match_results "
+            "WHERE resume_hash = ?",
+            (text_hash(resume_text),),
+        ).fetchall()
+    con.close()
+    clearances = set()
+    for row in rows:
+        if row["required_clearances"]:
+            clearances.update(row["required_clearances"].split(", "))
+    return {
+        "sources": sorted({row["job_source"] for row in rows}),
+        "clearances": sorted(clearances),
+    }
+
+
+def job_details(job_text: str, db_path: str = RESULTS_DB_PATH) -> dict:
+    """The job_source, job_id and job_url last recorded for a job text."""
+    with connect(db_path) as con:
+        row = con.execute(
+            "SELECT job_source, job_id, job_url FROM match_results "
+            "WHERE job_hash = ? ORDER BY scored_at DESC LIMIT 1",
+            (text_hash(job_text),),
+        ).fetchone()
+    con.close()
+    return dict(row) if row else {}
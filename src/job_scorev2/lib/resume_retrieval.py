@@ -0,0 +1,173 @@
+import functools
+import math
+import os
+import re
+
+from . import tokens
+from .job_index import tokenize
+from .skills import taxonomy
+
+# Relevant-section retrieval for the match prompt: the resume is chunked
+# once into sections and bullets, every chunk is scored against the job text
+# with BM25 (taxonomy skills count as terms, so "k8s" in the job matches
+# "Kubernetes" in the resume), and only the best chunks go into the resume
+# block under a token budget. The header (name, contact, summary) and the
+# skills/certification/clearance sections are always kept.
+# A budget of 0 sends the whole resume. A per-job resume block no longer
+# shares the provider prompt cache prefix across jobs, so savings only pay
+# off for resumes well above the budget.
+token_budget = int(os.getenv("RESUME_TOKEN_BUDGET", "0"))
+KEEP_SECTIONS = re.compile(r"skill|certification|clearance|technolog", re.IGNORECASE)
+# markdown headings, ALL CAPS lines and short lines ending in a colon
+HEADING_PATTERN = re.compile(
+    r"^\s*(#{1,6}\s+\S.*|[A-Z][A-Z &/,-]{2,60}:?|[A-Za-z][\w &/,()-]{1,50}:)\s*$"
+)
+# short Title Case lines such as "Work Experience" or "Skills and Tools"
+TITLE_HEADING_PATTERN = re.compile(r"^\s*[A-Z][a-z]+(\s+([A-Z][a-z]+|and|of|&|/))*\s*$")
+TITLE_HEADING_MAX_WORDS = 4
+# the header (name, contact, summary) ends at the first heading, or after
+# this many lines when the resume has no recognizable headings
+HEADER_MAX_LINES = 8
+BULLET_PATTERN = re.compile(r"^\s*([-*•▪●]|\d+[.)])\s+")
+OMITTED_MARKER = "[... {count} resume sections less relevant to this job omitted ...]"
+BM25_K1 = 1.5
+BM25_B = 0.75
+STOPWORDS = set(
+    "a an and are as at be by for from has have in is it of on or our the their "
+    "this to we will with you your".split()
+)
+
+
+def _terms(text: str) -> list[str]:
+    words = [word for word in tokenize(text) if word not in STOPWORDS]
+    return words + [f"skill:{skill_id}" for skill_id in taxonomy.scan(text)]
+
+
+def is_heading(line: str, first_line: bool = False) -> bool:
+    """
+    Whether a resume line is a section heading. The first line of a resume
+    is usually the candidate name, so it is never taken for a Title Case
+    heading.
+    """
+    if BULLET_PATTERN.match(line):
+        return False
+    if HEADING_PATTERN.match(line):
+        return True
+    return (
+        not first_line
+        and len(line.split()) <= TITLE_HEADING_MAX_WORDS
+        and bool(TITLE_HEADING_PATTERN.match(line))
+    )
+
+
+@functools.lru_cache(maxsize=32)
+def chunk_resume(resume: str) -> tuple[dict, ...]:
+    """
+    Split a resume into chunks: every bullet is its own chunk, other lines
+    are grouped into paragraphs. Lines before the first heading (at most
+    HEADER_MAX_LINES) are the header.
+
+    Returns:
+        tuple[dict, ...]: {"section", "text", "terms", "keep"} in resume order.
+    """
+    chunks = []
+    section = "header"
+    paragraph = []
+
+    def add(text, heading=False):
+        chunks.append(
+            {
+                "section": section,
+                "text": text,
+                "terms": _terms(text),
+                "keep": heading
+                or section == "header"
+                or bool(KEEP_SECTIONS.search(section)),
+            }
+        )
+
+    def flush_paragraph():
+        if paragraph:
+            add("\n".join(paragraph))
+            paragraph.clear()
+
+    header_lines = 0
+    for line in resume.splitlines():
+        if section == "header" and line.strip():
+            header_lines += 1
+            if header_lines > HEADER_MAX_LINES:
+                flush_paragraph()
+                section = "body"
+        if not line.strip():
+            flush_paragraph()
+        elif is_heading(line, first_line=section == "header" and header_lines == 1):
+            flush_paragraph()
+            section = line.strip().lstrip("#").strip()
+            add(line, heading=True)
+        elif BULLET_PATTERN.match(line):
+            flush_paragraph()
+            add(line)
+        else:
+            paragraph.append(line)
+    flush_paragraph()
+    return tuple(chunks)
+
+
+def bm25_scores(chunks: tuple[dict, ...], query: str) -> list[float]:
+    """BM25 score of every chunk for the query, with IDF over the chunks."""
+    query_terms = set(_terms(query))
+    average_length = sum(len(c["terms"]) for c in chunks) / len(chunks) or 1
+    document_frequency = {}
+    for chunk in chunks:
+        for term in set(chunk["terms"]) & query_terms:
+            document_frequency[term] = document_frequency.get(term, 0) + 1
+    scores = []
+    for chunk in chunks:
+        length_norm = 1 - BM25_B + BM25_B * len(chunk["terms"]) / average_length
+        score = 0.0
+        for term, frequency in document_frequency.items():
+            count = chunk["terms"].count(term)
+            if not count:
+                continue
+            idf = math.log(1 + (len(chunks) - frequency + 0.5) / (frequency + 0.5))
+            score += idf * count * (BM25_K1 + 1) / (count + BM25_K1 * length_norm)
+        scores.append(score)
+    return scores
+
+
+def select_relevant(resume: str, job_description: str, budget: int = None) -> str:
+    """
+    The resume reduced to its fixed header and the chunks most relevant to
+    the job, within budget tokens, in original order.
+
+    Args:
+        resume: The resume text.
+        job_description: The job text the chunks are ranked against.
+        budget: Token budget, defaults to token_budget; 0 keeps the resume.
+
+    Returns:
+        str: The reduced resume, or resume itself when it fits the budget.
+    """
+    budget = token_budget if budget is None else budget
+    if not budget or tokens.count_tokens(resume) <= budget:
+        return resume
+    chunks = chunk_resume(resume)
+    scores = bm25_scores(chunks, job_description)
+    selected = {i for i, chunk in enumerate(chunks) if chunk["keep"]}
+    used = tokens.count_tokens(OMITTED_MARKER)
+    used += sum(tokens.count_tokens(chunks[i]["text"]) for i in selected)
+    ranked = sorted(
+        (i for i in range(len(chunks)) if i not in selected and scores[i] > 0),
+        key=lambda i: scores[i],
+        reverse=True,
+    )
+    for i in ranked:
+        chunk_tokens = tokens.count_tokens(chunks[i]["text"])
+        if used + chunk_tokens <= budget:
+            selected.add(i)
+            used += chunk_tokens
+    lines = [chunks[i]["text"] for i in sorted(selected)]
+    omitted = len(chunks) - len(selected)
+    if omitted:
+        lines.append(OMITTED_MARKER.format(count=omitted))
+    return "\n".join(lines)
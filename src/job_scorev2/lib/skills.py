@@ -0,0 +1,167 @@
+import re
+from collections import deque
+
+from . import prompts
+
+# Skill canonicalization over config/skill_taxonomy.yaml: every alias maps to
+# a canonical skill id with one display name, so "python3", "Python" and
+# "PYTHON" compare equal. An Aho-Corasick automaton over the aliases finds
+# taxonomy skills directly in job/resume text in one pass over the document.
+TAXONOMY_FILE = "skill_taxonomy.yaml"
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize(text: str) -> str:
+    """Lowercase and collapse whitespace."""
+    return _WHITESPACE.sub(" ", text.lower()).strip()
+
+
+class AhoCorasick:
+    """Multi-pattern string matcher, linear in the text length plus matches."""
+
+    def __init__(self, patterns: dict):
+        # per node: transitions, failure link, (pattern length, value) outputs
+        self.goto = [{}]
+        self.fail = [0]
+        self.outputs = [[]]
+        for pattern, value in patterns.items():
+            node = 0
+            for char in pattern:
+                if char not in self.goto[node]:
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.outputs.append([])
+                    self.goto[node][char] = len(self.goto) - 1
+                node = self.goto[node][char]
+            self.outputs[node].append((len(pattern), value))
+        queue = deque(self.goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self.goto[node].items():
+                queue.append(child)
+                fallback = self.fail[node]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[child] = self.goto[fallback].get(char, 0)
+                self.outputs[child] = (
+                    self.outputs[child] + self.outputs[self.fail[child]]
+                )
+
+    def iter_matches(self, text: str):
+        """Yield (start, end, value) for every pattern occurrence in text."""
+        node = 0
+        for index, char in enumerate(text):
+            while node and char not in self.goto[node]:
+                node = self.fail[node]
+            node = self.goto[node].get(char, 0)
+            for length, value in self.outputs[node]:
+                yield index - length + 1, index + 1, value
+
+
+def _is_boundary(text: str, index: int) -> bool:
+    return index < 0 or index >= len(text) or not text[index].isalnum()
+
+
+class SkillTaxonomy:
+    """
+    Alias dictionary and text scanner of a skill taxonomy.
+
+    Args:
+        entries: {skill id: {"name", "category", "aliases", "exact_only",
+            "parent"}}.
+    """
+
+    def __init__(self, entries: dict):
+        self.entries = entries
+        self.alias_ids = {}
+        scan_patterns = {}
+        for skill_id, entry in entries.items():
+            exact_only = {normalize(a) for a in entry.get("exact_only") or []}
+            aliases = [skill_id.replace("_", " "), entry["name"]]
+            aliases += entry.get("aliases") or []
+            for alias in aliases + sorted(exact_only):
+                key = normalize(alias)
+                self.alias_ids.setdefault(key, skill_id)
+                if key not in exact_only:
+                    scan_patterns.setdefault(key, skill_id)
+        self.matcher = AhoCorasick(scan_patterns)
+
+    def canonical_id(self, skill: str) -> str:
+        """The canonical id of a skill string, or None if it is not in the taxonomy."""
+        return self.alias_ids.get(normalize(skill).strip(" .,;:"))
+
+    def parent_id(self, skill: str) -> str:
+        """
+        The id of the broader skill a framework or product belongs to (e.g.
+        rails -> ruby), or None. Informational only, it never makes two
+        skills compare equal.
+        """
+        skill_id = self.canonical_id(skill)
+        return self.entries[skill_id].get("parent") if skill_id else None
+
+    def canonical_key(self, skill: str) -> str:
+        """Comparison key: the canonical id, else the normalized string."""
+        return self.canonical_id(skill) or normalize(skill)
+
+    def canonical_name(self, skill: str) -> str:
+        skill_id = self.canonical_id(skill)
+        return self.entries[skill_id]["name"] if skill_id else skill.strip()
+
+    def canonicalize(self, skills: list[str]) -> list[str]:
+        """Map skills to their display names, dropping duplicates, keeping order."""
+        seen = set()
+        canonical = []
+        for skill in skills:
+            key = self.canonical_key(skill)
+            if key and key not in seen:
+                seen.add(key)
+                canonical.append(self.canonical_name(skill))
+        return canonical
+
+    def canonicalize_model(self, model):
+        """Canonicalize every list[str] field of a pydantic model in place."""
+        if model is None:
+            return model
+        for field in type(model).model_fields:
+            value = getattr(model, field)
+            if isinstance(value, list) and all(isinstance(v, str) for v in value):
+                setattr(model, field, self.canonicalize(value))
+        return model
+
+    def scan(self, text: str) -> dict:
+        """
+        Find taxonomy skills mentioned in raw text, without the LLM.
+
+        Overlapping aliases resolve leftmost-longest ("TS/SCI with poly" is
+        not also "TS/SCI") and aliases must sit on word boundaries.
+
+        Returns:
+            dict: {skill id: number of mentions}, in order of first mention.
+        """
+        text = normalize(text)
+        matches = sorted(
+            (
+                (start, -end, skill_id)
+                for start, end, skill_id in self.matcher.iter_matches(text)
+                if _is_boundary(text, start - 1) and _is_boundary(text, end)
+            ),
+        )
+        counts = {}
+        covered_until = 0
+        for start, negative_end, skill_id in matches:
+            if start < covered_until:
+                continue
+            covered_until = -negative_end
+            counts[skill_id] = counts.get(skill_id, 0) + 1
+        return counts
+
+    def scan_by_category(self, text: str) -> dict:
+        """Display names of the skills in text, grouped by taxonomy category."""
+        found = {}
+        for skill_id in self.scan(text):
+            entry = self.entries[skill_id]
+            found.setdefault(entry["category"], []).append(entry["name"])
+        return found
+
+
+taxonomy = SkillTaxonomy(prompts.load_config(TAXONOMY_FILE))
@@ -0,0 +1,232 @@
+import argparse
+import datetime
+import itertools
+import json
+import os
+import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+from .report import percentile
+
+# Registry of scoring strategies (pipelines that turn a resume/job pair into
+# a decision and score) and the A/B comparison between them. Every strategy
+# is a strategy.py in its package with
+#     run(resume_source, job_source, us_citizen, security_clearance,
+#         use_cache) -> result row (see result_row)
+# and a script entry point scoring a manifest of pairs (strategy_main). The
+# packages each import their own "lib", so every strategy runs in its own
+# subprocess; job_score imports this module as job_scorev2.lib.strategies,
+# which only depends on the standard library.
+SRC_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+STRATEGIES = {
+    "single_crew": {
+        "package": "job_scorev2",
+        "description": "one HRCrew call over the raw resume and job text",
+    },
+    "three_crew": {
+        "package": "job_score",
+        "description": "resume and job crews, then a match crew over their outputs",
+    },
+}
+# the pipeline of the dashboard and the CLIs
+DEFAULT_STRATEGY = "single_crew"
+AB_WORK_DIR = "work/ab"
+USAGE_FIELDS = ["prompt_tokens", "completion_tokens", "total_tokens"]
+
+
+def result_row(
+    strategy: str,
+    result_json: dict,
+    latency_ms: int,
+    usage_metrics: list[dict],
+    save_path: str,
+) -> dict:
+    """
+    The common result row of a scored pair.
+
+    Args:
+        strategy: The strategy name.
+        result_json: The JobVsResume result as a dict.
+        latency_ms: Wall time of the pair, extraction included.
+        usage_metrics: Usage metrics of every crew call, summed.
+        save_path: The saved crew output.
+    """
+    result_json = result_json if isinstance(result_json, dict) else {}
+    row = {
+        "strategy": strategy,
+        "decision": result_json.get("decision"),
+        "final_score": (result_json.get("score") or {}).get("final_score"),
+        "latency_ms": latency_ms,
+        "save_path": save_path,
+        "error": None,
+    }
+    for field in USAGE_FIELDS:
+        row[field] = sum(metrics.get(field, 0) for metrics in usage_metrics)
+    return row
+
+
+def run_pair(run, pair: dict, options: dict) -> dict:
+    """Run a strategy on one manifest pair, turning a failure into an error row."""
+    try:
+        row = run(pair["resume"], pair["job"], **options)
+    except Exception as e:
+        print(f"Pair {pair['pair_id']} failed: {e}")
+        row = {"error": str(e)}
+    row["pair_id"] = pair["pair_id"]
+    return row
+
+
+def write_rows(rows: list[dict], path: str):
+    with open(path, "w") as f:
+        for row in rows:
+            f.write(json.dumps(row) + "\n")
+
+
+def score_manifest(run, pairs_path: str, output_path: str, concurrency: int = 4):
+    """Score every pair of a manifest with run and write the result rows."""
+    with open(pairs_path) as f:
+        manifest = json.load(f)
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        rows = list(
+            executor.map(
+                lambda pair: run_pair(run, pair, manifest["options"]),
+                manifest["pairs"],
+            )
+        )
+    write_rows(rows, output_path)
+
+
+def strategy_main(name: str, run):
+    """The script entry point of a strategy.py (see run_strategies)."""
+    parser = argparse.ArgumentParser(description=f"{name} scoring strategy")
+    parser.add_argument("--pairs", required=True)
+    parser.add_argument("--output", required=True)
+    parser.add_argument("--concurrency", type=int, default=4)
+    args = parser.parse_args()
+    score_manifest(run, args.pairs, args.output, args.concurrency)
+
+
+def make_pairs(resumes: list[str], jobs: list[str]) -> list[dict]:
+    return [
+        {"pair_id": f"{i}", "resume": resume, "job": job}
+        for i, (resume, job) in enumerate(itertools.product(resumes, jobs))
+    ]
+
+
+def _run_strategy(
+    name: str, manifest_path: str, concurrency: int, work_dir: str, datestr: str
+) -> list[dict]:
+    output_path = os.path.join(work_dir, f"{name}_{datestr}.jsonl")
+    log_path = os.path.join(work_dir, f"{name}_{datestr}.log")
+    print(f"Running {name}, log in {log_path}")
+    with open(log_path, "w") as log:
+        returncode = subprocess.call(
+            [
+                sys.executable,
+                os.path.join(SRC_DIR, STRATEGIES[name]["package"], "strategy.py"),
+                "--pairs",
+                manifest_path,
+                "--output",
+                output_path,
+                "--concurrency",
+                str(concurrency),
+            ],
+            stdout=log,
+            stderr=subprocess.STDOUT,
+        )
+    if returncode != 0 or not os.path.exists(output_path):
+        print(f"Strategy {name} exited with {returncode}, see its log")
+        return []
+    with open(output_path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def run_strategies(
+    names: list[str],
+    pairs: list[dict],
+    options: dict,
+    concurrency: int = 4,
+    work_dir: str = AB_WORK_DIR,
+) -> dict:
+    """
+    Score the same pairs with several strategies, one strategy after the other.
+
+    The strategies run sequentially so each sees the same provider rate
+    limits, scheduler and machine load; run side by side they would slow
+    each other down and skew the latency comparison.
+
+    Args:
+        names: Strategy names from STRATEGIES.
+        pairs: From make_pairs.
+        options: us_citizen, security_clearance and use_cache for run().
+        concurrency: Pairs scored concurrently within each strategy.
+        work_dir: Where the manifest, outputs and logs are written.
+
+    Returns:
+        dict: {strategy name: result rows}.
+    """
+    os.makedirs(work_dir, exist_ok=True)
+    datestr = datetime.datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+    manifest_path = os.path.join(work_dir, f"pairs_{datestr}.json")
+    with open(manifest_path, "w") as f:
+        json.dump({"pairs": pairs, "options": options}, f)
+    return {
+        name: _run_strategy(name, manifest_path, concurrency, work_dir, datestr)
+        for name in names
+    }
+
+
+def summarize(results: dict) -> list[dict]:
+    """Latency percentiles and mean token usage per strategy."""
+    rows = []
+    for name, strategy_rows in results.items():
+        ok = [row for row in strategy_rows if not row.get("error")]
+        latencies = [row["latency_ms"] for row in ok]
+        summary = {
+            "strategy": name,
+            "pairs": len(strategy_rows),
+            "errors": len(strategy_rows) - len(ok),
+            "p50_ms": percentile(latencies, 50),
+            "p95_ms": percentile(latencies, 95),
+        }
+        for field in USAGE_FIELDS:
+            summary[f"mean_{field}"] = (
+                sum(row[field] for row in ok) / len(ok) if ok else 0.0
+            )
+        rows.append(summary)
+    return rows
+
+
+def agreement(results: dict) -> list[dict]:
+    """Decision agreement and score difference for every pair of strategies."""
+    by_pair = {
+        name: {row["pair_id"]: row for row in rows if not row.get("error")}
+        for name, rows in results.items()
+    }
+    rows = []
+    for a, b in itertools.combinations(results, 2):
+        common = sorted(set(by_pair[a]) & set(by_pair[b]))
+        decisions_equal = [
+            by_pair[a][p]["decision"] == by_pair[b][p]["decision"] for p in common
+        ]
+        score_diffs = [
+            abs(by_pair[a][p]["final_score"] - by_pair[b][p]["final_score"])
+            for p in common
+            if by_pair[a][p]["final_score"] is not None
+            and by_pair[b][p]["final_score"] is not None
+        ]
+        rows.append(
+            {
+                "strategies": f"{a} vs {b}",
+                "compared": len(common),
+                "decision_agreement": (
+                    sum(decisions_equal) / len(common) if common else 0.0
+                ),
+                "mean_abs_score_diff": (
+                    sum(score_diffs) / len(score_diffs) if score_diffs else 0.0
+                ),
+                "max_abs_score_diff": max(score_diffs, default=0.0),
+            }
+        )
+    return rows
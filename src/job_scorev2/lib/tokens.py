@@ -0,0 +1,106 @@
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+# rough chars-per-token for english prose, used when tiktoken is unavailable
+CHARS_PER_TOKEN = 4
+_encodings = {}
+_unpriced_models = set()
+
+# USD per 1M tokens: (prompt, cached prompt, completion)
+MODEL_PRICES = {
+    "gpt-4o": (2.50, 1.25, 10.00),
+    "gpt-4o-mini": (0.15, 0.075, 0.60),
+}
+
+
+def _get_encoding(model: str):
+    model = model.split("/")[-1]
+    if model not in _encodings:
+        try:
+            _encodings[model] = tiktoken.encoding_for_model(model)
+        except KeyError:
+            _encodings[model] = tiktoken.get_encoding("o200k_base")
+    return _encodings[model]
+
+
+def count_tokens(text: str, model: str = "gpt-4o") -> int:
+    """
+    Count (or estimate) the prompt tokens of a text for a model.
+
+    Uses tiktoken when installed, otherwise a character based estimate.
+    """
+    if not text:
+        return 0
+    if tiktoken is None:
+        return len(text) // CHARS_PER_TOKEN + 1
+    return len(_get_encoding(model).encode(text, disallowed_special=()))
+
+
+def estimate_cost(usage_metrics: dict, model: str = "gpt-4o") -> float:
+    """
+    USD cost of a crew/completion usage dict at the model's list prices.
+
+    Returns:
+        float: The cost, or None (with a warning) for a model without
+            MODEL_PRICES, so callers can tell an unknown price from a free call.
+    """
+    prices = MODEL_PRICES.get(model.split("/")[-1])
+    if prices is None:
+        if model not in _unpriced_models:
+            _unpriced_models.add(model)
+            print(f"No prices for model {model}, add it to tokens.MODEL_PRICES")
+        return None
+    prompt_price, cached_price, completion_price = prices
+    cached_tokens = usage_metrics.get("cached_prompt_tokens", 0)
+    uncached_tokens = usage_metrics.get("prompt_tokens", 0) - cached_tokens
+    return (
+        uncached_tokens * prompt_price
+        + cached_tokens * cached_price
+        + usage_metrics.get("completion_tokens", 0) * completion_price
+    ) / 1_000_000
+
+
+def total_cost(usages: list[dict], model: str = "gpt-4o") -> float:
+    """Summed estimate_cost of several usage dicts, None for an unknown model."""
+    costs = [estimate_cost(usage, model) for usage in usages]
+    return None if None in costs else sum(costs)
+
+
+def _split_units(text: str, max_tokens: int, model: str) -> list[str]:
+    # paragraphs, then lines of an oversized paragraph, then fixed-size
+    # character windows of an oversized line
+    units = []
+    for paragraph in text.split("\n\n"):
+        if count_tokens(paragraph, model) <= max_tokens:
+            units.append(paragraph)
+            continue
+        for line in paragraph.split("\n"):
+            if count_tokens(line, model) <= max_tokens:
+                units.append(line)
+                continue
+            width = max_tokens * CHARS_PER_TOKEN // 2
+            units.extend(line[i : i + width] for i in range(0, len(line), width))
+    return units
+
+
+def split_text(text: str, max_tokens: int, model: str = "gpt-4o") -> list[str]:
+    """
+    Split a text into chunks of at most max_tokens tokens, on paragraph
+    boundaries where possible, keeping the original order.
+    """
+    chunks = []
+    current = []
+    current_tokens = 0
+    for unit in _split_units(text, max_tokens, model):
+        unit_tokens = count_tokens(unit, model) + 1
+        if current and current_tokens + unit_tokens > max_tokens:
+            chunks.append("\n\n".join(current))
+            current = []
+            current_tokens = 0
+        current.append(unit)
+        current_tokens += unit_tokens
+    if current:
+        chunks.append("\n\n".join(current))
+    return chunks
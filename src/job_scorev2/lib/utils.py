@@ -1,35 +1,40 @@
-import json
+import functools
+import hashlib
 import os
 from dotenv import load_dotenv
 from pathlib import Path
 import re
 import sys
-from diskcache import Cache
 import time
 import requests
-from bs4 import BeautifulSoup
-import random
-import string
-from urllib.parse import urlparse, parse_qs
-from google import genai
-import spacy
-from spacy.matcher import Matcher
-from spacy.cli import download
-from markdownify import markdownify as md
-from markitdown import MarkItDown
+from urllib.parse import urlparse, parse_qs, urlencode, urlunparse
+from .cache_manager import CacheManager
+from .content_store import ContentStore, digest_file
+from . import json_repair
+from .near_dup import normalize_text
 
 # TODO: Implement playwright in downloading from URL
 
-dc = Cache("work/cache")
+# heavy dependencies (spacy and its model, markitdown, bs4, markdownify,
+# google.genai) are imported on first use, importing utils stays cheap
+cache = CacheManager("work/cache")
+content_store = ContentStore()
 spacy_data_model = "en_core_web_lg"
-try:
-    nlp = spacy.load(spacy_data_model)
-except Exception as e:
+
+
+@functools.lru_cache(maxsize=1)
+def get_nlp():
+    """The spacy pipeline, loaded (and downloaded if missing) on first use."""
+    import spacy
+    from spacy.cli import download
+
     try:
+        return spacy.load(spacy_data_model)
+    except Exception:
         download(spacy_data_model)
-        nlp = spacy.load(spacy_data_model)
-    except Exception as e:
-        raise e
+        return spacy.load(spacy_data_model)
+
+
 currenttimemillis = lambda: int(round(time.time() * 1000))
 
 
@@ -68,25 +73,18 @@ def extract_text_from_various_sources(text_source: str) -> str:
 
 
 def extract_json_from_crew_output(crew_output: str) -> dict:
-    # find location of : ```json
-    json_str = ""
-    start = crew_output.find("```json")
-    if start == -1:
-        json_str = crew_output
-    else:
-        start += len("```json")
-        end = crew_output.find("```", start)
-        json_str = crew_output[start:end]
-    return json.loads(json_str)
+    # fenced or not, repairing malformed JSON (see lib/json_repair.py)
+    return json_repair.loads(crew_output)[0]
 
 
 def download_file(url):
-    if url in dc:
-        return dc[url]
+    content = cache["fetch"].get(url)
+    if content is not None:
+        return content
     try:
         response = requests.get(url)
         response.raise_for_status()
-        dc[url] = response.content
+        cache["fetch"][url] = response.content
         return response.content
     except Exception as e:
         raise e
@@ -103,6 +101,12 @@ def get_text_from_url(url):
         "#mainContent > div > div.css-gk87zv > div.css-e23il0 > div.css-11p01j8"
     )
     jd_selector_list = [linkedin_selector, peraton_selector, workday_selector]
+    job_description = cache["extraction"].get(url)
+    if job_description is not None:
+        return job_description
+    from bs4 import BeautifulSoup
+    from markdownify import markdownify as md
+
     bs_obj = BeautifulSoup(download_file(url), "html.parser")
     try:
         for jd_selector in jd_selector_list:
@@ -117,6 +121,7 @@ def get_text_from_url(url):
         except Exception as e:
             print(f"Failed to extract text from {url}")
             raise e
+    cache["extraction"][url] = job_description
     return job_description
 
 
@@ -131,25 +136,47 @@ def extract_text_from_file(file_path: str) -> str:
         raise e
 
 
+def read_text_if_exists(file_path: str) -> str:
+    """The text of file_path, or None if it does not exist."""
+    try:
+        with open(file_path) as f:
+            return f.read()
+    except FileNotFoundError:
+        return None
+
+
 def extract_text_from_pdf(pdf_path):
     """
     Extracts text from a PDF file and returns it as a markdown string.
     also writes the markdown to a file in the resume storage directory
+    The markdown is kept in the content store under the SHA-256 of the PDF
+    bytes, so the same PDF is only converted once.
     """
     try:
         text_file_path = os.path.join(
             os.getenv("RESUME_STORAGE_DIR"), f"{Path(pdf_path).name}.md"
         )
-        print(f"Extracting text from {pdf_path}")
-        # Extracts all text from the PDF file
-        md = MarkItDown()
-        result = md.convert(pdf_path)
-        markdown_text = result.markdown
+        digest = digest_file(pdf_path)
+        markdown_text = content_store.get_text(digest)
+        if markdown_text is not None:
+            print(f"Using stored extraction of {pdf_path} ({digest[:12]})")
+        else:
+            print(f"Extracting text from {pdf_path}")
+            # Extracts all text from the PDF file
+            from markitdown import MarkItDown
+
+            md = MarkItDown()
+            result = md.convert(pdf_path)
+            markdown_text = result.markdown
+            content_store.put_text(digest, markdown_text)
         # there appear to be lots of tabs and junk in the pdf extraction
         # this somewhat cleans that up
-        with open(text_file_path, "w") as f:
-            f.write(markdown_text)
-            print(f"Wrote parsed content to {text_file_path}")
+        # an edited PDF re-uploaded under the same name replaces the stale
+        # extraction in the resume dir
+        if read_text_if_exists(text_file_path) != markdown_text:
+            with open(text_file_path, "w") as f:
+                f.write(markdown_text)
+                print(f"Wrote parsed content to {text_file_path}")
         return markdown_text
     except Exception as e:
         return str(e)
@@ -203,6 +230,9 @@ def nlp_extract_organization_name(job_text: str) -> list[str]:
     if not match_segment:
         return "No text available for processing."
 
+    from spacy.matcher import Matcher
+
+    nlp = get_nlp()
     doc = nlp(match_segment)
 
     # 4. Extract the most prominent ORG from the segment
@@ -239,6 +269,9 @@ def nlp_extract_candidate_name(resume_text):
     """Extracts the name of a person from resume text using pattern matching."""
     # Pre-process the text to remove extra whitespace and newlines
     cleaned_text = " ".join(resume_text[:200].split())
+    from spacy.matcher import Matcher
+
+    nlp = get_nlp()
     doc = nlp(cleaned_text)
     matcher = Matcher(nlp.vocab)
 
@@ -254,7 +287,7 @@ def nlp_extract_candidate_name(resume_text):
 
 
 def nlp_parse_resume_get_name_email_phone(text):
-    doc = nlp(text[:200])
+    doc = get_nlp()(text[:200])
     data = {"name": "", "email": "", "phone_number": ""}
 
     # 1 get name
@@ -279,61 +312,109 @@ def nlp_parse_resume_get_name_email_phone(text):
     return data
 
 
-def identify_job_source(url: str) -> dict:
+TRACKING_QUERY_PARAMS = {"trk", "refid", "trackingid", "lipi", "lici", "ebp", "src"}
+JOB_ID_LENGTH = 16
+
+
+def canonical_url(url: str) -> str:
+    """
+    The URL without fragment, tracking parameters (utm_*, trk, ...) and
+    trailing slash, with a lowercase host and sorted query parameters.
+    """
+    parsed = urlparse(url.strip())
+    query = sorted(
+        (key, value)
+        for key, values in parse_qs(parsed.query).items()
+        for value in values
+        if not key.lower().startswith("utm_")
+        and key.lower() not in TRACKING_QUERY_PARAMS
+    )
+    return urlunparse(
+        (
+            parsed.scheme.lower(),
+            parsed.netloc.lower(),
+            parsed.path.rstrip("/"),
+            "",
+            urlencode(query),
+            "",
+        )
+    )
+
+
+def content_job_id(job_text: str) -> str:
+    """Stable job id of a posting text, ignoring case, whitespace and markup."""
+    normalized = " ".join(normalize_text(job_text))
+    return hashlib.sha256(normalized.encode()).hexdigest()[:JOB_ID_LENGTH]
+
+
+def identify_job_source(url: str, job_text: str = None) -> dict:
     """Identifies the job source from a URL.
-    Input: URL
+    Input: URL (or a job file path / pasted job text), and the job text if
+    already extracted
     Output: Dictionary with job source, job ID, and job URL
+    Job IDs are deterministic: the board's id for known job boards, else a
+    hash of the canonical URL, else a hash of the normalized job text (a
+    stored job file keeps the details it was first analyzed with).
     """
-    random_id = "".join(random.choices(string.ascii_letters + string.digits, k=10))
-    job_source = {"job_source": "", "job_id": random_id, "job_url": ""}
-    if url.startswith("http"):
-        print(f"Identifying job source from URL: {url}")
-        if "linkedin" in url:
-            print("Source: LinkedIn")
-            job_source["job_source"] = "LinkedIn"
-            # example: https://www.linkedin.com/jobs/view/4308118213/?eBP=NON_CHARGEABLE_CHANNEL&refId=G%2BFao3NOlOSc8QUHNxJkvg%3D%3D&trackingId=aHsjCzSeKWJeghtTUZFbcQ%3D%3D&trk=flagship3_search_srp_jobs&lipi=urn%3Ali%3Apage%3Ad_flagship3_search_srp_jobs%3BN3X1wCt5SMqWow9PKjAieA%3D%3D&lici=aHsjCzSeKWJeghtTUZFbcQ%3D%3D
-            job_id = url.split("/")[5]
-            if job_id != "":
-                job_source["job_id"] = job_id
-                job_source["job_url"] = f"https://www.linkedin.com/jobs/view/{job_id}"
-                return job_source
+    if not url.startswith("http"):
+        if job_text is None:
+            job_text = extract_text_from_various_sources(url)
+        record = cache["job"].get(job_text)
+        job_details = record and (record.get("meta") or {}).get("job_details")
+        if job_details:
+            return dict(job_details)
+        return {"job_source": "", "job_id": content_job_id(job_text), "job_url": ""}
+    url_id = hashlib.sha256(canonical_url(url).encode()).hexdigest()[:JOB_ID_LENGTH]
+    job_source = {"job_source": "", "job_id": url_id, "job_url": canonical_url(url)}
+    print(f"Identifying job source from URL: {url}")
+    if "linkedin" in url:
+        print("Source: LinkedIn")
+        job_source["job_source"] = "LinkedIn"
+        # example: https://www.linkedin.com/jobs/view/4308118213/?eBP=NON_CHARGEABLE_CHANNEL&refId=G%2BFao3NOlOSc8QUHNxJkvg%3D%3D&trackingId=aHsjCzSeKWJeghtTUZFbcQ%3D%3D&trk=flagship3_search_srp_jobs&lipi=urn%3Ali%3Apage%3Ad_flagship3_search_srp_jobs%3BN3X1wCt5SMqWow9PKjAieA%3D%3D&lici=aHsjCzSeKWJeghtTUZFbcQ%3D%3D
+        job_id = url.split("/")[5]
+        if job_id != "":
+            job_source["job_id"] = job_id
+            job_source["job_url"] = f"https://www.linkedin.com/jobs/view/{job_id}"
+            return job_source
+        return job_source
+    elif "indeed" in url:
+        # example: https://www.indeed.com/?vjk=ec1c9b9378ad1a8e&advn=4418968771450209
+        # get the query parameter vjk using urlparse
+        job_source["job_source"] = "Indeed"
+        parsed_url = urlparse(url)
+        query_params = parse_qs(parsed_url.query)
+        job_id = query_params.get("vjk", [""])[0]
+        if job_id != "":
+            job_source["job_id"] = job_id
+            job_source["job_url"] = f"https://www.indeed.com/?vjk={job_id}"
+            return job_source
+    elif "dice" in url:
+        # example: https://www.dice.com/job-detail/6ab2ae92-d73e-4670-a846-a033cc1ac6b2
+        job_id = url.split("/")[4]
+        job_source["job_source"] = "Dice"
+        if job_id != "":
+            job_source["job_id"] = job_id
+            job_source["job_url"] = f"https://www.dice.com/job-detail/{job_id}"
+            return job_source
+    elif "oraclecloud" in url and "nfcu" in url:
+        # example: https://fa-etbx-saasfaprod1.fa.ocs.oraclecloud.com/hcmUI/CandidateExperience/en/sites/nfcu/job/28116/?keyword=security&location=Vienna%252C+VA%252C+United+States&locationId=300000010092226&locationLevel=city&mode=job-location&radius=25&radiusUnit=MI
+        job_id = url.split("/")[6]
+        job_source["job_source"] = "OracleCloud-NFCU"
+
+        job_id = url.split("/")[9]
+        if job_id != "":
+            job_source["job_id"] = job_id
+            job_source["job_url"] = (
+                f"https://fa-etbx-saasfaprod1.fa.ocs.oraclecloud.com/hcmUI/CandidateExperience/en/sites/nfcu/job/{job_id}"
+            )
             return job_source
-        elif "indeed" in url:
-            # example: https://www.indeed.com/?vjk=ec1c9b9378ad1a8e&advn=4418968771450209
-            # get the query parameter vjk using urlparse
-            job_source["job_source"] = "Indeed"
-            parsed_url = urlparse(url)
-            query_params = parse_qs(parsed_url.query)
-            job_id = query_params.get("vjk", random_id)
-            if job_id != "":
-                job_source["job_id"] = job_id
-                job_source["job_url"] = f"https://www.indeed.com/?vjk={job_id}"
-                return job_source
-        elif "dice" in url:
-            # example: https://www.dice.com/job-detail/6ab2ae92-d73e-4670-a846-a033cc1ac6b2
-            job_id = url.split("/")[4]
-            job_source["job_source"] = "Dice"
-            if job_id != "":
-                job_source["job_id"] = job_id
-                job_source["job_url"] = f"https://www.dice.com/job-detail/{job_id}"
-                return job_source
-        elif "oraclecloud" in url and "nfcu" in url:
-            # example: https://fa-etbx-saasfaprod1.fa.ocs.oraclecloud.com/hcmUI/CandidateExperience/en/sites/nfcu/job/28116/?keyword=security&location=Vienna%252C+VA%252C+United+States&locationId=300000010092226&locationLevel=city&mode=job-location&radius=25&radiusUnit=MI
-            job_id = url.split("/")[6]
-            job_source["job_source"] = "OracleCloud-NFCU"
-
-            job_id = url.split("/")[9]
-            if job_id != "":
-                job_source["job_id"] = job_id
-                job_source["job_url"] = (
-                    f"https://fa-etbx-saasfaprod1.fa.ocs.oraclecloud.com/hcmUI/CandidateExperience/en/sites/nfcu/job/{job_id}"
-                )
-                return job_source
     return job_source
 
 
 def list_genai_models(only_generate_content: bool = False):
     load_dotenv()
+    from google import genai
+
     genai_client = genai.Client()
     genai_models = genai_client.models.list()
     for model in genai_models:
@@ -364,6 +445,30 @@ def get_list_of_files_desc(folder):
     return files
 
 
+def load_stored_texts(folder: str) -> list[dict]:
+    """
+    Extract the text of every file in a storage dir, dropping files with the
+    same text (e.g. a resume pdf and the .md extracted from it).
+
+    Returns:
+        list[dict]: {"path", "text"} per distinct text, newest first.
+    """
+    if not folder or not os.path.isdir(folder):
+        return []
+    texts = {}
+    for file_name in get_list_of_files_desc(folder):
+        path = os.path.join(folder, file_name)
+        if not os.path.isfile(path):
+            continue
+        text = extract_text_from_various_sources(path)
+        if not isinstance(text, str) or not text.strip():
+            continue
+        digest = hashlib.sha256(text.encode()).hexdigest()
+        if digest not in texts:
+            texts[digest] = {"path": path, "text": text}
+    return list(texts.values())
+
+
 if __name__ == "__main__":
     job_text = get_text_from_url(
         "https://fa-etbx-saasfaprod1.fa.ocs.oraclecloud.com/hcmUI/CandidateExperience/en/sites/nfcu/job/28116/?keyword=security&location=Vienna%252C+VA%252C+United+States&locationId=300000010092226&locationLevel=city&mode=job-location&radius=25&radiusUnit=MI"
@@ -0,0 +1,38 @@
+# Diff-aware re-scoring of stored jobs after a resume edit. The cached job vs
+# resume results of the old resume are patched locally with the skill diff,
+# only pairs whose decision could flip are sent to the LLM again.
+# usage: python rescore.py --old-resume <file> --new-resume <file> [--no-llm]
+
+import argparse
+import os
+from dotenv import load_dotenv
+from lib import utils
+import crew_analyzer
+
+if __name__ == "__main__":
+    load_dotenv()
+    utils.make_work_dirs()
+    parser = argparse.ArgumentParser(description="Re-score jobs for an edited resume")
+    parser.add_argument("--old-resume", required=True)
+    parser.add_argument("--new-resume", required=True)
+    parser.add_argument("--jobs-dir", default=os.getenv("JOB_STORAGE_DIR"))
+    parser.add_argument(
+        "--no-llm",
+        action="store_true",
+        help="only report the pairs that need the LLM again",
+    )
+    parser.add_argument("--security-clearance", default="None")
+    parser.add_argument("--not-us-citizen", action="store_true")
+    args = parser.parse_args()
+
+    rows = crew_analyzer.rescore_resume_matches(
+        utils.extract_text_from_various_sources(args.old_resume),
+        utils.extract_text_from_various_sources(args.new_resume),
+        utils.load_stored_texts(args.jobs_dir),
+        us_citizen=not args.not_us_citizen,
+        security_clearance=args.security_clearance,
+        call_llm=not args.no_llm,
+    )
+    for row in rows:
+        if row["status"] in ("llm", "needs llm"):
+            print(f"{row['status']}: {os.path.basename(row['job'])} ({row['reason']})")
@@ -0,0 +1,60 @@
+# "single_crew" scoring strategy: one HRCrew call over the raw resume and job
+# text. Implements the strategy interface of lib/strategies.py; run as a
+# script it scores a manifest of pairs in its own process (the job_score and
+# job_scorev2 lib packages cannot share one interpreter).
+# usage: python strategy.py --pairs <pairs.json> --output <results.jsonl>
+
+from dotenv import load_dotenv
+from lib import utils
+from lib import strategies
+import crew_analyzer
+
+NAME = "single_crew"
+
+
+def run(
+    resume_source: str,
+    job_source: str,
+    us_citizen: bool = True,
+    security_clearance: str = "None",
+    use_cache: bool = True,
+) -> dict:
+    """
+    Score one resume/job pair.
+
+    Args:
+        resume_source: The resume file (or text).
+        job_source: The job file, url (or text).
+        us_citizen: Whether the candidate is a US citizen.
+        security_clearance: The candidate's security clearance.
+        use_cache: Whether cached results may be used.
+
+    Returns:
+        dict: The strategies.result_row of the pair.
+    """
+    start = utils.currenttimemillis()
+    resume_text = utils.extract_text_from_various_sources(resume_source)
+    job_text = utils.extract_text_from_various_sources(job_source)
+    job_details = utils.identify_job_source(job_source, job_text)
+    hr_result, save_path, usage_metrics = crew_analyzer.hr_analyzer_crew(
+        job_text,
+        resume_text,
+        job_details,
+        us_citizen,
+        security_clearance,
+        use_cache,
+    )
+    end = utils.currenttimemillis()
+    return strategies.result_row(
+        NAME,
+        crew_analyzer.result_to_json(hr_result),
+        end - start,
+        [usage_metrics],
+        save_path,
+    )
+
+
+if __name__ == "__main__":
+    load_dotenv()
+    utils.make_work_dirs()
+    strategies.strategy_main(NAME, run)
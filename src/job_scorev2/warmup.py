@@ -0,0 +1,297 @@
+# Cache warm-up: precompute the resume, job and job vs resume results of
+# everything already stored in RESUME_STORAGE_DIR and JOB_STORAGE_DIR, so the
+# first dashboard users after a deploy or rebuild hit cache instead of the LLM.
+# Runs with bounded concurrency at batch priority and stops at a cost cap.
+# usage: python warmup.py [--kinds resume job match] [--dry-run], see --help
+
+import argparse
+import os
+import threading
+import time
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dotenv import load_dotenv
+from lib import utils
+from lib import llm_scheduler
+from lib import tokens
+import crew_analyzer
+
+DAY = 24 * 60 * 60
+KINDS = ["resume", "job", "match"]
+
+
+class CostBudget:
+    """
+    Thread-safe spend tracker. Work reserves its estimated cost up front and
+    settles the actual cost when it finishes, so concurrent workers cannot
+    overshoot the cap by more than one estimate.
+    """
+
+    def __init__(self, cap_usd: float):
+        self.cap_usd = cap_usd
+        self.spent_usd = 0.0
+        self.reserved_usd = 0.0
+        self.lock = threading.Lock()
+
+    def reserve(self, estimated_usd: float) -> bool:
+        with self.lock:
+            if self.spent_usd + self.reserved_usd + estimated_usd > self.cap_usd:
+                return False
+            self.reserved_usd += estimated_usd
+            return True
+
+    def settle(self, estimated_usd: float, actual_usd: float):
+        with self.lock:
+            self.reserved_usd -= estimated_usd
+            self.spent_usd += actual_usd
+
+
+def staleness(record: dict, max_age_days: float) -> str:
+    """
+    Why a cached record needs recomputing. Results are keyed by the text they
+    were computed from, so an edited file is simply a miss.
+
+    Args:
+        record: The cached record, or None on a miss (or an unreadable entry).
+        max_age_days: Maximum age of a result, 0 for no limit.
+
+    Returns:
+        str: "missing", "no transcript" or "expired", or None if the record
+            is fresh.
+    """
+    if record is None:
+        return "missing"
+    transcript_path = os.path.join(
+        os.getenv("CREW_OUTPUT_STORAGE_DIR"), record["save_path"]
+    )
+    if not os.path.exists(transcript_path):
+        return "no transcript"
+    age = time.time() - os.path.getmtime(transcript_path)
+    if max_age_days and age > max_age_days * DAY:
+        return "expired"
+    return None
+
+
+def estimate_task_cost(inputs: dict) -> float:
+    """Estimated USD cost of a crew call, None when the model has no prices."""
+    estimated_tokens = crew_analyzer.estimate_crew_tokens(inputs)
+    completion_tokens = crew_analyzer.EXPECTED_COMPLETION_TOKENS
+    return tokens.estimate_cost(
+        {
+            "prompt_tokens": estimated_tokens - completion_tokens,
+            "completion_tokens": completion_tokens,
+        },
+        crew_analyzer.openai_llm.model,
+    )
+
+
+def plan_warmup(
+    resumes: list[dict],
+    jobs: list[dict],
+    kinds: list[str],
+    us_citizen: bool,
+    security_clearance: str,
+    max_age_days: float,
+) -> list[dict]:
+    """
+    List the results that are missing or stale in the cache.
+
+    Returns:
+        list[dict]: One task per result with its kind, reason, estimated cost
+            and the call that computes it. Resume and job results come first,
+            they are cheap and reused by every pair.
+    """
+    tasks = []
+    if "resume" in kinds:
+        for resume in resumes:
+            record = crew_analyzer.get_cached_record("resume", resume["text"])
+            reason = staleness(record, max_age_days)
+            if reason:
+                tasks.append(
+                    {
+                        "kind": "resume",
+                        "label": os.path.basename(resume["path"]),
+                        "reason": reason,
+                        "estimated_usd": estimate_task_cost(
+                            {"resume_text": resume["text"]}
+                        ),
+                        # the text, not the path, is what the crew analyzes
+                        "run": partial(
+                            crew_analyzer.resume_skill_analyzer_crew,
+                            resume["text"],
+                            get_from_cache=False,
+                            priority=llm_scheduler.PRIORITY_BATCH,
+                        ),
+                    }
+                )
+    if "job" in kinds:
+        for job in jobs:
+            record = crew_analyzer.get_cached_record("job", job["text"])
+            reason = staleness(record, max_age_days)
+            if reason:
+                tasks.append(
+                    {
+                        "kind": "job",
+                        "label": os.path.basename(job["path"]),
+                        "reason": reason,
+                        "estimated_usd": estimate_task_cost({"job_text": job["text"]}),
+                        "run": partial(
+                            crew_analyzer.job_requirements_analyzer_crew,
+                            job["path"],
+                            get_from_cache=False,
+                            priority=llm_scheduler.PRIORITY_BATCH,
+                        ),
+                    }
+                )
+    if "match" in kinds:
+        for resume in resumes:
+            for job in jobs:
+                cache_key = crew_analyzer.hr_cache_key(
+                    job["text"], resume["text"], us_citizen, security_clearance
+                )
+                record = crew_analyzer.get_cached_record("match", cache_key)
+                reason = staleness(record, max_age_days)
+                if not reason:
+                    continue
+                job_details = utils.identify_job_source(job["path"], job["text"])
+                inputs = crew_analyzer.hr_inputs(
+                    job["text"],
+                    resume["text"],
+                    job_details,
+                    us_citizen,
+                    security_clearance,
+                )
+                tasks.append(
+                    {
+                        "kind": "match",
+                        "label": f"{os.path.basename(resume['path'])} x "
+                        f"{os.path.basename(job['path'])}",
+                        "reason": reason,
+                        "estimated_usd": estimate_task_cost(inputs),
+                        "run": partial(
+                            crew_analyzer.hr_analyzer_crew,
+                            job["text"],
+                            resume["text"],
+                            job_details,
+                            us_citizen,
+                            security_clearance,
+                            get_from_cache=False,
+                            priority=llm_scheduler.PRIORITY_BATCH,
+                        ),
+                    }
+                )
+    return tasks
+
+
+def run_task(task: dict, budget: CostBudget) -> dict:
+    if not budget.reserve(task["estimated_usd"]):
+        return {**task, "status": "skipped (cost cap)", "cost_usd": 0.0}
+    actual_usd = 0.0
+    start = utils.currenttimemillis()
+    try:
+        # every wrapper returns the crew usage metrics last
+        usage_metrics = task["run"]()[-1]
+        actual_usd = tokens.estimate_cost(usage_metrics, crew_analyzer.openai_llm.model)
+        status = "done"
+    except Exception as e:
+        status = f"failed: {e}"
+    finally:
+        budget.settle(task["estimated_usd"], actual_usd)
+    end = utils.currenttimemillis()
+    print(
+        f"{task['kind']} {task['label']}: {status} in {end - start} ms, "
+        f"${actual_usd:.4f}"
+    )
+    return {**task, "status": status, "cost_usd": actual_usd}
+
+
+def run_warmup(
+    kinds: list[str] = KINDS,
+    us_citizen: bool = True,
+    security_clearance: str = "None",
+    concurrency: int = 4,
+    cost_cap_usd: float = 5.0,
+    max_age_days: float = 0,
+    dry_run: bool = False,
+) -> list[dict]:
+    start = utils.currenttimemillis()
+    resumes = utils.load_stored_texts(os.getenv("RESUME_STORAGE_DIR"))
+    jobs = utils.load_stored_texts(os.getenv("JOB_STORAGE_DIR"))
+    tasks = plan_warmup(
+        resumes, jobs, kinds, us_citizen, security_clearance, max_age_days
+    )
+    # without a price for the model the cost cap cannot be enforced
+    unpriced = [t for t in tasks if t["estimated_usd"] is None]
+    estimated_usd = sum(t["estimated_usd"] or 0.0 for t in tasks)
+    print(
+        f"Scanned {len(resumes)} resumes and {len(jobs)} jobs in "
+        f"{utils.currenttimemillis() - start} ms: {len(tasks)} results to "
+        f"compute, estimated ${estimated_usd:.2f} (cap ${cost_cap_usd:.2f})"
+    )
+    for kind in kinds:
+        reasons = {}
+        for task in tasks:
+            if task["kind"] == kind:
+                reasons[task["reason"]] = reasons.get(task["reason"], 0) + 1
+        print(f"  {kind}: {reasons or 'all cached'}")
+    if dry_run or not tasks:
+        return []
+    if unpriced:
+        print(
+            f"No prices for model {crew_analyzer.openai_llm.model}, not running "
+            f"{len(tasks)} tasks against a cost cap that cannot be enforced"
+        )
+        return []
+
+    budget = CostBudget(cost_cap_usd)
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        futures = [executor.submit(run_task, task, budget) for task in tasks]
+        results = [future.result() for future in as_completed(futures)]
+    done = sum(1 for r in results if r["status"] == "done")
+    capped = sum(1 for r in results if r["status"].startswith("skipped"))
+    end = utils.currenttimemillis()
+    print(
+        f"Warm-up computed {done} of {len(tasks)} results "
+        f"({capped} skipped at the cost cap, {len(tasks) - done - capped} failed) "
+        f"for ${budget.spent_usd:.2f} in {end - start} ms"
+    )
+    return results
+
+
+if __name__ == "__main__":
+    load_dotenv()
+    utils.make_work_dirs()
+    parser = argparse.ArgumentParser(description="Warm up the result cache")
+    parser.add_argument("--kinds", nargs="+", choices=KINDS, default=KINDS)
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=int(os.getenv("WARMUP_CONCURRENCY", "4")),
+    )
+    parser.add_argument(
+        "--cost-cap-usd",
+        type=float,
+        default=float(os.getenv("WARMUP_COST_CAP_USD", "5.0")),
+    )
+    parser.add_argument(
+        "--max-age-days",
+        type=float,
+        default=float(os.getenv("WARMUP_MAX_AGE_DAYS", "0")),
+        help="recompute results older than this, 0 for no limit",
+    )
+    parser.add_argument("--security-clearance", default="None")
+    parser.add_argument("--not-us-citizen", action="store_true")
+    parser.add_argument(
+        "--dry-run", action="store_true", help="only report what is missing"
+    )
+    args = parser.parse_args()
+
+    run_warmup(
+        kinds=args.kinds,
+        us_citizen=not args.not_us_citizen,
+        security_clearance=args.security_clearance,
+        concurrency=args.concurrency,
+        cost_cap_usd=args.cost_cap_usd,
+        max_age_days=args.max_age_days,
+        dry_run=args.dry_run,
+    )
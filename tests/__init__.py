@@ -0,0 +1,7 @@
+import os
+import sys
+
+# the job_scorev2 modules import their helpers as the top level "lib" package
+sys.path.insert(
+    0, os.path.join(os.path.dirname(os.path.dirname(__file__)), "src", "job_scorev2")
+)
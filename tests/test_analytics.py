@@ -0,0 +1,70 @@
+import glob
+import os
+import tempfile
+import unittest
+
+from lib import analytics
+
+try:
+    import pyarrow.parquet as pq
+except ImportError:
+    pq = None
+
+
+def make_row(job_hash: str, final_score: float, scored_at: int) -> dict:
+    return {
+        "resume_hash": "resume",
+        "job_hash": job_hash,
+        "us_citizen": True,
+        "security_clearance": "None",
+        "years_of_experience": "5+",
+        "final_score": final_score,
+        "scored_at": scored_at,
+    }
+
+
+@unittest.skipIf(pq is None, "pyarrow is not installed")
+class AnalyticsTest(unittest.TestCase):
+    def setUp(self):
+        self.analytics_dir = tempfile.mkdtemp()
+
+    def parts(self) -> list[str]:
+        return glob.glob(
+            os.path.join(analytics.dataset_dir(self.analytics_dir), "*", "part-*")
+        )
+
+    def rows(self) -> list[dict]:
+        return [row for part in self.parts() for row in pq.read_table(part).to_pylist()]
+
+    def test_coerce_row(self):
+        row = analytics.coerce_row(make_row("job", "0.5", 0))
+        self.assertEqual(row["years_of_experience"], 5)
+        self.assertEqual(row["final_score"], 0.5)
+        self.assertEqual(row["missing_required_skills"], None)
+
+    def test_append_writes_a_part_per_row(self):
+        analytics.append_row(make_row("a", 0.1, 1000), self.analytics_dir)
+        analytics.append_row(make_row("b", 0.2, 2000), self.analytics_dir)
+        self.assertEqual(len(self.parts()), 2)
+        self.assertFalse(os.path.exists(analytics.staging_path(self.analytics_dir)))
+
+    def test_flush_staged_rows(self):
+        analytics.stage_rows(
+            [make_row("a", 0.1, 1000), make_row("b", 0.2, 2000)], self.analytics_dir
+        )
+        self.assertEqual(analytics.flush(self.analytics_dir), 2)
+        self.assertEqual(len(self.parts()), 1)
+        self.assertEqual(analytics.flush(self.analytics_dir), 0)
+
+    def test_compact_keeps_latest_row(self):
+        analytics.append_row(make_row("a", 0.1, 1000), self.analytics_dir)
+        analytics.append_row(make_row("a", 0.9, 3000), self.analytics_dir)
+        analytics.append_row(make_row("b", 0.2, 2000), self.analytics_dir)
+        self.assertEqual(analytics.compact(self.analytics_dir), 1)
+        self.assertEqual(len(self.parts()), 1)
+        scores = {row["job_hash"]: row["final_score"] for row in self.rows()}
+        self.assertEqual(scores, {"a": 0.9, "b": 0.2})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,81 @@
+import json
+import os
+import tempfile
+import unittest
+
+from lib import batch
+
+MESSAGES = [
+    {"role": "system", "content": "You are an HR analyst."},
+    {"role": "user", "content": "Resume ... Job ..."},
+]
+
+
+class BatchRequestTest(unittest.TestCase):
+    def test_request_line_carries_the_llm_options(self):
+        line = batch.batch_request_line(
+            "pair-1",
+            "gpt-4o",
+            MESSAGES,
+            temperature=0.2,
+            response_format={"type": "json_object"},
+        )
+        self.assertEqual(line["url"], batch.BATCH_ENDPOINT)
+        self.assertEqual(line["body"]["temperature"], 0.2)
+        self.assertEqual(line["body"]["response_format"], {"type": "json_object"})
+
+    def test_unset_options_are_left_to_the_provider(self):
+        body = batch.batch_request_line("pair-1", "gpt-4o", MESSAGES)["body"]
+        self.assertEqual(body, {"model": "gpt-4o", "messages": MESSAGES})
+
+    def test_parse_output(self):
+        output = "\n".join(
+            [
+                json.dumps(
+                    {
+                        "custom_id": "ok",
+                        "response": {
+                            "body": {
+                                "choices": [{"message": {"content": "{}"}}],
+                                "usage": {"total_tokens": 10},
+                            }
+                        },
+                        "error": None,
+                    }
+                ),
+                json.dumps(
+                    {"custom_id": "failed", "response": None, "error": {"code": "x"}}
+                ),
+                "",
+            ]
+        )
+        results = batch.parse_batch_output(output)
+        self.assertEqual(results["ok"]["content"], "{}")
+        self.assertEqual(results["ok"]["usage"], {"total_tokens": 10})
+        self.assertIsNone(results["failed"]["content"])
+        self.assertEqual(results["failed"]["error"], {"code": "x"})
+
+
+class LocalBatchClientTest(unittest.TestCase):
+    def test_submit_poll_results(self):
+        work_dir = tempfile.mkdtemp()
+        client = batch.LocalBatchClient(os.path.join(work_dir, "local"))
+        batch_file = batch.write_batch_file(
+            os.path.join(work_dir, "batch.jsonl"),
+            [
+                batch.batch_request_line(f"pair-{i}", "gpt-4o", MESSAGES)
+                for i in range(3)
+            ],
+        )
+        batch_id = client.submit(batch_file)
+        self.assertEqual(
+            batch.poll_batch(client, batch_id, poll_interval=0), "completed"
+        )
+        results = client.results(batch_id)
+        self.assertEqual(sorted(results), ["pair-0", "pair-1", "pair-2"])
+        self.assertEqual(json.loads(results["pair-0"]["content"])["decision"], "Fail")
+        self.assertEqual(client.status("local_batch_unknown"), "failed")
+
+
+if __name__ == "__main__":
+    unittest.main()
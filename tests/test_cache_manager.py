@@ -0,0 +1,71 @@
+import tempfile
+import unittest
+
+from lib.cache_manager import CacheManager, NamespaceCache, load_policy
+
+try:
+    import fakeredis
+except ImportError:
+    fakeredis = None
+
+
+class DiskNamespaceTest(unittest.TestCase):
+    def setUp(self):
+        self.cache = CacheManager(tempfile.mkdtemp(), ["extraction"], "disk")
+        self.extraction = self.cache["extraction"]
+
+    def test_round_trip_and_memory_tier(self):
+        self.extraction[("url", "text")] = "body"
+        self.assertEqual(self.extraction.get(("url", "text")), "body")
+        self.assertIn(("url", "text"), self.extraction)
+        self.assertEqual(self.extraction.stats()["memory_hits"], 2)
+        del self.extraction[("url", "text")]
+        self.assertIsNone(self.extraction.get(("url", "text")))
+
+    def test_add_member(self):
+        self.extraction.add_member("band", ("entry", 1))
+        self.extraction.add_member("band", ("entry", 1))
+        self.extraction.add_member("band", ("entry", 2))
+        self.assertEqual(self.extraction.get("band"), [("entry", 1), ("entry", 2)])
+
+    def test_items_does_not_count_hits(self):
+        self.extraction["a"] = "1"
+        self.extraction["b"] = "2"
+        self.assertEqual(dict(self.extraction.items()), {"a": "1", "b": "2"})
+        self.assertEqual(self.extraction.backend.stats(), (0, 0))
+
+
+@unittest.skipIf(fakeredis is None, "fakeredis is not installed")
+class RedisNamespaceTest(unittest.TestCase):
+    def setUp(self):
+        self.extraction = NamespaceCache(
+            tempfile.mkdtemp(),
+            "extraction",
+            load_policy("extraction"),
+            "redis://localhost:6379/0",
+        )
+        self.extraction.backend.client = fakeredis.FakeRedis()
+
+    def test_no_memory_tier_in_front_of_a_shared_backend(self):
+        self.assertEqual(self.extraction.memory.max_entries, 0)
+        self.extraction["key"] = "old"
+        # another process replaces the entry
+        self.extraction.backend.set("key", "new")
+        self.assertEqual(self.extraction.get("key"), "new")
+
+    def test_add_member(self):
+        self.extraction.add_member("band", ("entry", 1))
+        self.extraction.add_member("band", ("entry", 2))
+        self.extraction.add_member("band", ("entry", 1))
+        self.assertEqual(self.extraction.get("band"), [("entry", 1), ("entry", 2)])
+
+    def test_clear_removes_every_key(self):
+        self.extraction[("url", "text")] = "body"
+        self.extraction.get(("url", "text"))
+        self.extraction.get("missing")
+        self.assertEqual(self.extraction.clear(), 1)
+        self.assertEqual(self.extraction.backend.client.keys("*"), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+import unittest
+from unittest import mock
+
+from lib import compact_schema
+from lib.models import JobRequirements, JobVsResume
+
+
+class ExpandTest(unittest.TestCase):
+    def test_expand_match(self):
+        compact = {
+            "org": "Acme",
+            "yoe": 5,
+            "sum": "Platform engineer",
+            "req_ok": ["Python", "AWS", "Kubernetes"],
+            "req_no": ["Go"],
+            "pref_ok": [],
+            "pref_no": ["Terraform"],
+            "cert_ok": [],
+            "cert_no": [],
+            "clr_ok": ["Secret"],
+            "clr_no": [],
+            "why": "Strong overlap",
+        }
+        match = JobVsResume.model_validate(compact_schema.expand_match(compact))
+        self.assertEqual(match.organization, "Acme")
+        self.assertEqual(match.missing_required_skills, ["Go"])
+        # derived locally, not sent by the model
+        self.assertEqual(match.score.total_required_skills_count, 4)
+        self.assertIsNotNone(match.decision)
+
+    def test_full_match_passes_through(self):
+        full = {"organization": "Acme", "decision": "Pass"}
+        self.assertIs(compact_schema.expand_match(full), full)
+
+    def test_expand_job(self):
+        job = compact_schema.expand_job(
+            {
+                "org": "Acme",
+                "sum": "Engineer",
+                "yoe": 3,
+                "req": ["Python"],
+                "pref": [],
+                "cert": [],
+                "clr": [],
+                "job_title": "kept as is",
+            }
+        )
+        self.assertEqual(job["required_skills"], ["Python"])
+        self.assertEqual(job["job_title"], "kept as is")
+        JobRequirements.model_validate(job)
+
+    def test_task_name(self):
+        with mock.patch.object(compact_schema, "schema_mode", "compact"):
+            self.assertEqual(compact_schema.task_name("job"), "job_compact")
+        with mock.patch.object(compact_schema, "schema_mode", "full"):
+            self.assertEqual(compact_schema.task_name("job"), "job")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,35 @@
+import os
+import tempfile
+import unittest
+
+from lib.content_store import ContentStore, digest_bytes, digest_file
+
+
+class ContentStoreTest(unittest.TestCase):
+    def setUp(self):
+        self.store = ContentStore(tempfile.mkdtemp())
+
+    def test_duplicate_bytes_collapse_onto_one_entry(self):
+        path, new = self.store.put_bytes(b"resume bytes", "resume.pdf")
+        self.assertTrue(new)
+        again, new = self.store.put_bytes(b"resume bytes", "copy of resume.pdf")
+        self.assertFalse(new)
+        self.assertEqual(again, path)
+        self.assertEqual(os.path.basename(path), "resume.pdf")
+        self.assertEqual(digest_file(path), digest_bytes(b"resume bytes"))
+
+    def test_extracted_text(self):
+        path, _ = self.store.put_bytes(b"resume bytes", "resume.pdf")
+        digest = digest_file(path)
+        self.assertIsNone(self.store.get_text(digest))
+        self.store.put_text(digest, "# Resume")
+        self.assertEqual(self.store.get_text(digest), "# Resume")
+        # the extraction is not mistaken for the source file
+        self.assertEqual(self.store.source_path(digest), path)
+
+    def test_unknown_digest(self):
+        self.assertIsNone(self.store.source_path(digest_bytes(b"never stored")))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+import os
+import tempfile
+import unittest
+
+from lib import job_index
+
+JOBS = {
+    "platform": "Senior engineer: Python and Kubernetes on AWS. Active TS/SCI required.",
+    "backend": "Backend developer, Python and PostgreSQL. Contract role.",
+    "frontend": "Frontend developer with React and TypeScript, C++ a plus.",
+    "data": "Data engineer building pipelines in Apache Spark. Secret clearance.",
+}
+
+
+class QueryParserTest(unittest.TestCase):
+    def parse(self, query):
+        return job_index.parse_query(job_index.QUERY_PATTERN.findall(query))
+
+    def test_precedence(self):
+        self.assertEqual(
+            self.parse("a b OR c"),
+            ("or", [("and", [("term", "a"), ("term", "b")]), ("term", "c")]),
+        )
+
+    def test_not_phrase_and_parentheses(self):
+        self.assertEqual(
+            self.parse('-x AND ("y z" OR w)'),
+            (
+                "and",
+                [("not", ("term", "x")), ("or", [("term", "y z"), ("term", "w")])],
+            ),
+        )
+
+    def test_syntax_errors(self):
+        for query in ("(python", "python )", "python AND", "-"):
+            with self.assertRaises(job_index.QuerySyntaxError, msg=query):
+                self.parse(query)
+
+    def test_match_expression(self):
+        self.assertEqual(
+            job_index.to_match(self.parse("python -contract")),
+            '((body : "python" OR skills : "python")) NOT (body : "contract")',
+        )
+        # a NOT without a positive term is a set difference in SQL
+        self.assertIsNone(job_index.to_match(self.parse("-contract")))
+
+    def test_alias_term_matches_skill(self):
+        self.assertEqual(
+            job_index.term_expression("k8s"),
+            '(body : "k8s" OR skills : "kubernetes")',
+        )
+
+
+class SearchTest(unittest.TestCase):
+    def setUp(self):
+        self.index = job_index.JobIndex(
+            os.path.join(tempfile.mkdtemp(), "job_index.db")
+        )
+        for mtime, (name, text) in enumerate(JOBS.items()):
+            self.index.add_document(name, text, mtime)
+
+    def search(self, query) -> set[str]:
+        return {match["path"] for match in self.index.search(query)}
+
+    def test_boolean_queries(self):
+        self.assertEqual(self.search("python"), {"platform", "backend"})
+        self.assertEqual(self.search("python -contract"), {"platform"})
+        self.assertEqual(self.search("-python"), {"frontend", "data"})
+        self.assertEqual(
+            self.search("react OR (python AND postgresql)"), {"frontend", "backend"}
+        )
+        self.assertEqual(self.search("spark OR -developer"), {"platform", "data"})
+
+    def test_phrases_and_symbols(self):
+        self.assertEqual(self.search('"python and kubernetes"'), {"platform"})
+        self.assertEqual(self.search('"kubernetes and python"'), set())
+        self.assertEqual(self.search("c++"), {"frontend"})
+
+    def test_taxonomy_aliases(self):
+        self.assertEqual(self.search("k8s"), {"platform"})
+        self.assertEqual(self.search('"ts sci"'), {"platform"})
+
+    def test_reindex_and_remove(self):
+        self.index.add_document("backend", "Go developer", 10)
+        self.assertEqual(self.search("python"), {"platform"})
+        self.index.remove_document("platform")
+        self.assertEqual(self.search("python"), set())
+
+    def test_newest_first(self):
+        paths = [match["path"] for match in self.index.search("developer")]
+        self.assertEqual(paths, ["frontend", "backend"])
+
+
+if __name__ == "__main__":
+    unittest.main()
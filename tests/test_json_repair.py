@@ -0,0 +1,78 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from pydantic import BaseModel
+
+from lib import json_repair
+
+
+class Score(BaseModel):
+    years: int
+    skills: list[str]
+
+
+class RepairTest(unittest.TestCase):
+    def loads(self, text):
+        return json_repair.loads(text)
+
+    def test_clean_json_is_not_repaired(self):
+        self.assertEqual(self.loads('{"a": 1}'), ({"a": 1}, False))
+
+    def test_fences_and_prose(self):
+        text = 'Here is the result:\n```json\n{"a": [1, 2]}\n```\nThanks'
+        self.assertEqual(self.loads(text)[0], {"a": [1, 2]})
+
+    def test_comments_quotes_literals_and_trailing_commas(self):
+        text = "{'a': True, // the flag\n 'b': None, # unset\n 'c': [1, 2,],}"
+        self.assertEqual(self.loads(text), ({"a": True, "b": None, "c": [1, 2]}, True))
+
+    def test_truncated_output(self):
+        self.assertEqual(self.loads('{"a": "trunc'), ({"a": "trunc"}, True))
+        self.assertEqual(self.loads('{"a": [1, 2'), ({"a": [1, 2]}, True))
+        self.assertEqual(self.loads('{"a": 1, "b":'), ({"a": 1}, True))
+        self.assertEqual(self.loads('{"a": 1, "unfinished'), ({"a": 1}, True))
+
+    def test_no_object(self):
+        with self.assertRaises(json_repair.JSONRepairError):
+            self.loads("I cannot help with that.")
+
+    def test_validate_coerces_and_completes(self):
+        self.assertEqual(
+            json_repair.validate({"years": "5", "skills": []}, Score).years, 5
+        )
+        completed = json_repair.validate(
+            {"years": 5}, Score, complete=lambda data: {**data, "skills": ["Go"]}
+        )
+        self.assertEqual(completed.skills, ["Go"])
+
+
+class OutcomeStatsTest(unittest.TestCase):
+    def setUp(self):
+        self.path = os.path.join(tempfile.mkdtemp(), "stats.json")
+
+    def test_counts_are_flushed_periodically(self):
+        with mock.patch.object(json_repair, "STATS_FLUSH_SECONDS", 3600):
+            json_repair.count_outcome("clean", self.path)
+            json_repair.count_outcome("repaired", self.path)
+            # counted in memory, not written yet
+            self.assertFalse(os.path.exists(self.path))
+            self.assertEqual(json_repair.stats(self.path)["clean"], 1)
+        json_repair.flush_stats()
+        self.assertEqual(json_repair._read_stats(self.path)["repaired"], 1)
+        self.assertEqual(json_repair.stats(self.path)["repaired"], 1)
+
+    def test_flush_adds_to_other_processes_counts(self):
+        with open(self.path, "w") as f:
+            f.write('{"clean": 5, "failed": 1}')
+        with mock.patch.object(json_repair, "STATS_FLUSH_SECONDS", 0):
+            json_repair.count_outcome("clean", self.path)
+        self.assertEqual(
+            json_repair._read_stats(self.path),
+            {"clean": 6, "repaired": 0, "fixed_by_llm": 0, "failed": 1},
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,45 @@
+import json
+import unittest
+
+from lib.json_stream import IncrementalJSONParser
+
+COMPLETION = (
+    'Final Answer: ```json\n{"organization": "Acme, Inc.", "years_of_experience": 5, '
+    '"matching_required_skills": ["C++", "Go {1.x}"], '
+    '"score": {"final_score": 0.75, "counts": [1, 2]}, '
+    '"reason": "Quote \\" and comma, inside"}\n```'
+)
+
+
+class IncrementalJSONParserTest(unittest.TestCase):
+    def feed_in_chunks(self, size: int) -> list:
+        parser = IncrementalJSONParser()
+        fields = []
+        for i in range(0, len(COMPLETION), size):
+            fields.extend(parser.feed(COMPLETION[i : i + size]))
+        self.assertTrue(parser.done)
+        return fields
+
+    def test_every_split_yields_the_same_fields(self):
+        expected = list(json.loads(COMPLETION[COMPLETION.index("{") : -4]).items())
+        for size in (1, 2, 3, 7, 16, len(COMPLETION)):
+            self.assertEqual(self.feed_in_chunks(size), expected, size)
+
+    def test_fields_complete_before_the_object(self):
+        parser = IncrementalJSONParser()
+        self.assertEqual(parser.feed('{"organization": "Acme"'), [])
+        self.assertEqual(parser.feed(', "years'), [("organization", "Acme")])
+        self.assertFalse(parser.done)
+
+    def test_text_after_the_object_is_ignored(self):
+        parser = IncrementalJSONParser()
+        self.assertEqual(parser.feed('{"a": 1}'), [("a", 1)])
+        self.assertEqual(parser.feed('{"b": 2}'), [])
+
+    def test_unparseable_scalar_is_kept_as_text(self):
+        parser = IncrementalJSONParser()
+        self.assertEqual(parser.feed('{"decision": Pass}'), [("decision", "Pass")])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+import tempfile
+import unittest
+from unittest import mock
+
+from lib import llm_scheduler
+from lib.cache_manager import CacheManager
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TokenBucketTest(unittest.TestCase):
+    def setUp(self):
+        self.clock = Clock()
+        patcher = mock.patch.object(llm_scheduler.time, "time", self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_refill(self):
+        bucket = llm_scheduler.TokenBucket(capacity=60, rate=1)
+        bucket.take(60)
+        self.assertEqual(bucket.wait_time(10), 10)
+        self.clock.now += 4
+        self.assertEqual(bucket.wait_time(10), 6)
+        self.clock.now += 120
+        # never refills past its capacity
+        self.assertEqual(bucket.wait_time(60), 0)
+        bucket.take(60)
+        self.assertEqual(bucket.wait_time(1), 1)
+
+    def test_oversized_request_waits_for_a_full_bucket(self):
+        bucket = llm_scheduler.TokenBucket(capacity=10, rate=1)
+        bucket.take(5)
+        self.assertEqual(bucket.wait_time(100), 5)
+
+    def test_drain(self):
+        bucket = llm_scheduler.TokenBucket(capacity=10, rate=1)
+        bucket.drain()
+        self.assertEqual(bucket.wait_time(10), 10)
+
+    def test_limits_are_shared_through_the_store(self):
+        store = CacheManager(tempfile.mkdtemp(), ["limits"])["limits"]
+        first = llm_scheduler.ModelLimits(2, 1000, store, ("llm_limits", "gpt"))
+        second = llm_scheduler.ModelLimits(2, 1000, store, ("llm_limits", "gpt"))
+        self.assertEqual(first.try_take(100), 0)
+        self.assertEqual(second.try_take(100), 0)
+        # 2 requests/min: the third waits for half a minute, in either process
+        self.assertAlmostEqual(first.try_take(100), 30)
+        self.clock.now += 30
+        self.assertEqual(second.try_take(100), 0)
+
+
+class SchedulerTest(unittest.TestCase):
+    def test_rate_limit_errors_are_retried(self):
+        scheduler = llm_scheduler.LLMScheduler(rpm=100, tpm=10000, base_backoff=0)
+        calls = []
+
+        def flaky():
+            calls.append(1)
+            if len(calls) < 3:
+                raise RuntimeError("Error code: 429")
+            return "ok"
+
+        self.assertEqual(scheduler.run(flaky, "gpt", 10), "ok")
+        self.assertEqual(len(calls), 3)
+
+    def test_gives_up_after_max_retries(self):
+        scheduler = llm_scheduler.LLMScheduler(
+            rpm=100, tpm=10000, max_retries=1, base_backoff=0
+        )
+
+        def limited():
+            raise RuntimeError("Error code: 429")
+
+        with self.assertRaises(llm_scheduler.RateLimitExceeded):
+            scheduler.run(limited, "gpt", 10)
+
+    def test_other_errors_are_not_retried(self):
+        scheduler = llm_scheduler.LLMScheduler(rpm=100, tpm=10000)
+        with self.assertRaises(ValueError):
+            scheduler.run(lambda: int("x"), "gpt", 10)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,98 @@
+import multiprocessing
+import random
+import tempfile
+import unittest
+
+from lib import near_dup
+from lib.cache_manager import CacheManager
+
+WORDS = (
+    "python kubernetes aws terraform senior engineer platform team build deploy "
+    "services cloud security clearance required remote hybrid data pipelines "
+    "spark kafka design review mentor on call reliability monitoring"
+).split()
+
+
+def make_text(seed: int, length: int = 200) -> str:
+    rng = random.Random(seed)
+    return " ".join(rng.choice(WORDS) for _ in range(length))
+
+
+def edit(text: str, changes: int, seed: int) -> str:
+    rng = random.Random(seed)
+    words = text.split()
+    for _ in range(changes):
+        words[rng.randrange(len(words))] = rng.choice(WORDS)
+    return " ".join(words)
+
+
+def make_variant(i: int) -> str:
+    # near-identical texts share most bands, so concurrent adds contend
+    return f"{make_text(0)} variant{i}"
+
+
+def add_variants(cache_dir: str, variants: list[int]):
+    index = near_dup.NearDuplicateIndex(
+        CacheManager(cache_dir, ["index"])["index"], "job"
+    )
+    for i in variants:
+        index.add(make_variant(i), f"job-{i}")
+
+
+class NearDuplicateIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.index = near_dup.NearDuplicateIndex(
+            CacheManager(self.cache_dir, ["index"])["index"], "job"
+        )
+
+    def test_signature_estimates_jaccard(self):
+        text = make_text(1)
+        self.assertEqual(
+            near_dup.estimated_jaccard(
+                near_dup.minhash_signature(text), near_dup.minhash_signature(text)
+            ),
+            1.0,
+        )
+        self.assertEqual(
+            near_dup.normalize_text("Senior *Python* dev, C++!"),
+            ["senior", "python", "dev", "c++"],
+        )
+
+    def test_candidate_recall(self):
+        for seed in range(50):
+            self.index.add(make_text(seed), f"job-{seed}")
+        found = 0
+        for seed in range(50):
+            # a couple of edited words, well above the threshold
+            match = self.index.lookup(edit(make_text(seed), 2, seed), threshold=0.7)
+            found += match is not None and match["label"] == f"job-{seed}"
+        self.assertGreaterEqual(found, 48)
+
+    def test_unrelated_text_is_not_a_duplicate(self):
+        self.index.add(make_text(1), "job-1")
+        self.assertIsNone(self.index.lookup(make_text(2)))
+
+    def test_concurrent_adds_keep_every_member(self):
+        context = multiprocessing.get_context("spawn")
+        workers = [
+            context.Process(
+                target=add_variants, args=(self.cache_dir, list(range(i, 40, 4)))
+            )
+            for i in range(4)
+        ]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        for i in range(40):
+            text = make_variant(i)
+            entry_key = self.index._entry_key(text)
+            signature = near_dup.minhash_signature(text)
+            for band, band_hash in enumerate(near_dup._band_hashes(signature)):
+                members = self.index.cache.get(self.index._band_key(band, band_hash))
+                self.assertIn(entry_key, members)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,78 @@
+import unittest
+
+from lib import prompts
+
+JOB_DETAILS = {"job_url": "https://example.com/1", "job_id": "1", "job_source": "Ex"}
+
+
+class InterpolateTest(unittest.TestCase):
+    def test_known_placeholders_only(self):
+        self.assertEqual(
+            prompts.interpolate(
+                '{name} scored {"score": {x}} {missing}', {"name": "A"}
+            ),
+            'A scored {"score": {x}} {missing}',
+        )
+
+
+class MatchInputsTest(unittest.TestCase):
+    def assemble(self, layout):
+        return prompts.assemble_match_inputs(
+            "Build pipelines",
+            "Ten years of Python",
+            JOB_DETAILS,
+            True,
+            "Secret",
+            layout,
+        )["match_inputs"]
+
+    def test_prefix_cache_layout_puts_the_resume_first(self):
+        text = self.assemble("prefix_cache")
+        self.assertLess(text.index("## Candidate"), text.index("## Job"))
+        self.assertIn("* Candidate has Security Clearance: Secret", text)
+        self.assertIn("* Job ID: 1", text)
+
+    def test_legacy_layout(self):
+        text = self.assemble("legacy")
+        self.assertLess(text.index("## Job"), text.index("## Candidate"))
+
+    def test_resume_block_is_a_shared_prefix(self):
+        a = prompts.assemble_match_inputs("Job A", "Resume", {}, True, "None")
+        b = prompts.assemble_match_inputs("Job B", "Resume", {}, True, "None")
+        resume_block = prompts.build_resume_block("Resume", True, "None")
+        self.assertTrue(a["match_inputs"].startswith(resume_block))
+        self.assertTrue(b["match_inputs"].startswith(resume_block))
+
+
+class RenderTaskMessagesTest(unittest.TestCase):
+    def test_hr_task(self):
+        for task in (
+            "resume_to_job_match_analysis",
+            "resume_to_job_match_analysis_compact",
+        ):
+            system, user = prompts.render_task_messages(
+                "hr_agents.yaml",
+                "hr_tasks.yaml",
+                "hr_agent",
+                task,
+                {"match_inputs": "MATCH INPUTS"},
+            )
+            self.assertEqual(system["role"], "system")
+            self.assertIn("MATCH INPUTS", user["content"])
+            self.assertNotIn("{match_inputs}", user["content"])
+
+    def test_cached_token_ratio(self):
+        self.assertEqual(prompts.cached_token_ratio([]), 0.0)
+        self.assertEqual(
+            prompts.cached_token_ratio(
+                [
+                    {"prompt_tokens": 100, "cached_prompt_tokens": 80},
+                    {"prompt_tokens": 100, "cached_prompt_tokens": 0},
+                ]
+            ),
+            0.4,
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,66 @@
+import unittest
+from unittest import mock
+
+from lib import records
+
+
+class FakeCrewOutput:
+    """Stands in for a pickled crewai CrewOutput."""
+
+    def __init__(self, json_dict, raw):
+        self.pydantic = None
+        self.json_dict = json_dict
+        self.raw = raw
+
+
+class RecordTest(unittest.TestCase):
+    def test_round_trip(self):
+        record = records.make_record(
+            "job",
+            {"job_title": "Engineer", "required_skills": ["Python"]},
+            "job_requirements.json",
+            {"job_details": {"job_source": "LinkedIn", "job_id": "1"}},
+        )
+        self.assertEqual(records.loads(records.dumps(record)), record)
+
+    def test_unparsed_result_keeps_raw(self):
+        record = records.make_record("match", None, "hr_analysis.json", raw="oops")
+        loaded = records.loads(records.dumps(record))
+        self.assertEqual(loaded["raw"], "oops")
+        self.assertIsNone(records.to_model(loaded))
+
+    def test_not_a_record(self):
+        self.assertIsNone(records.loads(("pickled", "tuple")))
+        self.assertIsNone(records.loads(b"\x80\x04garbage"))
+
+    def test_older_version_is_migrated(self):
+        def rename_meta(record):
+            return {**record, "v": 2, "metadata": record.pop("meta")}
+
+        old = records.make_record("resume", {"skills": []}, "resume.json")
+        with (
+            mock.patch.object(records, "SCHEMA_VERSION", 2),
+            mock.patch.dict(records.MIGRATIONS, {1: rename_meta}),
+        ):
+            upgraded = records.loads(records.dumps(old))
+        self.assertEqual(upgraded["v"], 2)
+        self.assertEqual(upgraded["metadata"], {})
+
+    def test_unmigratable_version_is_a_miss(self):
+        old = {**records.make_record("resume", {}, "resume.json"), "v": 0}
+        self.assertIsNone(records.loads(records.dumps(old)))
+
+    def test_from_legacy(self):
+        job_details = {"job_source": "LinkedIn"}
+        record = records.from_legacy(
+            "job",
+            (FakeCrewOutput({"job_title": "Engineer"}, "{}"), "job.json", job_details),
+        )
+        self.assertEqual(record["v"], records.SCHEMA_VERSION)
+        self.assertEqual(record["data"], {"job_title": "Engineer"})
+        self.assertEqual(record["meta"], {"job_details": job_details})
+        self.assertIsNone(records.from_legacy("job", b"record bytes"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,81 @@
+import unittest
+
+from lib import rescoring
+from lib.models import JobVsResume
+
+
+def make_match(required=(14, 6), preferred=(2, 0)) -> JobVsResume:
+    match = {
+        "matching_required_skills": [f"req{i}" for i in range(required[0])],
+        "missing_required_skills": [f"gap{i}" for i in range(required[1])],
+        "matching_preferred_skills": [f"pref{i}" for i in range(preferred[0])],
+        "missing_preferred_skills": [f"nice{i}" for i in range(preferred[1])],
+        "matching_certifications": [],
+        "missing_certifications": [],
+        "matching_security_clearances": [],
+        "missing_security_clearances": [],
+        "organization": "Acme",
+        "years_of_experience": 3,
+        "job_summary": "Engineer",
+    }
+    return JobVsResume.model_validate(rescoring.complete_match(match))
+
+
+def make_diff(added=(), removed=()) -> dict:
+    diff = {field: {"added": [], "removed": []} for field in rescoring.DIFF_CATEGORIES}
+    diff["resume_skills"] = {"added": list(added), "removed": list(removed)}
+    diff["years_of_experience"] = (5, 5)
+    return diff
+
+
+class ScoreBoundsTest(unittest.TestCase):
+    def test_no_unresolved_items(self):
+        self.assertEqual(rescoring.score_bounds(14, 6, 2, 0), (0.79, 0.79))
+
+    def test_removal_can_cost_a_preferred_skill(self):
+        lowest, highest = rescoring.score_bounds(14, 6, 2, 0, removed=1)
+        # losing one of two preferred skills outweighs one of 20 required
+        self.assertEqual(lowest, 0.64)
+        self.assertEqual(highest, 0.79)
+
+    def test_addition_can_cover_a_preferred_skill(self):
+        lowest, highest = rescoring.score_bounds(14, 6, 0, 2, added=1)
+        self.assertEqual(lowest, 0.49)
+        self.assertEqual(highest, 0.64)
+
+    def test_moves_mix_required_and_preferred(self):
+        lowest, _ = rescoring.score_bounds(1, 1, 1, 0, removed=2)
+        self.assertEqual(lowest, 0.0)
+
+    def test_moves_are_limited_by_available_items(self):
+        self.assertEqual(rescoring.score_bounds(0, 0, 0, 0, 3, 3), (1.0, 1.0))
+
+
+class RescoreMatchTest(unittest.TestCase):
+    def test_exact_removal_is_scored_locally(self):
+        rescored, llm_reason = rescoring.rescore_match(
+            make_match(), make_diff(removed=["req0"])
+        )
+        self.assertIsNone(llm_reason)
+        self.assertEqual(rescored.score.matching_required_skills_count, 13)
+        self.assertEqual(rescored.decision, "Pass")
+
+    def test_unresolved_removal_straddling_via_preferred_needs_llm(self):
+        match = make_match()
+        self.assertEqual(match.score.final_score, 0.79)
+        _, llm_reason = rescoring.rescore_match(
+            match, make_diff(removed=["something else"])
+        )
+        self.assertIsNotNone(llm_reason)
+
+    def test_unresolved_change_far_from_threshold_stays_local(self):
+        rescored, llm_reason = rescoring.rescore_match(
+            make_match(required=(20, 0), preferred=(10, 0)),
+            make_diff(removed=["something else"]),
+        )
+        self.assertIsNone(llm_reason)
+        self.assertEqual(rescored.decision, "Pass")
+
+
+if __name__ == "__main__":
+    unittest.main()
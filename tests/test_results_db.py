@@ -0,0 +1,63 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+
+from lib import results_db
+
+
+def make_record(clearances: list[str]) -> dict:
+    return {
+        "data": {
+            "matching_security_clearances": clearances,
+            "missing_security_clearances": [],
+            "score": {"final_score": 0.5},
+        },
+        "save_path": "hr_analysis.json",
+    }
+
+
+class ClearanceFilterTest(unittest.TestCase):
+    def setUp(self):
+        self.db_path = os.path.join(tempfile.mkdtemp(), "results.db")
+        for job_text, clearances in (
+            ("top secret job", ["Top Secret"]),
+            ("secret job", ["Secret"]),
+            ("open job", []),
+        ):
+            results_db.upsert_match(
+                (job_text, "resume", True, "None"),
+                make_record(clearances),
+                {"job_source": "LinkedIn"},
+                self.db_path,
+            )
+
+    def filtered(self, clearance) -> set[str]:
+        rows = results_db.leaderboard(
+            "resume", True, "None", clearance=clearance, db_path=self.db_path
+        )
+        return {row["job_hash"] for row in rows}
+
+    def test_exact_match(self):
+        secret = {results_db.text_hash("secret job")}
+        self.assertEqual(self.filtered("Secret"), secret)
+        self.assertEqual(self.filtered("secret"), secret)
+        self.assertEqual(
+            self.filtered("Top Secret"), {results_db.text_hash("top secret job")}
+        )
+
+    def test_none_required_and_all(self):
+        self.assertEqual(self.filtered(""), {results_db.text_hash("open job")})
+        self.assertEqual(len(self.filtered(None)), 3)
+
+    def test_backfill_of_older_results(self):
+        con = sqlite3.connect(self.db_path)
+        with con:
+            con.execute("DELETE FROM match_clearances")
+        con.close()
+        results_db._initialized.discard(self.db_path)
+        self.assertEqual(self.filtered("Secret"), {results_db.text_hash("secret job")})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,68 @@
+import unittest
+
+from lib import resume_retrieval
+
+TITLE_CASE_RESUME = """Jane Doe
+jane@example.com | 555-1234
+Senior engineer with ten years of backend work.
+
+Work Experience
+Acme Corp, 2019 - 2022
+- Built the Kubernetes platform
+- Led the Python services
+
+Technical skills:
+Python, Go, Kubernetes
+
+Education
+BS Computer Science, 2012
+"""
+
+
+def sections(resume: str) -> dict:
+    return {
+        chunk["text"]: chunk["section"]
+        for chunk in resume_retrieval.chunk_resume(resume)
+    }
+
+
+class HeadingTest(unittest.TestCase):
+    def test_heading_styles(self):
+        for line in ("# Experience", "EXPERIENCE", "Work Experience", "Skills:"):
+            self.assertTrue(resume_retrieval.is_heading(line), line)
+
+    def test_not_headings(self):
+        for line in (
+            "- Built the Kubernetes platform",
+            "Acme Corp, 2019 - 2022",
+            "Led a team of five engineers on the billing platform",
+        ):
+            self.assertFalse(resume_retrieval.is_heading(line), line)
+
+    def test_first_line_name_is_not_a_heading(self):
+        self.assertFalse(resume_retrieval.is_heading("Jane Doe", first_line=True))
+
+
+class ChunkResumeTest(unittest.TestCase):
+    def test_title_case_and_colon_headings_end_the_header(self):
+        by_text = sections(TITLE_CASE_RESUME)
+        self.assertEqual(by_text["- Built the Kubernetes platform"], "Work Experience")
+        self.assertEqual(by_text["Python, Go, Kubernetes"], "Technical skills:")
+        self.assertEqual(by_text["BS Computer Science, 2012"], "Education")
+
+    def test_experience_is_not_kept_as_header(self):
+        chunks = resume_retrieval.chunk_resume(TITLE_CASE_RESUME)
+        kept = [chunk["text"] for chunk in chunks if chunk["keep"]]
+        self.assertIn("Python, Go, Kubernetes", kept)
+        self.assertNotIn("- Led the Python services", kept)
+
+    def test_header_is_capped_without_headings(self):
+        lines = [f"line {i} of a resume without any headings." for i in range(20)]
+        chunks = resume_retrieval.chunk_resume("\n\n".join(lines))
+        header = [chunk for chunk in chunks if chunk["section"] == "header"]
+        self.assertEqual(len(header), resume_retrieval.HEADER_MAX_LINES)
+        self.assertFalse(any(chunk["keep"] for chunk in chunks[len(header) :]))
+
+
+if __name__ == "__main__":
+    unittest.main()
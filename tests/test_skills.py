@@ -0,0 +1,69 @@
+import unittest
+
+from lib.skills import AhoCorasick, taxonomy
+
+
+class CanonicalTest(unittest.TestCase):
+    def test_synonyms_compare_equal(self):
+        for alias, skill_id in (
+            ("k8s", "kubernetes"),
+            ("Golang", "golang"),
+            ("JS", "javascript"),
+            ("postgres", "postgresql"),
+            ("python3", "python"),
+        ):
+            self.assertEqual(taxonomy.canonical_id(alias), skill_id, alias)
+
+    def test_frameworks_and_products_stay_distinct(self):
+        for specific, broad in (
+            ("Ruby on Rails", "Ruby"),
+            ("EKS", "Kubernetes"),
+            ("RHEL", "Linux"),
+            ("GitHub", "Git"),
+            ("GenAI", "LLM"),
+            ("Splunk", "SIEM"),
+            ("Kanban", "Agile"),
+            ("containers", "Docker"),
+        ):
+            self.assertNotEqual(
+                taxonomy.canonical_key(specific), taxonomy.canonical_key(broad)
+            )
+
+    def test_parent(self):
+        self.assertEqual(taxonomy.parent_id("rails"), "ruby")
+        self.assertEqual(taxonomy.parent_id("Splunk"), "siem")
+        self.assertIsNone(taxonomy.parent_id("Ruby"))
+
+    def test_canonicalize_keeps_both_requirements(self):
+        self.assertEqual(
+            taxonomy.canonicalize(["Ruby", "Ruby on Rails", "ruby"]),
+            ["Ruby", "Ruby on Rails"],
+        )
+
+    def test_every_parent_exists(self):
+        for skill_id, entry in taxonomy.entries.items():
+            if entry.get("parent"):
+                self.assertIn(entry["parent"], taxonomy.entries, skill_id)
+
+
+class ScanTest(unittest.TestCase):
+    def test_scan_is_leftmost_longest(self):
+        found = taxonomy.scan("5 years of Ruby on Rails and TS/SCI with poly")
+        self.assertIn("rails", found)
+        self.assertNotIn("ruby", found)
+        self.assertIn("ts_sci_poly", found)
+        self.assertNotIn("ts_sci", found)
+
+    def test_exact_only_aliases_are_not_scanned(self):
+        self.assertNotIn("golang", taxonomy.scan("we go to great lengths"))
+        self.assertEqual(taxonomy.canonical_id("go"), "golang")
+
+    def test_aho_corasick_overlaps(self):
+        matcher = AhoCorasick({"he": 1, "she": 2, "hers": 3})
+        self.assertEqual(
+            sorted(matcher.iter_matches("ushers")), [(1, 4, 2), (2, 4, 1), (2, 6, 3)]
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
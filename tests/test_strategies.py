@@ -0,0 +1,87 @@
+import os
+import tempfile
+import textwrap
+import unittest
+from unittest import mock
+
+from lib import strategies
+
+# a stand-in strategy.py recording when it ran
+FAKE_STRATEGY = textwrap.dedent("""
+    import argparse, json, time
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pairs")
+    parser.add_argument("--output")
+    parser.add_argument("--concurrency")
+    args = parser.parse_args()
+    start = time.time()
+    time.sleep(0.2)
+    with open(args.pairs) as f:
+        pairs = json.load(f)["pairs"]
+    with open(args.output, "w") as f:
+        for pair in pairs:
+            row = {"pair_id": pair["pair_id"], "start": start, "end": time.time()}
+            f.write(json.dumps(row) + "\\n")
+    """)
+
+
+class RunStrategiesTest(unittest.TestCase):
+    def test_strategies_run_one_after_the_other(self):
+        src_dir = tempfile.mkdtemp()
+        for package in ("a", "b"):
+            os.makedirs(os.path.join(src_dir, package))
+            with open(os.path.join(src_dir, package, "strategy.py"), "w") as f:
+                f.write(FAKE_STRATEGY)
+        registry = {name: {"package": name, "description": ""} for name in "ab"}
+        with (
+            mock.patch.object(strategies, "SRC_DIR", src_dir),
+            mock.patch.object(strategies, "STRATEGIES", registry),
+        ):
+            results = strategies.run_strategies(
+                ["a", "b"],
+                strategies.make_pairs(["resume"], ["job 1", "job 2"]),
+                {},
+                work_dir=tempfile.mkdtemp(),
+            )
+        self.assertEqual([row["pair_id"] for row in results["a"]], ["0", "1"])
+        self.assertLessEqual(results["a"][0]["end"], results["b"][0]["start"])
+
+
+class CompareTest(unittest.TestCase):
+    def row(self, pair_id, decision, score, latency_ms=100):
+        return {
+            "pair_id": pair_id,
+            "decision": decision,
+            "final_score": score,
+            "latency_ms": latency_ms,
+            "prompt_tokens": 10,
+            "completion_tokens": 5,
+            "total_tokens": 15,
+        }
+
+    def test_summarize_and_agreement(self):
+        results = {
+            "single_crew": [self.row("0", "Pass", 0.8), self.row("1", "Fail", 0.2)],
+            "three_crew": [
+                self.row("0", "Pass", 0.6),
+                {"pair_id": "1", "error": "timeout"},
+            ],
+        }
+        summary = {row["strategy"]: row for row in strategies.summarize(results)}
+        self.assertEqual(summary["three_crew"]["errors"], 1)
+        self.assertEqual(summary["single_crew"]["mean_total_tokens"], 15)
+        (agreement,) = strategies.agreement(results)
+        self.assertEqual(agreement["compared"], 1)
+        self.assertEqual(agreement["decision_agreement"], 1.0)
+        self.assertAlmostEqual(agreement["max_abs_score_diff"], 0.2)
+
+    def test_failed_pair_becomes_an_error_row(self):
+        def run(resume, job, **options):
+            raise RuntimeError("boom")
+
+        row = strategies.run_pair(run, {"pair_id": "7", "resume": "", "job": ""}, {})
+        self.assertEqual(row, {"error": "boom", "pair_id": "7"})
+
+
+if __name__ == "__main__":
+    unittest.main()